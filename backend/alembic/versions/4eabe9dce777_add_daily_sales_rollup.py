@@ -0,0 +1,250 @@
+"""add daily sales rollup
+
+Revision ID: 4eabe9dce777
+Revises: 34924689dc44
+Create Date: 2026-10-16 09:12:41.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4eabe9dce777'
+down_revision: Union[str, Sequence[str], None] = '34924689dc44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+APPLY_ROLLUP_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_apply(
+    p_sales_date date,
+    p_product_id uuid,
+    p_category_id uuid,
+    p_customer_age integer,
+    p_gender varchar,
+    p_quantity bigint,
+    p_sales_amount numeric,
+    p_order_count bigint,
+    p_revenue numeric
+) RETURNS void AS $$
+BEGIN
+    INSERT INTO daily_sales_rollup AS r (
+        sales_date, product_id, category_id, customer_age, gender,
+        quantity, sales_amount, order_count, revenue, updated_at
+    )
+    VALUES (
+        p_sales_date, p_product_id, p_category_id, p_customer_age, p_gender,
+        p_quantity, p_sales_amount, p_order_count, p_revenue, now()
+    )
+    ON CONFLICT ON CONSTRAINT uq_daily_sales_rollup_key DO UPDATE SET
+        quantity = r.quantity + EXCLUDED.quantity,
+        sales_amount = r.sales_amount + EXCLUDED.sales_amount,
+        order_count = r.order_count + EXCLUDED.order_count,
+        revenue = r.revenue + EXCLUDED.revenue,
+        updated_at = now();
+
+    -- Only a negative delta can empty a row; drop it so reads never see zero buckets
+    IF p_quantity < 0 OR p_order_count < 0 THEN
+        DELETE FROM daily_sales_rollup
+        WHERE sales_date = p_sales_date
+          AND product_id IS NOT DISTINCT FROM p_product_id
+          AND category_id IS NOT DISTINCT FROM p_category_id
+          AND customer_age IS NOT DISTINCT FROM p_customer_age
+          AND gender IS NOT DISTINCT FROM p_gender
+          AND quantity = 0 AND order_count = 0
+          AND sales_amount = 0 AND revenue = 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ITEM_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_item_trigger() RETURNS trigger AS $$
+DECLARE
+    v_sales_date date;
+    v_customer_age integer;
+    v_gender varchar;
+    v_category_id uuid;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT t.transaction_date, c.age, c.gender
+          INTO v_sales_date, v_customer_age, v_gender
+          FROM transactions t
+          JOIN customers c ON c.id = t.customer_id
+         WHERE t.id = OLD.transaction_id;
+        SELECT p.category_id INTO v_category_id FROM products p WHERE p.id = OLD.product_id;
+
+        IF v_sales_date IS NOT NULL THEN
+            PERFORM daily_sales_rollup_apply(
+                v_sales_date, OLD.product_id, v_category_id, v_customer_age, v_gender,
+                -OLD.quantity, -OLD.subtotal, 0, 0
+            );
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT t.transaction_date, c.age, c.gender
+          INTO v_sales_date, v_customer_age, v_gender
+          FROM transactions t
+          JOIN customers c ON c.id = t.customer_id
+         WHERE t.id = NEW.transaction_id;
+        SELECT p.category_id INTO v_category_id FROM products p WHERE p.id = NEW.product_id;
+
+        PERFORM daily_sales_rollup_apply(
+            v_sales_date, NEW.product_id, v_category_id, v_customer_age, v_gender,
+            NEW.quantity, NEW.subtotal, 0, 0
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRANSACTION_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_transaction_trigger() RETURNS trigger AS $$
+DECLARE
+    v_old_age integer;
+    v_old_gender varchar;
+    v_new_age integer;
+    v_new_gender varchar;
+    v_item record;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT age, gender INTO v_old_age, v_old_gender FROM customers WHERE id = OLD.customer_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT age, gender INTO v_new_age, v_new_gender FROM customers WHERE id = NEW.customer_id;
+    END IF;
+
+    -- Same day and customer: only the revenue can move
+    IF TG_OP = 'UPDATE'
+       AND OLD.transaction_date = NEW.transaction_date
+       AND OLD.customer_id = NEW.customer_id THEN
+        IF OLD.total_amount <> NEW.total_amount THEN
+            PERFORM daily_sales_rollup_apply(
+                NEW.transaction_date, NULL, NULL, v_new_age, v_new_gender,
+                0, 0, 0, NEW.total_amount - OLD.total_amount
+            );
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM daily_sales_rollup_apply(
+            OLD.transaction_date, NULL, NULL, v_old_age, v_old_gender,
+            0, 0, -1, -OLD.total_amount
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM daily_sales_rollup_apply(
+            NEW.transaction_date, NULL, NULL, v_new_age, v_new_gender,
+            0, 0, 1, NEW.total_amount
+        );
+    END IF;
+
+    -- Re-dated or re-assigned transactions carry their line items to the new key
+    IF TG_OP = 'UPDATE' THEN
+        FOR v_item IN
+            SELECT ti.product_id, p.category_id, ti.quantity, ti.subtotal
+              FROM transaction_items ti
+              JOIN products p ON p.id = ti.product_id
+             WHERE ti.transaction_id = NEW.id
+        LOOP
+            PERFORM daily_sales_rollup_apply(
+                OLD.transaction_date, v_item.product_id, v_item.category_id, v_old_age, v_old_gender,
+                -v_item.quantity, -v_item.subtotal, 0, 0
+            );
+            PERFORM daily_sales_rollup_apply(
+                NEW.transaction_date, v_item.product_id, v_item.category_id, v_new_age, v_new_gender,
+                v_item.quantity, v_item.subtotal, 0, 0
+            );
+        END LOOP;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ITEM_TRIGGER = """
+CREATE OR REPLACE TRIGGER trg_daily_sales_rollup_items
+AFTER INSERT OR UPDATE OR DELETE ON transaction_items
+FOR EACH ROW EXECUTE FUNCTION daily_sales_rollup_item_trigger();
+"""
+
+TRANSACTION_TRIGGER = """
+CREATE OR REPLACE TRIGGER trg_daily_sales_rollup_transactions
+AFTER INSERT OR UPDATE OR DELETE ON transactions
+FOR EACH ROW EXECUTE FUNCTION daily_sales_rollup_transaction_trigger();
+"""
+
+REBUILD_ROLLUP_SQL = """
+INSERT INTO daily_sales_rollup (
+    sales_date, product_id, category_id, customer_age, gender,
+    quantity, sales_amount, order_count, revenue, updated_at
+)
+SELECT t.transaction_date, ti.product_id, p.category_id, c.age, c.gender,
+       SUM(ti.quantity), SUM(ti.subtotal), 0, 0, now()
+FROM transaction_items ti
+JOIN transactions t ON t.id = ti.transaction_id
+JOIN products p ON p.id = ti.product_id
+JOIN customers c ON c.id = t.customer_id
+GROUP BY t.transaction_date, ti.product_id, p.category_id, c.age, c.gender
+UNION ALL
+SELECT t.transaction_date, NULL, NULL, c.age, c.gender,
+       0, 0, COUNT(t.id), SUM(t.total_amount), now()
+FROM transactions t
+JOIN customers c ON c.id = t.customer_id
+GROUP BY t.transaction_date, c.age, c.gender;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'daily_sales_rollup',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('sales_date', sa.Date(), nullable=False),
+        sa.Column('product_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('category_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('customer_age', sa.Integer(), nullable=True),
+        sa.Column('gender', sa.String(length=10), nullable=True),
+        sa.Column('quantity', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+        sa.Column('sales_amount', sa.Numeric(precision=14, scale=2), server_default=sa.text('0'), nullable=False),
+        sa.Column('order_count', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=14, scale=2), server_default=sa.text('0'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'sales_date', 'product_id', 'category_id', 'customer_age', 'gender',
+            name='uq_daily_sales_rollup_key',
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    for statement in (
+        APPLY_ROLLUP_FUNCTION,
+        ITEM_TRIGGER_FUNCTION,
+        TRANSACTION_TRIGGER_FUNCTION,
+        ITEM_TRIGGER,
+        TRANSACTION_TRIGGER,
+    ):
+        op.execute(statement)
+
+    # Backfill from existing history; the triggers keep it current from here on
+    op.execute(REBUILD_ROLLUP_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_daily_sales_rollup_transactions ON transactions")
+    op.execute("DROP TRIGGER IF EXISTS trg_daily_sales_rollup_items ON transaction_items")
+    op.execute("DROP FUNCTION IF EXISTS daily_sales_rollup_transaction_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS daily_sales_rollup_item_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS daily_sales_rollup_apply(date, uuid, uuid, integer, varchar, bigint, numeric, bigint, numeric)")
+    op.drop_table('daily_sales_rollup')
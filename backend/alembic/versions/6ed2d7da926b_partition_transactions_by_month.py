@@ -0,0 +1,369 @@
+"""partition transactions by month
+
+Revision ID: 6ed2d7da926b
+Revises: 4eabe9dce777
+Create Date: 2026-10-16 14:27:05.381962
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6ed2d7da926b'
+down_revision: Union[str, Sequence[str], None] = '4eabe9dce777'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CREATE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_monthly_partitions(p_parent text, p_from date, p_to date)
+RETURNS integer AS $$
+DECLARE
+    v_month date := date_trunc('month', p_from)::date;
+    v_next date;
+    v_name text;
+    v_created integer := 0;
+BEGIN
+    WHILE v_month <= p_to LOOP
+        v_next := (v_month + interval '1 month')::date;
+        v_name := p_parent || '_y' || to_char(v_month, 'YYYY') || 'm' || to_char(v_month, 'MM');
+
+        IF to_regclass(v_name) IS NULL THEN
+            EXECUTE 'CREATE TABLE ' || quote_ident(v_name)
+                 || ' PARTITION OF ' || quote_ident(p_parent)
+                 || ' FOR VALUES FROM (' || quote_literal(v_month) || ') TO (' || quote_literal(v_next) || ')';
+            v_created := v_created + 1;
+        END IF;
+
+        v_month := v_next;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+APPLY_ROLLUP_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_apply(
+    p_sales_date date,
+    p_product_id uuid,
+    p_category_id uuid,
+    p_customer_age integer,
+    p_gender varchar,
+    p_quantity bigint,
+    p_sales_amount numeric,
+    p_order_count bigint,
+    p_revenue numeric
+) RETURNS void AS $$
+DECLARE
+    v_row record;
+BEGIN
+    INSERT INTO daily_sales_rollup AS r (
+        sales_date, product_id, category_id, customer_age, gender,
+        quantity, sales_amount, order_count, revenue, updated_at
+    )
+    VALUES (
+        p_sales_date, p_product_id, p_category_id, p_customer_age, p_gender,
+        p_quantity, p_sales_amount, p_order_count, p_revenue, now()
+    )
+    ON CONFLICT ON CONSTRAINT uq_daily_sales_rollup_key DO UPDATE SET
+        quantity = r.quantity + EXCLUDED.quantity,
+        sales_amount = r.sales_amount + EXCLUDED.sales_amount,
+        order_count = r.order_count + EXCLUDED.order_count,
+        revenue = r.revenue + EXCLUDED.revenue,
+        updated_at = now()
+    RETURNING * INTO v_row;
+
+    -- Drop emptied buckets so reads never see zero rows
+    IF v_row.quantity = 0 AND v_row.order_count = 0
+       AND v_row.sales_amount = 0 AND v_row.revenue = 0 THEN
+        DELETE FROM daily_sales_rollup WHERE id = v_row.id;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ITEM_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_item_trigger() RETURNS trigger AS $$
+DECLARE
+    v_customer_age integer;
+    v_gender varchar;
+    v_category_id uuid;
+BEGIN
+    -- Items carry their own transaction_date; only the customer is looked up. The
+    -- OLD side matches on id alone because a cascaded re-date has already moved the parent.
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT c.age, c.gender
+          INTO v_customer_age, v_gender
+          FROM transactions t
+          JOIN customers c ON c.id = t.customer_id
+         WHERE t.id = OLD.transaction_id;
+
+        IF FOUND THEN
+            SELECT p.category_id INTO v_category_id FROM products p WHERE p.id = OLD.product_id;
+            PERFORM daily_sales_rollup_apply(
+                OLD.transaction_date, OLD.product_id, v_category_id, v_customer_age, v_gender,
+                -OLD.quantity, -OLD.subtotal, 0, 0
+            );
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT c.age, c.gender
+          INTO v_customer_age, v_gender
+          FROM transactions t
+          JOIN customers c ON c.id = t.customer_id
+         WHERE t.id = NEW.transaction_id
+           AND t.transaction_date = NEW.transaction_date;
+        SELECT p.category_id INTO v_category_id FROM products p WHERE p.id = NEW.product_id;
+
+        PERFORM daily_sales_rollup_apply(
+            NEW.transaction_date, NEW.product_id, v_category_id, v_customer_age, v_gender,
+            NEW.quantity, NEW.subtotal, 0, 0
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRANSACTION_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_transaction_trigger() RETURNS trigger AS $$
+DECLARE
+    v_old_age integer;
+    v_old_gender varchar;
+    v_new_age integer;
+    v_new_gender varchar;
+    v_item record;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT age, gender INTO v_old_age, v_old_gender FROM customers WHERE id = OLD.customer_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT age, gender INTO v_new_age, v_new_gender FROM customers WHERE id = NEW.customer_id;
+    END IF;
+
+    -- Same day and customer: only the revenue can move
+    IF TG_OP = 'UPDATE'
+       AND OLD.transaction_date = NEW.transaction_date
+       AND OLD.customer_id = NEW.customer_id THEN
+        IF OLD.total_amount <> NEW.total_amount THEN
+            PERFORM daily_sales_rollup_apply(
+                NEW.transaction_date, NULL, NULL, v_new_age, v_new_gender,
+                0, 0, 0, NEW.total_amount - OLD.total_amount
+            );
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM daily_sales_rollup_apply(
+            OLD.transaction_date, NULL, NULL, v_old_age, v_old_gender,
+            0, 0, -1, -OLD.total_amount
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM daily_sales_rollup_apply(
+            NEW.transaction_date, NULL, NULL, v_new_age, v_new_gender,
+            0, 0, 1, NEW.total_amount
+        );
+    END IF;
+
+    -- Re-dated line items follow through ON UPDATE CASCADE and their own trigger, which
+    -- resolves the customer as it is after this update. Move them off the old customer here.
+    -- Changing the date and the customer in one statement is not supported: run two updates.
+    IF TG_OP = 'UPDATE' AND OLD.customer_id <> NEW.customer_id THEN
+        FOR v_item IN
+            SELECT ti.product_id, p.category_id, ti.quantity, ti.subtotal
+              FROM transaction_items ti
+              JOIN products p ON p.id = ti.product_id
+             WHERE ti.transaction_id = NEW.id
+               AND ti.transaction_date = NEW.transaction_date
+        LOOP
+            PERFORM daily_sales_rollup_apply(
+                OLD.transaction_date, v_item.product_id, v_item.category_id, v_old_age, v_old_gender,
+                -v_item.quantity, -v_item.subtotal, 0, 0
+            );
+            PERFORM daily_sales_rollup_apply(
+                OLD.transaction_date, v_item.product_id, v_item.category_id, v_new_age, v_new_gender,
+                v_item.quantity, v_item.subtotal, 0, 0
+            );
+        END LOOP;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ITEM_TRIGGER = """
+CREATE OR REPLACE TRIGGER trg_daily_sales_rollup_items
+AFTER INSERT OR UPDATE OR DELETE ON transaction_items
+FOR EACH ROW EXECUTE FUNCTION daily_sales_rollup_item_trigger();
+"""
+
+TRANSACTION_TRIGGER = """
+CREATE OR REPLACE TRIGGER trg_daily_sales_rollup_transactions
+AFTER INSERT OR UPDATE OR DELETE ON transactions
+FOR EACH ROW EXECUTE FUNCTION daily_sales_rollup_transaction_trigger();
+"""
+
+ROLLUP_DDL = [
+    APPLY_ROLLUP_FUNCTION,
+    ITEM_TRIGGER_FUNCTION,
+    TRANSACTION_TRIGGER_FUNCTION,
+    ITEM_TRIGGER,
+    TRANSACTION_TRIGGER,
+]
+
+TRANSACTION_COLUMNS = "id, transaction_number, transaction_date, customer_id, subtotal, tax_amount, discount_amount, total_amount, created_at"
+ITEM_COLUMNS = "id, transaction_id, transaction_date, product_id, quantity, price_per_unit, discount_per_unit, subtotal, created_at"
+
+
+def drop_rollup_triggers() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_daily_sales_rollup_transactions ON transactions")
+    op.execute("DROP TRIGGER IF EXISTS trg_daily_sales_rollup_items ON transaction_items")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+    # The rollup is already correct; keep the copy below from replaying into it
+    drop_rollup_triggers()
+
+    op.rename_table('transaction_items', 'transaction_items_legacy')
+    op.rename_table('transactions', 'transactions_legacy')
+    op.execute("ALTER INDEX IF EXISTS transactions_pkey RENAME TO transactions_legacy_pkey")
+    op.execute("ALTER INDEX IF EXISTS transaction_items_pkey RENAME TO transaction_items_legacy_pkey")
+    op.execute("ALTER INDEX IF EXISTS ix_transactions_transaction_date RENAME TO ix_transactions_legacy_transaction_date")
+    op.execute("ALTER INDEX IF EXISTS ix_transactions_transaction_number RENAME TO ix_transactions_legacy_transaction_number")
+
+    # Unique keys on a partitioned table must contain the partition key, so the primary
+    # key becomes (id, transaction_date) and transaction_number is unique per date
+    op.create_table('transactions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('transaction_number', sa.String(length=50), nullable=False),
+    sa.Column('transaction_date', sa.Date(), nullable=False),
+    sa.Column('customer_id', sa.UUID(), nullable=False),
+    sa.Column('subtotal', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('tax_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('discount_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id', 'transaction_date'),
+    sa.UniqueConstraint('transaction_number', 'transaction_date', name='uq_transactions_number_date'),
+    postgresql_partition_by='RANGE (transaction_date)'
+    )
+    op.create_index(op.f('ix_transactions_transaction_date'), 'transactions', ['transaction_date'], unique=False)
+    op.create_index(op.f('ix_transactions_transaction_number'), 'transactions', ['transaction_number'], unique=False)
+
+    op.create_table('transaction_items',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('transaction_id', sa.UUID(), nullable=False),
+    sa.Column('transaction_date', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('price_per_unit', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('discount_per_unit', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('subtotal', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['transaction_id', 'transaction_date'], ['transactions.id', 'transactions.transaction_date'], onupdate='CASCADE'),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id', 'transaction_date'),
+    postgresql_partition_by='RANGE (transaction_date)'
+    )
+    op.create_index(op.f('ix_transaction_items_transaction_id'), 'transaction_items', ['transaction_id'], unique=False)
+
+    # One partition per month from the oldest transaction to three months past today
+    op.execute("""
+        SELECT create_monthly_partitions(parents.parent, bounds.lo, bounds.hi)
+        FROM (
+            SELECT COALESCE(MIN(transaction_date), CURRENT_DATE) AS lo,
+                   GREATEST(COALESCE(MAX(transaction_date), CURRENT_DATE), CURRENT_DATE + 90) AS hi
+            FROM transactions_legacy
+        ) bounds
+        CROSS JOIN unnest(ARRAY['transactions', 'transaction_items']) AS parents(parent)
+    """)
+
+    op.execute(f"INSERT INTO transactions ({TRANSACTION_COLUMNS}) SELECT {TRANSACTION_COLUMNS} FROM transactions_legacy")
+    op.execute(f"""
+        INSERT INTO transaction_items ({ITEM_COLUMNS})
+        SELECT ti.id, ti.transaction_id, t.transaction_date, ti.product_id, ti.quantity,
+               ti.price_per_unit, ti.discount_per_unit, ti.subtotal, ti.created_at
+        FROM transaction_items_legacy ti
+        JOIN transactions_legacy t ON t.id = ti.transaction_id
+    """)
+
+    op.drop_table('transaction_items_legacy')
+    op.drop_table('transactions_legacy')
+
+    for statement in ROLLUP_DDL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_rollup_triggers()
+
+    op.create_table('transactions_heap',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('transaction_number', sa.String(length=50), nullable=False),
+    sa.Column('transaction_date', sa.Date(), nullable=False),
+    sa.Column('customer_id', sa.UUID(), nullable=False),
+    sa.Column('subtotal', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('tax_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('discount_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], name='transactions_customer_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='transactions_heap_pkey')
+    )
+    op.execute(f"INSERT INTO transactions_heap ({TRANSACTION_COLUMNS}) SELECT {TRANSACTION_COLUMNS} FROM transactions")
+
+    op.create_table('transaction_items_heap',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('transaction_id', sa.UUID(), nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('price_per_unit', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('discount_per_unit', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('subtotal', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transactions_heap.id'], name='transaction_items_transaction_id_fkey'),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], name='transaction_items_product_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='transaction_items_heap_pkey')
+    )
+    op.execute("""
+        INSERT INTO transaction_items_heap (id, transaction_id, product_id, quantity, price_per_unit, discount_per_unit, subtotal, created_at)
+        SELECT id, transaction_id, product_id, quantity, price_per_unit, discount_per_unit, subtotal, created_at
+        FROM transaction_items
+    """)
+
+    # Dropping the parents drops every monthly partition with them
+    op.drop_table('transaction_items')
+    op.drop_table('transactions')
+    op.execute("DROP FUNCTION IF EXISTS create_monthly_partitions(text, date, date)")
+
+    op.rename_table('transactions_heap', 'transactions')
+    op.rename_table('transaction_items_heap', 'transaction_items')
+    op.execute("ALTER INDEX transactions_heap_pkey RENAME TO transactions_pkey")
+    op.execute("ALTER INDEX transaction_items_heap_pkey RENAME TO transaction_items_pkey")
+    op.create_index(op.f('ix_transactions_transaction_date'), 'transactions', ['transaction_date'], unique=False)
+    op.create_index(op.f('ix_transactions_transaction_number'), 'transactions', ['transaction_number'], unique=True)
+
+    # Restore the pre-partitioning rollup functions from the previous revision
+    previous = context.script.get_revision(down_revision).module
+    for statement in (
+        previous.APPLY_ROLLUP_FUNCTION,
+        previous.ITEM_TRIGGER_FUNCTION,
+        previous.TRANSACTION_TRIGGER_FUNCTION,
+        previous.ITEM_TRIGGER,
+        previous.TRANSACTION_TRIGGER,
+    ):
+        op.execute(statement)
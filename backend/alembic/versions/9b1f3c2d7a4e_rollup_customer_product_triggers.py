@@ -0,0 +1,109 @@
+"""move rollup rows when customer or product keys change
+
+Revision ID: 9b1f3c2d7a4e
+Revises: 6ed2d7da926b
+Create Date: 2026-10-17 09:05:12.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1f3c2d7a4e'
+down_revision: Union[str, Sequence[str], None] = '6ed2d7da926b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CUSTOMER_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_customer_trigger() RETURNS trigger AS $$
+DECLARE
+    v_row record;
+BEGIN
+    IF OLD.age IS NOT DISTINCT FROM NEW.age AND OLD.gender IS NOT DISTINCT FROM NEW.gender THEN
+        RETURN NULL;
+    END IF;
+
+    -- Other customers share the same age/gender buckets: move this customer's share only
+    FOR v_row IN
+        SELECT t.transaction_date, COUNT(*) AS order_count, SUM(t.total_amount) AS revenue
+          FROM transactions t
+         WHERE t.customer_id = NEW.id
+         GROUP BY t.transaction_date
+    LOOP
+        PERFORM daily_sales_rollup_apply(
+            v_row.transaction_date, NULL, NULL, OLD.age, OLD.gender,
+            0, 0, -v_row.order_count, -v_row.revenue
+        );
+        PERFORM daily_sales_rollup_apply(
+            v_row.transaction_date, NULL, NULL, NEW.age, NEW.gender,
+            0, 0, v_row.order_count, v_row.revenue
+        );
+    END LOOP;
+
+    FOR v_row IN
+        SELECT ti.transaction_date, ti.product_id, p.category_id,
+               SUM(ti.quantity) AS quantity, SUM(ti.subtotal) AS sales_amount
+          FROM transactions t
+          JOIN transaction_items ti ON ti.transaction_id = t.id AND ti.transaction_date = t.transaction_date
+          JOIN products p ON p.id = ti.product_id
+         WHERE t.customer_id = NEW.id
+         GROUP BY ti.transaction_date, ti.product_id, p.category_id
+    LOOP
+        PERFORM daily_sales_rollup_apply(
+            v_row.transaction_date, v_row.product_id, v_row.category_id, OLD.age, OLD.gender,
+            -v_row.quantity, -v_row.sales_amount, 0, 0
+        );
+        PERFORM daily_sales_rollup_apply(
+            v_row.transaction_date, v_row.product_id, v_row.category_id, NEW.age, NEW.gender,
+            v_row.quantity, v_row.sales_amount, 0, 0
+        );
+    END LOOP;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PRODUCT_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_product_trigger() RETURNS trigger AS $$
+BEGIN
+    -- Every row of a product carries its category, so relabelling them can't collide
+    IF OLD.category_id IS DISTINCT FROM NEW.category_id THEN
+        UPDATE daily_sales_rollup
+           SET category_id = NEW.category_id, updated_at = now()
+         WHERE product_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CUSTOMER_TRIGGER = """
+CREATE OR REPLACE TRIGGER trg_daily_sales_rollup_customers
+AFTER UPDATE OF age, gender ON customers
+FOR EACH ROW EXECUTE FUNCTION daily_sales_rollup_customer_trigger();
+"""
+
+PRODUCT_TRIGGER = """
+CREATE OR REPLACE TRIGGER trg_daily_sales_rollup_products
+AFTER UPDATE OF category_id ON products
+FOR EACH ROW EXECUTE FUNCTION daily_sales_rollup_product_trigger();
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in (CUSTOMER_TRIGGER_FUNCTION, PRODUCT_TRIGGER_FUNCTION, CUSTOMER_TRIGGER, PRODUCT_TRIGGER):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_daily_sales_rollup_customers ON customers")
+    op.execute("DROP TRIGGER IF EXISTS trg_daily_sales_rollup_products ON products")
+    op.execute("DROP FUNCTION IF EXISTS daily_sales_rollup_customer_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS daily_sales_rollup_product_trigger()")
@@ -0,0 +1,110 @@
+"""reject re-dating and re-assigning a transaction in one update
+
+Revision ID: c4e8a1f05b93
+Revises: 9b1f3c2d7a4e
+Create Date: 2026-10-17 10:41:37.502816
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f05b93'
+down_revision: Union[str, Sequence[str], None] = '9b1f3c2d7a4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRANSACTION_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_transaction_trigger() RETURNS trigger AS $$
+DECLARE
+    v_old_age integer;
+    v_old_gender varchar;
+    v_new_age integer;
+    v_new_gender varchar;
+    v_item record;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT age, gender INTO v_old_age, v_old_gender FROM customers WHERE id = OLD.customer_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT age, gender INTO v_new_age, v_new_gender FROM customers WHERE id = NEW.customer_id;
+    END IF;
+
+    -- Re-dated items are moved by their own trigger under the new customer, which would
+    -- leave their old-customer rows behind: make the caller split the update in two
+    IF TG_OP = 'UPDATE'
+       AND OLD.transaction_date <> NEW.transaction_date
+       AND OLD.customer_id <> NEW.customer_id THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'feature_not_supported',
+            MESSAGE = 'transaction ' || OLD.id || ': update transaction_date and customer_id separately';
+    END IF;
+
+    -- Same day and customer: only the revenue can move
+    IF TG_OP = 'UPDATE'
+       AND OLD.transaction_date = NEW.transaction_date
+       AND OLD.customer_id = NEW.customer_id THEN
+        IF OLD.total_amount <> NEW.total_amount THEN
+            PERFORM daily_sales_rollup_apply(
+                NEW.transaction_date, NULL, NULL, v_new_age, v_new_gender,
+                0, 0, 0, NEW.total_amount - OLD.total_amount
+            );
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM daily_sales_rollup_apply(
+            OLD.transaction_date, NULL, NULL, v_old_age, v_old_gender,
+            0, 0, -1, -OLD.total_amount
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM daily_sales_rollup_apply(
+            NEW.transaction_date, NULL, NULL, v_new_age, v_new_gender,
+            0, 0, 1, NEW.total_amount
+        );
+    END IF;
+
+    -- Re-dated line items follow through ON UPDATE CASCADE and their own trigger, which
+    -- resolves the customer as it is after this update. Move them off the old customer here.
+    -- Changing the date and the customer in one statement is rejected above.
+    IF TG_OP = 'UPDATE' AND OLD.customer_id <> NEW.customer_id THEN
+        FOR v_item IN
+            SELECT ti.product_id, p.category_id, ti.quantity, ti.subtotal
+              FROM transaction_items ti
+              JOIN products p ON p.id = ti.product_id
+             WHERE ti.transaction_id = NEW.id
+               AND ti.transaction_date = NEW.transaction_date
+        LOOP
+            PERFORM daily_sales_rollup_apply(
+                OLD.transaction_date, v_item.product_id, v_item.category_id, v_old_age, v_old_gender,
+                -v_item.quantity, -v_item.subtotal, 0, 0
+            );
+            PERFORM daily_sales_rollup_apply(
+                OLD.transaction_date, v_item.product_id, v_item.category_id, v_new_age, v_new_gender,
+                v_item.quantity, v_item.subtotal, 0, 0
+            );
+        END LOOP;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(TRANSACTION_TRIGGER_FUNCTION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The last revision that defined the function is the partitioning one
+    partitioned = context.script.get_revision('6ed2d7da926b').module
+    op.execute(partitioned.TRANSACTION_TRIGGER_FUNCTION)
@@ -0,0 +1,121 @@
+"""record deleted rollup keys for incremental syncs
+
+Revision ID: d2a7f6b18c50
+Revises: c4e8a1f05b93
+Create Date: 2026-10-17 13:12:48.664120
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7f6b18c50'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f05b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+APPLY_ROLLUP_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_apply(
+    p_sales_date date,
+    p_product_id uuid,
+    p_category_id uuid,
+    p_customer_age integer,
+    p_gender varchar,
+    p_quantity bigint,
+    p_sales_amount numeric,
+    p_order_count bigint,
+    p_revenue numeric
+) RETURNS void AS $$
+DECLARE
+    v_row record;
+BEGIN
+    INSERT INTO daily_sales_rollup AS r (
+        sales_date, product_id, category_id, customer_age, gender,
+        quantity, sales_amount, order_count, revenue, updated_at
+    )
+    VALUES (
+        p_sales_date, p_product_id, p_category_id, p_customer_age, p_gender,
+        p_quantity, p_sales_amount, p_order_count, p_revenue, now()
+    )
+    ON CONFLICT ON CONSTRAINT uq_daily_sales_rollup_key DO UPDATE SET
+        quantity = r.quantity + EXCLUDED.quantity,
+        sales_amount = r.sales_amount + EXCLUDED.sales_amount,
+        order_count = r.order_count + EXCLUDED.order_count,
+        revenue = r.revenue + EXCLUDED.revenue,
+        updated_at = now()
+    RETURNING * INTO v_row;
+
+    -- Drop emptied buckets so reads never see zero rows
+    IF v_row.quantity = 0 AND v_row.order_count = 0
+       AND v_row.sales_amount = 0 AND v_row.revenue = 0 THEN
+        DELETE FROM daily_sales_rollup WHERE id = v_row.id;
+        INSERT INTO daily_sales_rollup_deletions (sales_date, product_id, category_id, customer_age, gender)
+        VALUES (v_row.sales_date, v_row.product_id, v_row.category_id, v_row.customer_age, v_row.gender);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PRODUCT_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_product_trigger() RETURNS trigger AS $$
+BEGIN
+    -- Every row of a product carries its category, so relabelling them can't collide
+    IF OLD.category_id IS DISTINCT FROM NEW.category_id THEN
+        INSERT INTO daily_sales_rollup_deletions (sales_date, product_id, category_id, customer_age, gender)
+        SELECT sales_date, product_id, category_id, customer_age, gender
+          FROM daily_sales_rollup
+         WHERE product_id = NEW.id;
+
+        UPDATE daily_sales_rollup
+           SET category_id = NEW.category_id, updated_at = now()
+         WHERE product_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CHANGES_VIEW = """
+CREATE OR REPLACE VIEW daily_sales_rollup_changes AS
+SELECT sales_date, product_id, category_id, customer_age, gender, updated_at AS changed_at
+FROM daily_sales_rollup
+UNION ALL
+SELECT sales_date, product_id, category_id, customer_age, gender, deleted_at AS changed_at
+FROM daily_sales_rollup_deletions;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'daily_sales_rollup_deletions',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('sales_date', sa.Date(), nullable=False),
+        sa.Column('product_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('category_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('customer_age', sa.Integer(), nullable=True),
+        sa.Column('gender', sa.String(length=10), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_daily_sales_rollup_deletions_deleted_at'), 'daily_sales_rollup_deletions', ['deleted_at'], unique=False)
+
+    for statement in (APPLY_ROLLUP_FUNCTION, PRODUCT_TRIGGER_FUNCTION, CHANGES_VIEW):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP VIEW IF EXISTS daily_sales_rollup_changes")
+
+    # Put back the functions that didn't write tombstones
+    op.execute(context.script.get_revision('6ed2d7da926b').module.APPLY_ROLLUP_FUNCTION)
+    op.execute(context.script.get_revision('9b1f3c2d7a4e').module.PRODUCT_TRIGGER_FUNCTION)
+
+    op.drop_index(op.f('ix_daily_sales_rollup_deletions_deleted_at'), table_name='daily_sales_rollup_deletions')
+    op.drop_table('daily_sales_rollup_deletions')
@@ -0,0 +1,98 @@
+"""notify listeners when the rollup changes
+
+Revision ID: f1d48e6a9c27
+Revises: e5c93b7d2f14
+Create Date: 2026-10-18 11:03:14.905561
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1d48e6a9c27'
+down_revision: Union[str, Sequence[str], None] = 'e5c93b7d2f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+APPLY_ROLLUP_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_apply(
+    p_sales_date date,
+    p_product_id uuid,
+    p_category_id uuid,
+    p_customer_age integer,
+    p_gender varchar,
+    p_quantity bigint,
+    p_sales_amount numeric,
+    p_order_count bigint,
+    p_revenue numeric
+) RETURNS void AS $$
+DECLARE
+    v_row record;
+BEGIN
+    INSERT INTO daily_sales_rollup AS r (
+        sales_date, product_id, category_id, customer_age, gender,
+        quantity, sales_amount, order_count, revenue, updated_at
+    )
+    VALUES (
+        p_sales_date, p_product_id, p_category_id, p_customer_age, p_gender,
+        p_quantity, p_sales_amount, p_order_count, p_revenue, now()
+    )
+    ON CONFLICT ON CONSTRAINT uq_daily_sales_rollup_key DO UPDATE SET
+        quantity = r.quantity + EXCLUDED.quantity,
+        sales_amount = r.sales_amount + EXCLUDED.sales_amount,
+        order_count = r.order_count + EXCLUDED.order_count,
+        revenue = r.revenue + EXCLUDED.revenue,
+        updated_at = now()
+    RETURNING * INTO v_row;
+
+    -- Drop emptied buckets so reads never see zero rows
+    IF v_row.quantity = 0 AND v_row.order_count = 0
+       AND v_row.sales_amount = 0 AND v_row.revenue = 0 THEN
+        DELETE FROM daily_sales_rollup WHERE id = v_row.id;
+        INSERT INTO daily_sales_rollup_deletions (sales_date, product_id, category_id, customer_age, gender)
+        VALUES (v_row.sales_date, v_row.product_id, v_row.category_id, v_row.customer_age, v_row.gender);
+    END IF;
+
+    -- Identical notifications are folded into one per transaction
+    PERFORM pg_notify('analytics_data_changed', '');
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PRODUCT_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_product_trigger() RETURNS trigger AS $$
+BEGIN
+    -- Every row of a product carries its category, so relabelling them can't collide
+    IF OLD.category_id IS DISTINCT FROM NEW.category_id THEN
+        INSERT INTO daily_sales_rollup_deletions (sales_date, product_id, category_id, customer_age, gender)
+        SELECT sales_date, product_id, category_id, customer_age, gender
+          FROM daily_sales_rollup
+         WHERE product_id = NEW.id;
+
+        UPDATE daily_sales_rollup
+           SET category_id = NEW.category_id, updated_at = now()
+         WHERE product_id = NEW.id;
+
+        PERFORM pg_notify('analytics_data_changed', '');
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in (APPLY_ROLLUP_FUNCTION, PRODUCT_TRIGGER_FUNCTION):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    previous = context.script.get_revision('d2a7f6b18c50').module
+    for statement in (previous.APPLY_ROLLUP_FUNCTION, previous.PRODUCT_TRIGGER_FUNCTION):
+        op.execute(statement)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.elastic import get_es_client
-from app.db.postgresql import get_db
+from elasticsearch import AsyncElasticsearch
+from app.db.elastic import get_async_es_client
+from app.db.postgresql import get_db, AsyncSessionLocal
 from app.services.analytics_services import AnalyticsService, get_sales_from_es, get_categories_from_es, get_customers_from_es, get_customers_age_group_from_es
 from app.services.analytics_postgresql import AnalyticsPostgreSQL
 from app.models.global_type import ResponseWrapper
@@ -9,20 +10,35 @@ from typing import Optional
 from datetime import datetime, timedelta
 from fastapi import Query
 from app.services.news_analytics import NewsAnalyticsService
+from app.services.analytics_cache import analytics_cache
+from app.services.scheduler import analytics_scheduler
+from app.core.single_flight import single_flight_group
+from app.dependencies import get_current_user
 
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
-analytics_service = AnalyticsService()
+
+
+def pgsql_compute(method_name: str, start_date: datetime, end_date: datetime):
+    """Cache compute callback; opens its own session so background refreshes outlive the request"""
+    # Cache keys are per day, so the query must see the same day bounds as every request sharing the key
+    start_day, end_day = start_date.date(), end_date.date()
+
+    async def compute():
+        async with AsyncSessionLocal() as session:
+            return await getattr(AnalyticsPostgreSQL(session), method_name)(start_day, end_day)
+    return compute
 
 @router.get("/news")
-def analytics_overview( 
+async def analytics_overview( 
+    es: AsyncElasticsearch = Depends(get_async_es_client),
     search_query: Optional[str] = Query(None, description="Search query"),
     start_date: Optional[datetime] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[datetime] = Query(None, description="End date (YYYY-MM-DD)")
 ):
-    analytics = NewsAnalyticsService()
+    analytics = NewsAnalyticsService(es)
     
-    overview = analytics.get_overview(
+    overview = await analytics.get_overview(
         search_query=search_query,
         start_date=start_date,
         end_date=end_date
@@ -36,20 +52,21 @@ def analytics_overview(
 
 @router.get("/news/recent")
 async def get_recent_news(
+    es: AsyncElasticsearch = Depends(get_async_es_client),
     size: int = Query(10, description="Number of news to retrieve"),
     start_date: Optional[datetime] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[datetime] = Query(None, description="End date (YYYY-MM-DD)"),
     search_query: Optional[str] = Query(None, description="Search query"),
-    search_after: Optional[list] = Query(None, description="Search after")
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ): 
-    analytics = NewsAnalyticsService()
+    analytics = NewsAnalyticsService(es)
     
-    recent_news, next_search_after = analytics.get_recent_news(
+    recent_news, next_cursor = await analytics.get_recent_news(
         size=size,
         start_date=start_date,
         end_date=end_date,
         search_query=search_query,
-        search_after=search_after
+        cursor=cursor
     )
     
     return ResponseWrapper[dict](
@@ -57,27 +74,27 @@ async def get_recent_news(
         message="Successfully retrieved recent news",
         data={
             "items": recent_news,
-            "next_search_after": next_search_after
+            "next_cursor": next_cursor
         }
     )
 
 
 @router.get("/summary")
 async def sales_summary(
-    db: AsyncSession = Depends(get_db),
     start_date: Optional[datetime] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[datetime] = Query(None, description="End date (YYYY-MM-DD)"),
 ):
     try:
-        analytics_service_pgsql = AnalyticsPostgreSQL(db)
-        
         if not start_date:
             start_date = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
         
         if not end_date:
             end_date = datetime.utcnow()
         
-        data = await analytics_service_pgsql.get_period_summary_data(start_date, end_date)
+        data = await analytics_cache.get_or_compute(
+            "summary", start_date, end_date,
+            pgsql_compute("get_period_summary_data", start_date, end_date)
+        )
         
         return data
         
@@ -91,14 +108,10 @@ async def sales_summary(
 
 @router.get("/sales")
 async def sales_analytics(
-    sync_first: bool = True,
-    db: AsyncSession = Depends(get_db)
+    es: AsyncElasticsearch = Depends(get_async_es_client)
 ):
     try:
-        if sync_first:
-            synced_count = await analytics_service.sync_sales_analytics()
-
-        data = await get_sales_from_es()
+        data = await get_sales_from_es(es)
         
         return ResponseWrapper[dict](
             status="success",
@@ -124,18 +137,18 @@ async def sales_analytics(
 async def sales_analytics_pgsql(
     start_date: Optional[datetime] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[datetime] = Query(None, description="End date (YYYY-MM-DD)"),
-    db: AsyncSession = Depends(get_db)
 ):
     try:
-        analytics_service_pgsql = AnalyticsPostgreSQL(db)
-        
         if not start_date:
             start_date = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
         
         if not end_date:
             end_date = datetime.utcnow()
         
-        data = await analytics_service_pgsql.get_sales_trend_data(start_date, end_date)
+        data = await analytics_cache.get_or_compute(
+            "sales-pgsql", start_date, end_date,
+            pgsql_compute("get_sales_trend_data", start_date, end_date)
+        )
         
         return data
         
@@ -144,24 +157,23 @@ async def sales_analytics_pgsql(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
         )
-        
 
 @router.get("/products")
 async def categories_sales_analytics_pgsql(
     start_date: Optional[datetime] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[datetime] = Query(None, description="End date (YYYY-MM-DD)"),
-    db: AsyncSession = Depends(get_db)
 ):
     try:
-        analytics_service_pgsql = AnalyticsPostgreSQL(db)
-        
         if not start_date:
             start_date = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
         
         if not end_date:
             end_date = datetime.utcnow()
         
-        data = await analytics_service_pgsql.get_product_analytics_data(start_date, end_date)
+        data = await analytics_cache.get_or_compute(
+            "products", start_date, end_date,
+            pgsql_compute("get_product_analytics_data", start_date, end_date)
+        )
         
         return data
         
@@ -173,19 +185,20 @@ async def categories_sales_analytics_pgsql(
 
 @router.get("/customers")
 async def get_customers_analytics(
-    db: AsyncSession = Depends(get_db),
     start_date: Optional[datetime] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[datetime] = Query(None, description="End date (YYYY-MM-DD)"),
 ):
     try:
-        analytics_service_pgsql = AnalyticsPostgreSQL(db)
         if not start_date:
             start_date = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
         
         if not end_date:
             end_date = datetime.utcnow()
         
-        data = await analytics_service_pgsql.get_customers_analytics_data(start_date, end_date)
+        data = await analytics_cache.get_or_compute(
+            "customers", start_date, end_date,
+            pgsql_compute("get_customers_analytics_data", start_date, end_date)
+        )
         
         return data
         
@@ -194,6 +207,43 @@ async def get_customers_analytics(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
         )
+
+# Operational endpoints: they expose internals or start work, so only signed-in users get them
+@router.get("/sync/status", dependencies=[Depends(get_current_user)])
+async def analytics_sync_status():
+    return ResponseWrapper[dict](
+        status="success",
+        message="Successfully retrieved analytics sync status",
+        data={**analytics_scheduler.get_status(), "single_flight": single_flight_group.stats}
+    )
+
+@router.post("/sync", dependencies=[Depends(get_current_user)])
+async def trigger_analytics_sync(
+    job: Optional[str] = Query(None, description="Job to run now; all jobs when omitted")
+):
+    try:
+        triggered = analytics_scheduler.trigger(job)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown sync job: {job}"
+        )
+
+    return ResponseWrapper[dict](
+        status="success",
+        message=f"Triggered {len(triggered)} sync job(s)",
+        data={"jobs": triggered}
+    )
+
+@router.get("/cache/stats", dependencies=[Depends(get_current_user)])
+async def analytics_cache_stats():
+    stats = await analytics_cache.get_stats()
+    
+    return ResponseWrapper[dict](
+        status="success",
+        message="Successfully retrieved analytics cache statistics",
+        data=stats
+    )
         
 
 
@@ -201,14 +251,10 @@ async def get_customers_analytics(
         
 @router.get("/categories")
 async def categories_analytics(
-    sync_first: bool = True,
-    db: AsyncSession = Depends(get_db)
+    es: AsyncElasticsearch = Depends(get_async_es_client)
 ):
     try:
-        if sync_first:
-            synced_count = await analytics_service.sync_categories_analytics()
-
-        data = await get_categories_from_es()
+        data = await get_categories_from_es(es)
         
         return ResponseWrapper[dict](
             status="success",
@@ -232,14 +278,10 @@ async def categories_analytics(
         
 @router.get("/customers/age-group")
 async def customers_age_group_analytics(
-    sync_first: bool = True,
-    db: AsyncSession = Depends(get_db)
+    es: AsyncElasticsearch = Depends(get_async_es_client)
 ):
     try:
-        if sync_first:
-            synced_count = await analytics_service.sync_customers_age_group_analytics()
-        
-        data = await get_customers_age_group_from_es()
+        data = await get_customers_age_group_from_es(es)
         
         return ResponseWrapper[dict](
             status="success",
@@ -258,14 +300,10 @@ async def customers_age_group_analytics(
         
 @router.get("/customers/gender")
 async def customers_analytics(
-    sync_first: bool = True,
-    db: AsyncSession = Depends(get_db)
+    es: AsyncElasticsearch = Depends(get_async_es_client)
 ):
     try:
-        if sync_first:
-            synced_count = await analytics_service.sync_customers_analytics()
-        
-        data = await get_customers_from_es()
+        data = await get_customers_from_es(es)
         
         return ResponseWrapper[dict](
             status="success",
@@ -7,6 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.postgresql import get_db
 from fastapi import Depends
 from datetime import datetime
+from elasticsearch import AsyncElasticsearch
+from app.db.elastic import get_async_es_client
 
 
 router = APIRouter(prefix='/transactions', tags=['transactions'])
@@ -14,6 +16,7 @@ router = APIRouter(prefix='/transactions', tags=['transactions'])
 @router.get('')
 async def get_transactions(
     db: AsyncSession = Depends(get_db),
+    es: AsyncElasticsearch = Depends(get_async_es_client),
     page: int = Query(1, ge=1),
     page_size: int = Query(5, ge=1),
     search_query: str = Query(None),
@@ -21,7 +24,7 @@ async def get_transactions(
     max_date: datetime = Query(None),
 ):
     try:
-        service = TransactionsServices(db)
+        service = TransactionsServices(db, es)
         transactions= await service.get_transactions_data(
             session=db,
             page=page,
@@ -25,4 +25,12 @@ async def get_oauth_state(state: str) -> str | None:
     
 async def delete_oauth_state(state:str):
     key = f"oauth_state:{state}"
-    await redis_client.delete(key)
\ No newline at end of file
+    await redis_client.delete(key)
+
+ANALYTICS_EPOCH_KEY = "analytics:data_epoch"
+
+async def get_data_epoch() -> int:
+    return int(await redis_client.get(ANALYTICS_EPOCH_KEY) or 0)
+
+async def bump_data_epoch() -> int:
+    return await redis_client.incr(ANALYTICS_EPOCH_KEY)
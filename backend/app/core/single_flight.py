@@ -0,0 +1,148 @@
+import asyncio
+import functools
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.redis_utils import redis_client
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_PREFIX = "single_flight"
+
+# Delete the lock only if we still own it; a lock that expired mid-run may belong to another worker now
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Extend the lock only while we still own it, for the same reason
+RENEW_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls so the work runs once.
+
+    Within a worker, callers of the same key await one shared task. Across uvicorn
+    workers, a Redis lock elects one runner; the others poll for the result it publishes
+    and only run the work themselves if the runner disappears without one. The runner
+    renews the lock every ``lock_ttl / 3`` seconds, so long calls keep it and a crashed
+    runner's lock lapses within ``lock_ttl``.
+    """
+
+    def __init__(
+        self,
+        lock_ttl: float = 30,
+        result_ttl: float = 5,
+        poll_interval: float = 0.05,
+    ):
+        self.redis = redis_client
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.stats = {"runs": 0, "local_joins": 0, "remote_joins": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_distributed(key, fn))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.stats["local_joins"] += 1
+
+        # One caller going away (client disconnect) must not cancel the work for the others
+        return await asyncio.shield(task)
+
+    async def _run_distributed(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        lock_key = f"{SINGLE_FLIGHT_PREFIX}:lock:{key}"
+        result_key = f"{SINGLE_FLIGHT_PREFIX}:result:{key}"
+        token = uuid.uuid4().hex
+
+        while True:
+            try:
+                acquired = await self.redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+            except Exception as e:
+                logger.warning(f"⚠️ Single-flight lock unavailable for {key}, running locally: {str(e)}")
+                return await self._run(fn)
+
+            if acquired:
+                keeper = asyncio.create_task(self._keep_lock(key, lock_key, token))
+                try:
+                    result = jsonable_encoder(await self._run(fn))
+                    await self.redis.set(result_key, json.dumps(result), px=int(self.result_ttl * 1000))
+                    return result
+                finally:
+                    keeper.cancel()
+                    await asyncio.gather(keeper, return_exceptions=True)
+                    try:
+                        await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Could not release single-flight lock {key}: {str(e)}")
+
+            # Another worker holds the lock: wait for its result, or for the lock to go away
+            try:
+                while await self.redis.exists(lock_key):
+                    await asyncio.sleep(self.poll_interval)
+                raw = await self.redis.get(result_key)
+            except Exception as e:
+                logger.warning(f"⚠️ Lost Redis while waiting on {key}, running locally: {str(e)}")
+                return await self._run(fn)
+
+            if raw is not None:
+                self.stats["remote_joins"] += 1
+                return json.loads(raw)
+            # The runner failed or expired without publishing; compete for the lock again
+
+    async def _keep_lock(self, key: str, lock_key: str, token: str) -> None:
+        """Push the lock's expiry forward while the call runs"""
+        while True:
+            await asyncio.sleep(self.lock_ttl / 3)
+            try:
+                renewed = await self.redis.eval(RENEW_LOCK_SCRIPT, 1, lock_key, token, int(self.lock_ttl * 1000))
+            except Exception as e:
+                # Keep trying: the lock is still ours until it expires
+                logger.warning(f"⚠️ Could not renew single-flight lock {key}: {str(e)}")
+                continue
+            if not renewed:
+                logger.warning(f"⚠️ Single-flight lock {key} expired mid-run; another worker may run it too")
+                return
+
+    async def _run(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats["runs"] += 1
+        return await fn()
+
+
+single_flight_group = SingleFlight()
+
+
+def _key_part(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def single_flight(name: str):
+    """Decorator: coalesce concurrent calls that share ``name`` and the same simple arguments.
+
+    Arguments that are not plain values (``self``, clients, sessions) are left out of the key.
+    Results must be JSON-serialisable, since other workers receive them through Redis.
+    """
+    def decorator(fn: Callable[..., Awaitable[Any]]):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            parts = [repr(arg) for arg in args if _key_part(arg)]
+            parts += [f"{k}={v!r}" for k, v in sorted(kwargs.items()) if _key_part(v)]
+            key = ":".join([name, *parts])
+            return await single_flight_group.do(key, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
@@ -1,6 +1,37 @@
-from elasticsearch import Elasticsearch
+# app/db/elastic.py
+from typing import Optional
 
-es = Elasticsearch("http://localhost:9200")
+from elasticsearch import AsyncElasticsearch
+from app.core.config import settings
 
-def get_es_client():
-    return es
+# One pooled async client per process, opened and closed by the app lifespan
+_async_es_client: Optional[AsyncElasticsearch] = None
+
+
+def create_async_es_client() -> AsyncElasticsearch:
+    return AsyncElasticsearch(
+        settings.ELASTICSEARCH_URL,
+        connections_per_node=settings.ES_CONNECTIONS_PER_NODE,
+        request_timeout=settings.ES_REQUEST_TIMEOUT,
+        max_retries=settings.ES_MAX_RETRIES,
+        retry_on_timeout=True,
+    )
+
+
+async def init_async_es_client() -> AsyncElasticsearch:
+    global _async_es_client
+    if _async_es_client is None:
+        _async_es_client = create_async_es_client()
+    return _async_es_client
+
+
+async def get_async_es_client() -> AsyncElasticsearch:
+    """Shared async client; also usable as a FastAPI dependency and from standalone scripts"""
+    return await init_async_es_client()
+
+
+async def close_async_es_client() -> None:
+    global _async_es_client
+    if _async_es_client is not None:
+        await _async_es_client.close()
+        _async_es_client = None
@@ -0,0 +1,231 @@
+# app/db/news_indices.py
+# Time-based news indices: one index per publish month, <alias>-<version>-YYYY-MM, all
+# behind the <alias> read alias. Articles without a publish_date go to <alias>-<version>-undated.
+#
+# Every import builds a new version next to the one being served, then swaps the alias
+# over in one atomic update, so readers never see a half-loaded or missing index. The
+# index template applies the mapping to each monthly index as the import auto-creates it.
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from elasticsearch import AsyncElasticsearch, NotFoundError
+
+NEWS_ALIAS = "news"
+UNDATED_SUFFIX = "undated"
+MONTH_SUFFIX_RE = re.compile(r"-(\d{4}-\d{2})$")
+
+# Settings while an import is loading a new version: no replica copies, no periodic refresh
+NEWS_BUILD_SETTINGS = {"number_of_replicas": 0, "refresh_interval": "-1"}
+
+# How long the list of existing monthly indices is trusted before asking ES again
+EXISTING_INDICES_TTL_SECONDS = 60
+
+NEWS_INDEX_SETTINGS = {
+    # Segments are stored newest-first, so the recent feed (publish_date desc) can stop
+    # collecting after the first page's worth of hits instead of visiting every match
+    "index": {
+        "sort.field": "publish_date",
+        "sort.order": "desc"
+    },
+    "analysis": {
+        "analyzer": {
+            "indonesian_custom": {
+                "tokenizer": "standard",
+                "filter": ["lowercase", "indonesian_stop"]
+            }
+        },
+        "filter": {
+            "indonesian_stop": {
+                "type": "stop",
+                "stopwords": "_indonesian_"
+            }
+        }
+    }
+}
+
+NEWS_MAPPINGS = {
+    "properties": {
+        "title": {
+            "type": "text",
+            "fields": {
+                "keyword": {"type": "keyword"},
+                "indonesian_words": {"type": "text", "analyzer": "indonesian_custom"}
+            }
+        },
+        "author": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
+        "publish_date": {"type": "date", "format": "strict_date_optional_time||yyyy-MM-dd||yyyy-MM-dd HH:mm:ss||epoch_millis"},
+        "article_text": {
+            "type": "text",
+            "fields": {
+                "indonesian_words": {"type": "text", "analyzer": "indonesian_custom"}
+            }
+        },
+        # Extracted at import time; terms aggregations read doc_values instead of fielddata
+        "title_keywords": {"type": "keyword"},
+        "article_keywords": {"type": "keyword"},
+        "url": {"type": "keyword"},
+        "main_image": {"type": "keyword"},
+        "tag": {"type": "keyword"}
+    }
+}
+
+# Per-day article counts, per day overall and per day by tag and by author. Each doc carries
+# _doc_count, so terms and date_histogram aggregations over it count articles, not rollup rows.
+NEWS_ROLLUP_INDEX = "news_daily_rollup"
+NEWS_ROLLUP_MAPPING = {
+    "mappings": {
+        "properties": {
+            "publish_date": {"type": "date"},
+            "kind": {"type": "keyword"},
+            "tag": {"type": "keyword"},
+            "author": {"type": "keyword"}
+        }
+    },
+    "settings": {"number_of_shards": 1, "number_of_replicas": 0},
+}
+
+
+def news_index_template(alias: str = NEWS_ALIAS, version: Optional[str] = None) -> Dict[str, Any]:
+    """Template for <alias>-* indices, which join the alias as soon as they are created.
+
+    With ``version`` it is the build template for that version only (<alias>-<version>-*):
+    bulk-load settings, no alias until the import swaps it in. It takes priority over the
+    serving template, which keeps applying to every other index.
+    """
+    if version:
+        return {
+            "index_patterns": [f"{alias}-{version}-*"],
+            "template": {"settings": {**NEWS_INDEX_SETTINGS, **NEWS_BUILD_SETTINGS}, "mappings": NEWS_MAPPINGS},
+            "priority": 200,
+        }
+    return {
+        "index_patterns": [f"{alias}-*"],
+        "template": {"settings": NEWS_INDEX_SETTINGS, "mappings": NEWS_MAPPINGS, "aliases": {alias: {}}},
+        "priority": 100,
+    }
+
+
+def build_template_name(alias: str, version: str) -> str:
+    return f"{alias}-{version}"
+
+
+def new_version() -> str:
+    return datetime.now(timezone.utc).strftime("v%Y%m%d%H%M%S")
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive datetimes are treated as UTC, the same way ES reads them in range queries
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def monthly_index_name(publish_date: Optional[datetime], alias: str = NEWS_ALIAS, version: Optional[str] = None) -> str:
+    prefix = f"{alias}-{version}" if version else alias
+    if publish_date is None:
+        return f"{prefix}-{UNDATED_SUFFIX}"
+    return f"{prefix}-{_as_utc(publish_date):%Y-%m}"
+
+
+def indices_for_range(
+    existing: List[str],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    alias: str = NEWS_ALIAS,
+) -> List[str]:
+    """Existing monthly indices that can hold documents between start_date and end_date.
+
+    Returns ``[alias]`` when the range is unbounded or nothing overlaps, so the search still
+    runs against a valid target and returns its normal (empty) response shape.
+    """
+    if not (start_date or end_date):
+        return [alias]
+
+    low = f"{_as_utc(start_date):%Y-%m}" if start_date else None
+    high = f"{_as_utc(end_date):%Y-%m}" if end_date else None
+
+    selected = []
+    for name in sorted(existing):
+        match = MONTH_SUFFIX_RE.search(name)
+        if not name.startswith(f"{alias}-") or not match:
+            continue
+        # Zero-padded YYYY-MM strings compare chronologically
+        month = match.group(1)
+        if (low is None or month >= low) and (high is None or month <= high):
+            selected.append(name)
+    return selected or [alias]
+
+
+_existing_cache: Dict[str, Any] = {}
+
+
+async def existing_news_indices(es: AsyncElasticsearch, alias: str = NEWS_ALIAS) -> List[str]:
+    """Concrete indices behind the alias, cached briefly per process"""
+    cached = _existing_cache.get(alias)
+    if cached and time.monotonic() - cached[0] < EXISTING_INDICES_TTL_SECONDS:
+        return cached[1]
+
+    try:
+        resp = await es.indices.get_alias(name=alias)
+        names = sorted(resp.keys())
+    except NotFoundError:
+        names = []
+
+    _existing_cache[alias] = (time.monotonic(), names)
+    return names
+
+
+def forget_news_indices(alias: str = NEWS_ALIAS) -> None:
+    """Drop the cached index list, e.g. after the alias moved or a cached name turned out missing"""
+    _existing_cache.pop(alias, None)
+
+
+async def swap_aliases(es: AsyncElasticsearch, targets: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Point every alias at exactly its new indices in one atomic update; returns the indices each left.
+
+    A concrete index still carrying an alias's own name (the layout before aliases) is
+    dropped in the same update, since the alias can't be created next to it.
+    """
+    actions: List[Dict[str, Any]] = []
+    left: Dict[str, List[str]] = {}
+    for alias, new_indices in targets.items():
+        try:
+            current = sorted((await es.indices.get_alias(name=alias)).keys())
+        except NotFoundError:
+            current = []
+
+        left[alias] = [name for name in current if name not in new_indices]
+        actions += [{"remove": {"index": name, "alias": alias}} for name in left[alias]]
+        if await es.indices.exists(index=alias) and not await es.indices.exists_alias(name=alias):
+            actions.append({"remove_index": {"index": alias}})
+        actions += [{"add": {"index": name, "alias": alias}} for name in new_indices]
+
+    await es.indices.update_aliases(actions=actions)
+    for alias in targets:
+        forget_news_indices(alias)
+    return left
+
+
+async def swap_alias(es: AsyncElasticsearch, alias: str, new_indices: List[str]) -> List[str]:
+    """Point ``alias`` at exactly ``new_indices`` in one atomic update; returns the indices it left"""
+    return (await swap_aliases(es, {alias: new_indices}))[alias]
+
+
+async def delete_stale_indices(es: AsyncElasticsearch, alias: str, keep: List[str]) -> List[str]:
+    """Delete <alias>-* indices that aren't behind the alias and aren't in ``keep``.
+
+    Also clears out versions abandoned by imports that never reached their swap.
+    """
+    try:
+        serving = set((await es.indices.get_alias(name=alias)).keys())
+    except NotFoundError:
+        serving = set()
+
+    candidates = (await es.indices.get(index=f"{alias}-*")).keys()
+    stale = sorted(name for name in candidates if name not in serving and name not in keep)
+    if stale:
+        await es.indices.delete(index=",".join(stale))
+        forget_news_indices(alias)
+    return stale
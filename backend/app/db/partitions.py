@@ -0,0 +1,62 @@
+# app/db/partitions.py
+# Monthly range partitions for transactions and transaction_items.
+#
+# create_monthly_partitions() lives in the database so migrations, the app and
+# external schedulers all create partitions the same way: <parent>_yYYYYmMM,
+# covering [first day of month, first day of next month).
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PARTITIONED_TABLES = ["transactions", "transaction_items"]
+
+CREATE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_monthly_partitions(p_parent text, p_from date, p_to date)
+RETURNS integer AS $$
+DECLARE
+    v_month date := date_trunc('month', p_from)::date;
+    v_next date;
+    v_name text;
+    v_created integer := 0;
+BEGIN
+    WHILE v_month <= p_to LOOP
+        v_next := (v_month + interval '1 month')::date;
+        v_name := p_parent || '_y' || to_char(v_month, 'YYYY') || 'm' || to_char(v_month, 'MM');
+
+        IF to_regclass(v_name) IS NULL THEN
+            EXECUTE 'CREATE TABLE ' || quote_ident(v_name)
+                 || ' PARTITION OF ' || quote_ident(p_parent)
+                 || ' FOR VALUES FROM (' || quote_literal(v_month) || ') TO (' || quote_literal(v_next) || ')';
+            v_created := v_created + 1;
+        END IF;
+
+        v_month := v_next;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PARTITION_DDL = [CREATE_PARTITIONS_FUNCTION]
+
+
+def ensure_monthly_partitions(connection: Connection, start: date, end: date) -> int:
+    """Create any missing monthly partitions between start and end for every partitioned table.
+
+    Works on a sync connection; async callers go through ``await conn.run_sync(...)``.
+    """
+    created = 0
+    for table in PARTITIONED_TABLES:
+        created += connection.execute(
+            text("SELECT create_monthly_partitions(:parent, :start, :end)"),
+            {"parent": table, "start": start, "end": end},
+        ).scalar()
+    return created
+
+
+def ensure_upcoming_partitions(connection: Connection, months_ahead: int) -> int:
+    """Keep partitions ready from the current month through ``months_ahead`` months out"""
+    today = date.today()
+    return ensure_monthly_partitions(connection, today, today + relativedelta(months=months_ahead))
@@ -0,0 +1,344 @@
+# app/db/rollup.py
+# Trigger maintenance for daily_sales_rollup.
+#
+# Item rows (product_id/category_id set) carry quantity and line-item sales,
+# order rows (product_id/category_id NULL) carry order count and transaction
+# revenue. Writes to transactions/transaction_items apply signed deltas to the
+# matching row, so the rollup never needs a full recompute after the backfill.
+# The keys also copy customers.age/gender and products.category_id, so changes
+# to those columns move the affected rows to their new keys.
+#
+# Keys that disappear (emptied or relabelled rows) are written to
+# daily_sales_rollup_deletions, and daily_sales_rollup_changes stamps both, so
+# incremental syncs also see the buckets that lost rows.
+#
+# Every change also sends a NOTIFY on DATA_CHANGED_CHANNEL, delivered once per
+# committed transaction, so caches hear about writes from any client.
+
+# Channel name used by the SQL below
+DATA_CHANGED_CHANNEL = "analytics_data_changed"
+
+APPLY_ROLLUP_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_apply(
+    p_sales_date date,
+    p_product_id uuid,
+    p_category_id uuid,
+    p_customer_age integer,
+    p_gender varchar,
+    p_quantity bigint,
+    p_sales_amount numeric,
+    p_order_count bigint,
+    p_revenue numeric
+) RETURNS void AS $$
+DECLARE
+    v_row record;
+BEGIN
+    INSERT INTO daily_sales_rollup AS r (
+        sales_date, product_id, category_id, customer_age, gender,
+        quantity, sales_amount, order_count, revenue, updated_at
+    )
+    VALUES (
+        p_sales_date, p_product_id, p_category_id, p_customer_age, p_gender,
+        p_quantity, p_sales_amount, p_order_count, p_revenue, now()
+    )
+    ON CONFLICT ON CONSTRAINT uq_daily_sales_rollup_key DO UPDATE SET
+        quantity = r.quantity + EXCLUDED.quantity,
+        sales_amount = r.sales_amount + EXCLUDED.sales_amount,
+        order_count = r.order_count + EXCLUDED.order_count,
+        revenue = r.revenue + EXCLUDED.revenue,
+        updated_at = now()
+    RETURNING * INTO v_row;
+
+    -- Drop emptied buckets so reads never see zero rows
+    IF v_row.quantity = 0 AND v_row.order_count = 0
+       AND v_row.sales_amount = 0 AND v_row.revenue = 0 THEN
+        DELETE FROM daily_sales_rollup WHERE id = v_row.id;
+        INSERT INTO daily_sales_rollup_deletions (sales_date, product_id, category_id, customer_age, gender)
+        VALUES (v_row.sales_date, v_row.product_id, v_row.category_id, v_row.customer_age, v_row.gender);
+    END IF;
+
+    -- Identical notifications are folded into one per transaction
+    PERFORM pg_notify('analytics_data_changed', '');
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ITEM_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_item_trigger() RETURNS trigger AS $$
+DECLARE
+    v_customer_age integer;
+    v_gender varchar;
+    v_category_id uuid;
+BEGIN
+    -- Items carry their own transaction_date; only the customer is looked up. The
+    -- OLD side matches on id alone because a cascaded re-date has already moved the parent.
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT c.age, c.gender
+          INTO v_customer_age, v_gender
+          FROM transactions t
+          JOIN customers c ON c.id = t.customer_id
+         WHERE t.id = OLD.transaction_id;
+
+        IF FOUND THEN
+            SELECT p.category_id INTO v_category_id FROM products p WHERE p.id = OLD.product_id;
+            PERFORM daily_sales_rollup_apply(
+                OLD.transaction_date, OLD.product_id, v_category_id, v_customer_age, v_gender,
+                -OLD.quantity, -OLD.subtotal, 0, 0
+            );
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT c.age, c.gender
+          INTO v_customer_age, v_gender
+          FROM transactions t
+          JOIN customers c ON c.id = t.customer_id
+         WHERE t.id = NEW.transaction_id
+           AND t.transaction_date = NEW.transaction_date;
+        SELECT p.category_id INTO v_category_id FROM products p WHERE p.id = NEW.product_id;
+
+        PERFORM daily_sales_rollup_apply(
+            NEW.transaction_date, NEW.product_id, v_category_id, v_customer_age, v_gender,
+            NEW.quantity, NEW.subtotal, 0, 0
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRANSACTION_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_transaction_trigger() RETURNS trigger AS $$
+DECLARE
+    v_old_age integer;
+    v_old_gender varchar;
+    v_new_age integer;
+    v_new_gender varchar;
+    v_item record;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT age, gender INTO v_old_age, v_old_gender FROM customers WHERE id = OLD.customer_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT age, gender INTO v_new_age, v_new_gender FROM customers WHERE id = NEW.customer_id;
+    END IF;
+
+    -- Same day and customer: only the revenue can move
+    IF TG_OP = 'UPDATE'
+       AND OLD.transaction_date = NEW.transaction_date
+       AND OLD.customer_id = NEW.customer_id THEN
+        IF OLD.total_amount <> NEW.total_amount THEN
+            PERFORM daily_sales_rollup_apply(
+                NEW.transaction_date, NULL, NULL, v_new_age, v_new_gender,
+                0, 0, 0, NEW.total_amount - OLD.total_amount
+            );
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM daily_sales_rollup_apply(
+            OLD.transaction_date, NULL, NULL, v_old_age, v_old_gender,
+            0, 0, -1, -OLD.total_amount
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM daily_sales_rollup_apply(
+            NEW.transaction_date, NULL, NULL, v_new_age, v_new_gender,
+            0, 0, 1, NEW.total_amount
+        );
+    END IF;
+
+    -- Re-dated line items follow through ON UPDATE CASCADE and their own trigger, which
+    -- resolves the customer as it is after this update. Move them off the old customer here.
+    -- Changing the date and the customer in one statement is rejected by the guard below.
+    IF TG_OP = 'UPDATE' AND OLD.customer_id <> NEW.customer_id THEN
+        FOR v_item IN
+            SELECT ti.product_id, p.category_id, ti.quantity, ti.subtotal
+              FROM transaction_items ti
+              JOIN products p ON p.id = ti.product_id
+             WHERE ti.transaction_id = NEW.id
+               AND ti.transaction_date = NEW.transaction_date
+        LOOP
+            PERFORM daily_sales_rollup_apply(
+                OLD.transaction_date, v_item.product_id, v_item.category_id, v_old_age, v_old_gender,
+                -v_item.quantity, -v_item.subtotal, 0, 0
+            );
+            PERFORM daily_sales_rollup_apply(
+                OLD.transaction_date, v_item.product_id, v_item.category_id, v_new_age, v_new_gender,
+                v_item.quantity, v_item.subtotal, 0, 0
+            );
+        END LOOP;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# A re-date into another month is run as DELETE + INSERT, so AFTER UPDATE never sees it, and
+# the cascaded items would be taken off the new customer's buckets. BEFORE UPDATE still
+# fires on the source partition, so the combined change is rejected here.
+TRANSACTION_GUARD_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_transaction_guard() RETURNS trigger AS $$
+BEGIN
+    IF OLD.transaction_date <> NEW.transaction_date AND OLD.customer_id <> NEW.customer_id THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'feature_not_supported',
+            MESSAGE = 'transaction ' || OLD.id || ': update transaction_date and customer_id separately';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CUSTOMER_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_customer_trigger() RETURNS trigger AS $$
+DECLARE
+    v_row record;
+BEGIN
+    IF OLD.age IS NOT DISTINCT FROM NEW.age AND OLD.gender IS NOT DISTINCT FROM NEW.gender THEN
+        RETURN NULL;
+    END IF;
+
+    -- Other customers share the same age/gender buckets: move this customer's share only
+    FOR v_row IN
+        SELECT t.transaction_date, COUNT(*) AS order_count, SUM(t.total_amount) AS revenue
+          FROM transactions t
+         WHERE t.customer_id = NEW.id
+         GROUP BY t.transaction_date
+    LOOP
+        PERFORM daily_sales_rollup_apply(
+            v_row.transaction_date, NULL, NULL, OLD.age, OLD.gender,
+            0, 0, -v_row.order_count, -v_row.revenue
+        );
+        PERFORM daily_sales_rollup_apply(
+            v_row.transaction_date, NULL, NULL, NEW.age, NEW.gender,
+            0, 0, v_row.order_count, v_row.revenue
+        );
+    END LOOP;
+
+    FOR v_row IN
+        SELECT ti.transaction_date, ti.product_id, p.category_id,
+               SUM(ti.quantity) AS quantity, SUM(ti.subtotal) AS sales_amount
+          FROM transactions t
+          JOIN transaction_items ti ON ti.transaction_id = t.id AND ti.transaction_date = t.transaction_date
+          JOIN products p ON p.id = ti.product_id
+         WHERE t.customer_id = NEW.id
+         GROUP BY ti.transaction_date, ti.product_id, p.category_id
+    LOOP
+        PERFORM daily_sales_rollup_apply(
+            v_row.transaction_date, v_row.product_id, v_row.category_id, OLD.age, OLD.gender,
+            -v_row.quantity, -v_row.sales_amount, 0, 0
+        );
+        PERFORM daily_sales_rollup_apply(
+            v_row.transaction_date, v_row.product_id, v_row.category_id, NEW.age, NEW.gender,
+            v_row.quantity, v_row.sales_amount, 0, 0
+        );
+    END LOOP;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PRODUCT_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION daily_sales_rollup_product_trigger() RETURNS trigger AS $$
+BEGIN
+    -- Every row of a product carries its category, so relabelling them can't collide
+    IF OLD.category_id IS DISTINCT FROM NEW.category_id THEN
+        INSERT INTO daily_sales_rollup_deletions (sales_date, product_id, category_id, customer_age, gender)
+        SELECT sales_date, product_id, category_id, customer_age, gender
+          FROM daily_sales_rollup
+         WHERE product_id = NEW.id;
+
+        UPDATE daily_sales_rollup
+           SET category_id = NEW.category_id, updated_at = now()
+         WHERE product_id = NEW.id;
+
+        PERFORM pg_notify('analytics_data_changed', '');
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ITEM_TRIGGER = """
+CREATE OR REPLACE TRIGGER trg_daily_sales_rollup_items
+AFTER INSERT OR UPDATE OR DELETE ON transaction_items
+FOR EACH ROW EXECUTE FUNCTION daily_sales_rollup_item_trigger();
+"""
+
+TRANSACTION_TRIGGER = """
+CREATE OR REPLACE TRIGGER trg_daily_sales_rollup_transactions
+AFTER INSERT OR UPDATE OR DELETE ON transactions
+FOR EACH ROW EXECUTE FUNCTION daily_sales_rollup_transaction_trigger();
+"""
+
+TRANSACTION_GUARD_TRIGGER = """
+CREATE OR REPLACE TRIGGER trg_daily_sales_rollup_transactions_guard
+BEFORE UPDATE OF transaction_date, customer_id ON transactions
+FOR EACH ROW EXECUTE FUNCTION daily_sales_rollup_transaction_guard();
+"""
+
+CUSTOMER_TRIGGER = """
+CREATE OR REPLACE TRIGGER trg_daily_sales_rollup_customers
+AFTER UPDATE OF age, gender ON customers
+FOR EACH ROW EXECUTE FUNCTION daily_sales_rollup_customer_trigger();
+"""
+
+PRODUCT_TRIGGER = """
+CREATE OR REPLACE TRIGGER trg_daily_sales_rollup_products
+AFTER UPDATE OF category_id ON products
+FOR EACH ROW EXECUTE FUNCTION daily_sales_rollup_product_trigger();
+"""
+
+CHANGES_VIEW = """
+CREATE OR REPLACE VIEW daily_sales_rollup_changes AS
+SELECT sales_date, product_id, category_id, customer_age, gender, updated_at AS changed_at
+FROM daily_sales_rollup
+UNION ALL
+SELECT sales_date, product_id, category_id, customer_age, gender, deleted_at AS changed_at
+FROM daily_sales_rollup_deletions;
+"""
+
+# Tombstones only matter until every index has synced past them; a full sync is forced after that
+PRUNE_DELETIONS_SQL = """
+DELETE FROM daily_sales_rollup_deletions WHERE deleted_at < now() - make_interval(secs => :seconds);
+"""
+
+ROLLUP_DDL = [
+    APPLY_ROLLUP_FUNCTION,
+    ITEM_TRIGGER_FUNCTION,
+    TRANSACTION_TRIGGER_FUNCTION,
+    TRANSACTION_GUARD_FUNCTION,
+    CUSTOMER_TRIGGER_FUNCTION,
+    PRODUCT_TRIGGER_FUNCTION,
+    ITEM_TRIGGER,
+    TRANSACTION_TRIGGER,
+    TRANSACTION_GUARD_TRIGGER,
+    CUSTOMER_TRIGGER,
+    PRODUCT_TRIGGER,
+    CHANGES_VIEW,
+]
+
+REBUILD_ROLLUP_SQL = """
+INSERT INTO daily_sales_rollup (
+    sales_date, product_id, category_id, customer_age, gender,
+    quantity, sales_amount, order_count, revenue, updated_at
+)
+SELECT t.transaction_date, ti.product_id, p.category_id, c.age, c.gender,
+       SUM(ti.quantity), SUM(ti.subtotal), 0, 0, now()
+FROM transaction_items ti
+JOIN transactions t ON t.id = ti.transaction_id AND t.transaction_date = ti.transaction_date
+JOIN products p ON p.id = ti.product_id
+JOIN customers c ON c.id = t.customer_id
+GROUP BY t.transaction_date, ti.product_id, p.category_id, c.age, c.gender
+UNION ALL
+SELECT t.transaction_date, NULL, NULL, c.age, c.gender,
+       0, 0, COUNT(t.id), SUM(t.total_amount), now()
+FROM transactions t
+JOIN customers c ON c.id = t.customer_id
+GROUP BY t.transaction_date, c.age, c.gender;
+"""
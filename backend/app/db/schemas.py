@@ -1,10 +1,12 @@
-from sqlalchemy import String, DateTime, Boolean, Integer, ForeignKey, Numeric, Date, Text, text
+from sqlalchemy import String, DateTime, Boolean, Integer, BigInteger, ForeignKey, Numeric, Date, Text, text, UniqueConstraint, ForeignKeyConstraint, DDL, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from decimal import Decimal
 from datetime import date
 import uuid
+from app.db.rollup import ROLLUP_DDL
+from app.db.partitions import PARTITION_DDL
 
 class Base(DeclarativeBase):
     pass
@@ -115,10 +117,15 @@ class Product(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Monthly range partitions; unique keys must include the partition key
+    __table_args__ = (
+        UniqueConstraint("transaction_number", "transaction_date", name="uq_transactions_number_date"),
+        {"postgresql_partition_by": "RANGE (transaction_date)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    transaction_number: Mapped[str] = mapped_column(String(50), unique=True, nullable=False, index=True)
-    transaction_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    transaction_number: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    transaction_date: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
     customer_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("customers.id"), nullable=False)
     subtotal: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=Decimal('0.00'), nullable=False)
     tax_amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=Decimal('0.00'), nullable=False)
@@ -136,9 +143,19 @@ class Transaction(Base):
 
 class TransactionItem(Base):
     __tablename__ = "transaction_items"
+    # Carries its transaction's date so it is partitioned (and pruned) the same way
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["transaction_id", "transaction_date"],
+            ["transactions.id", "transactions.transaction_date"],
+            onupdate="CASCADE",
+        ),
+        {"postgresql_partition_by": "RANGE (transaction_date)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    transaction_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("transactions.id"), nullable=False)
+    transaction_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, index=True)
+    transaction_date: Mapped[date] = mapped_column(Date, primary_key=True)
     product_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("products.id"), nullable=False)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
     price_per_unit: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=Decimal('0.00'), nullable=False)
@@ -152,4 +169,56 @@ class TransactionItem(Base):
     product: Mapped["Product"] = relationship(back_populates="transaction_items")
 
     def __repr__(self) -> str:
-        return f"<TransactionItem {self.quantity}x {self.product.name if self.product else 'Unknown'}: ${self.subtotal}>"
\ No newline at end of file
+        return f"<TransactionItem {self.quantity}x {self.product.name if self.product else 'Unknown'}: ${self.subtotal}>"
+
+class DailySalesRollup(Base):
+    __tablename__ = "daily_sales_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "sales_date", "product_id", "category_id", "customer_age", "gender",
+            name="uq_daily_sales_rollup_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    # Maintained by the triggers in app/db/rollup.py. Rows with a product carry
+    # line-item measures; rows without one carry order-level measures.
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    sales_date: Mapped[date] = mapped_column(Date, nullable=False)
+    product_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    category_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    customer_age: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    gender: Mapped[str | None] = mapped_column(String(10), nullable=True)
+    quantity: Mapped[int] = mapped_column(BigInteger, server_default=text("0"), nullable=False)
+    sales_amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), server_default=text("0"), nullable=False)
+    order_count: Mapped[int] = mapped_column(BigInteger, server_default=text("0"), nullable=False)
+    revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), server_default=text("0"), nullable=False)
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<DailySalesRollup {self.sales_date} product={self.product_id} age={self.customer_age} gender={self.gender}>"
+
+
+class DailySalesRollupDeletion(Base):
+    __tablename__ = "daily_sales_rollup_deletions"
+
+    # Tombstones for rollup keys that stopped existing, written by daily_sales_rollup_apply()
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    sales_date: Mapped[date] = mapped_column(Date, nullable=False)
+    product_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    category_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    customer_age: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    gender: Mapped[str | None] = mapped_column(String(10), nullable=True)
+    deleted_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<DailySalesRollupDeletion {self.sales_date} product={self.product_id} age={self.customer_age} gender={self.gender}>"
+
+
+# create_all() builds the tables without the partition routine or maintenance triggers, so install them alongside
+for statement in PARTITION_DDL + ROLLUP_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -3,21 +3,24 @@ from fastapi import FastAPI, Depends
 from contextlib import asynccontextmanager
 from app.db.postgresql import engine
 from app.db.schemas import Base
+from app.db.partitions import ensure_upcoming_partitions
+from app.core.config import settings
 import app.api.auth as auth
 import app.api.analytics as analytics
 import app.api.activity_log as activity_log
 import app.api.transactions as transactions
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.elastic import get_es_client
+from app.db.elastic import init_async_es_client, close_async_es_client
 from app.services.analytics_services import AnalyticsService
 from app.services.transactions import TransactionsServices
 from app.db.postgresql import AsyncSessionLocal
 from app.dependencies import get_current_user
+from app.services.scheduler import analytics_scheduler, register_analytics_jobs, register_maintenance_jobs
+from app.services.analytics_cache import data_change_listener
 import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
-analytics_service = AnalyticsService()
 
 
 
@@ -27,31 +30,47 @@ async def lifespan(app: FastAPI):
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    print("✅ PostgreSQL initialized")
+        created = await conn.run_sync(ensure_upcoming_partitions, settings.PARTITION_MONTHS_AHEAD)
+    print(f"✅ PostgreSQL initialized ({created} new monthly partitions)")
+
+    # Cached analytics go stale when the rollup triggers report a write, from any client
+    data_change_listener.start()
 
     
-    es = get_es_client()
+    es = await init_async_es_client()
     
     for i in range(5):
-        if es.ping():
+        if await es.ping():
             break
         await asyncio.sleep(1)
     else:
         logger.warning("Elasticsearch is not reachable at startup!")
+
+    analytics_service = AnalyticsService(es)
         
-    if(es.ping()):
+    if await es.ping():
         async with AsyncSessionLocal() as db:
-            transactions_service = TransactionsServices(db)
-            # await analytics_service.ensure_all_indices_exist()
+            transactions_service = TransactionsServices(db, es)
+            await analytics_service.ensure_all_indices_exist()
             # await transactions_service.ensure_all_indices_exist()
             # await analytics_service.sync_sales_analytics()
             # await transactions_service.sync_transactions_data_to_es()
             logger.info("✅ All indices ensured")
         print("✅ Elasticsearch initialized")
+
+    # Analytics indices are kept fresh in the background; GET endpoints only read them
+    if settings.ANALYTICS_SYNC_ENABLED:
+        register_analytics_jobs(analytics_scheduler, analytics_service)
+    register_maintenance_jobs(analytics_scheduler)
+    analytics_scheduler.start()
         
     yield   
 
     print("🛑 Shutting down application...")
+    await analytics_scheduler.stop()
+    await data_change_listener.stop()
+    await close_async_es_client()
+    print("✅ Elasticsearch connection closed")
     await engine.dispose()
     print("✅ PostgreSQL connection closed")
 
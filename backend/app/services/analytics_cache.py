@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List
+
+import asyncpg
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.redis_utils import redis_client, bump_data_epoch, get_data_epoch, ANALYTICS_EPOCH_KEY
+from app.db.rollup import DATA_CHANGED_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "analytics:cache"
+CACHED_ENDPOINTS = ["summary", "sales-pgsql", "products", "customers"]
+
+# Background refreshes are fire-and-forget; keep references so they are not collected mid-flight
+_background_tasks: set = set()
+
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+class AnalyticsCache:
+    """Redis result cache for the PostgreSQL analytics endpoints.
+
+    Entries remember the data-change epoch they were computed under. A bumped epoch or
+    an expired freshness window makes an entry stale: it is still served, and one
+    request refreshes it in the background.
+    """
+
+    def __init__(
+        self,
+        fresh_seconds: int = settings.ANALYTICS_CACHE_FRESH_SECONDS,
+        stale_seconds: int = settings.ANALYTICS_CACHE_STALE_SECONDS,
+    ):
+        self.redis = redis_client
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+
+    def cache_key(self, endpoint: str, start_date: datetime, end_date: datetime) -> str:
+        # Every query filters a DATE column and pgsql_compute() passes day bounds, so any time of day maps to the same result
+        return f"{CACHE_KEY_PREFIX}:{endpoint}:{start_date.date().isoformat()}:{end_date.date().isoformat()}"
+
+    async def get_or_compute(
+        self,
+        endpoint: str,
+        start_date: datetime,
+        end_date: datetime,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        key = self.cache_key(endpoint, start_date, end_date)
+
+        try:
+            raw_epoch, raw_entry = await self.redis.mget(ANALYTICS_EPOCH_KEY, key)
+        except Exception as e:
+            logger.warning(f"⚠️ Analytics cache unavailable, computing {endpoint} directly: {str(e)}")
+            return await compute()
+
+        epoch = int(raw_epoch or 0)
+
+        if raw_entry:
+            entry = json.loads(raw_entry)
+            age = time.time() - entry["stored_at"]
+            if entry["epoch"] == epoch and age < self.fresh_seconds:
+                await self._record(endpoint, "hits")
+                return entry["payload"]
+
+            await self._record(endpoint, "stale")
+            _spawn(self._revalidate(key, endpoint, compute))
+            return entry["payload"]
+
+        await self._record(endpoint, "misses")
+        payload = jsonable_encoder(await compute())
+        await self._store(key, epoch, payload)
+        return payload
+
+    async def _store(self, key: str, epoch: int, payload: Any) -> None:
+        # Error responses are returned to the caller but never cached
+        if isinstance(payload, dict) and payload.get("status") != "success":
+            return
+
+        entry = {"epoch": epoch, "stored_at": time.time(), "payload": payload}
+        await self.redis.set(key, json.dumps(entry), ex=self.fresh_seconds + self.stale_seconds)
+
+    async def _revalidate(self, key: str, endpoint: str, compute: Callable[[], Awaitable[Any]]) -> None:
+        lock_key = f"{key}:refresh"
+        if not await self.redis.set(lock_key, "1", nx=True, ex=60):
+            return
+
+        try:
+            # Read the epoch before computing so a write that lands mid-refresh still marks it stale
+            epoch = await get_data_epoch()
+            payload = jsonable_encoder(await compute())
+            await self._store(key, epoch, payload)
+        except Exception as e:
+            logger.error(f"❌ Background refresh failed for {endpoint}: {str(e)}")
+        finally:
+            await self.redis.delete(lock_key)
+
+    async def _record(self, endpoint: str, outcome: str) -> None:
+        # Stats are best effort: a Redis hiccup here must not fail a request that already has its answer
+        try:
+            await self.redis.hincrby(f"{CACHE_KEY_PREFIX}:stats:{endpoint}", outcome, 1)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not record analytics cache {outcome} for {endpoint}: {str(e)}")
+
+    async def get_stats(self) -> Dict[str, Any]:
+        endpoints: List[Dict[str, Any]] = []
+        for endpoint in CACHED_ENDPOINTS:
+            counters = await self.redis.hgetall(f"{CACHE_KEY_PREFIX}:stats:{endpoint}")
+            hits = int(counters.get("hits", 0))
+            stale = int(counters.get("stale", 0))
+            misses = int(counters.get("misses", 0))
+            total = hits + stale + misses
+            endpoints.append({
+                "endpoint": endpoint,
+                "hits": hits,
+                "stale_hits": stale,
+                "misses": misses,
+                "hit_ratio": round((hits + stale) / total, 4) if total else None,
+            })
+
+        return {"epoch": await get_data_epoch(), "endpoints": endpoints}
+
+
+analytics_cache = AnalyticsCache()
+
+
+class DataChangeListener:
+    """Bumps the analytics epoch whenever the rollup triggers report a committed change.
+
+    The triggers NOTIFY on every write to transactions, items, customers' age/gender and
+    products' category, whoever makes it: ORM sessions, raw SQL, scripts or other services.
+    """
+
+    def __init__(self, database_url: str = settings.DATABASE_URL, reconnect_seconds: int = 5):
+        # asyncpg wants a plain postgresql:// DSN, not the SQLAlchemy driver URL
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.reconnect_seconds = reconnect_seconds
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                try:
+                    await conn.add_listener(DATA_CHANGED_CHANNEL, self._on_notify)
+                    logger.info(f"👂 Listening for analytics data changes on {DATA_CHANGED_CHANNEL}")
+                    # Writes committed while nobody was listening are unaccounted for
+                    await self._bump()
+                    await closed.wait()
+                finally:
+                    if not conn.is_closed():
+                        await conn.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Analytics change listener disconnected, retrying: {str(e)}")
+
+            await asyncio.sleep(self.reconnect_seconds)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        _spawn(self._bump())
+
+    async def _bump(self) -> None:
+        try:
+            await bump_data_epoch()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not bump analytics data epoch: {str(e)}")
+
+
+data_change_listener = DataChangeListener()
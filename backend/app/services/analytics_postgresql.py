@@ -1,11 +1,14 @@
+import asyncio
 import logging
-from typing import List
+from typing import List, Dict, Any, Tuple, Callable, Awaitable
 from datetime import datetime, timedelta
-from sqlalchemy import select, desc, asc, case
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, desc, asc, case, and_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from typing import List
 from sqlalchemy import func
-from app.db.schemas import Transaction, TransactionItem, Product, ProductCategory, Customer
+from app.core.config import settings
+from app.db.postgresql import AsyncSessionLocal
+from app.db.schemas import Transaction, TransactionItem, Product, ProductCategory, DailySalesRollup
 from app.models.global_type import ResponseWrapper
 from app.models.sales import SalesTrendModel, ProductCategorySalesModel, ProductTopSoldSalesModel, CustomerAgeSpendingModel, CustomerAgeGroupModel, PeriodSummaryModel, SummaryModel
 
@@ -13,143 +16,156 @@ from app.models.sales import SalesTrendModel, ProductCategorySalesModel, Product
 
 logger = logging.getLogger(__name__)
 
+# daily_sales_rollup holds two grains: line-item rows (per product) and order rows
+ITEM_ROWS = DailySalesRollup.product_id.is_not(None)
+ORDER_ROWS = DailySalesRollup.product_id.is_(None)
+
+# Shared across requests so concurrent dashboards cannot exhaust the connection pool
+ANALYTICS_QUERY_SLOTS = asyncio.Semaphore(settings.ANALYTICS_MAX_PARALLEL_QUERIES)
+
 class AnalyticsPostgreSQL:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, session_factory: async_sessionmaker = AsyncSessionLocal):
         self.db = db
+        self.session_factory = session_factory
+    
+    async def _run_parallel(self, *calls: Callable[["AnalyticsPostgreSQL"], Awaitable[Any]]) -> List[Any]:
+        """Run independent sub-queries concurrently, each on its own pooled session"""
+        async def run(call):
+            async with ANALYTICS_QUERY_SLOTS:
+                async with self.session_factory() as session:
+                    return await call(AnalyticsPostgreSQL(session, self.session_factory))
+
+        return await asyncio.gather(*(run(call) for call in calls))
     
     def calc_growth(self, current, previous):
         if not previous or previous == 0:
             return None  
         return ((current - previous) / previous) * 100
         
-    async def get_period_summary_data(self, start_date: datetime, end_date: datetime) -> ResponseWrapper[PeriodSummaryModel]:
-        period_length = (end_date - start_date).days + 1
-        prev_start_date = start_date - timedelta(days=period_length)
-        prev_end_date = start_date - timedelta(days=1)
-        
-        
-        current_sales_query = (
-            select(func.sum(TransactionItem.quantity))
-            .join(Transaction)
-            .where(Transaction.transaction_date.between(start_date, end_date))
-        )
-        prev_sales_query = (
-            select(func.sum(TransactionItem.quantity))
-            .join(Transaction)
-            .where(Transaction.transaction_date.between(prev_start_date, prev_end_date))
-        )
-        current_orders_query = (
-            select(func.count(Transaction.id))
-            .where(Transaction.transaction_date.between(start_date, end_date))
-        )
-        prev_orders_query = (
-            select(func.count(Transaction.id))
-            .where(Transaction.transaction_date.between(prev_start_date, prev_end_date))
-        )
-        
-        current_revenue_query = (
-            select(func.sum(Transaction.total_amount))
-            .where(Transaction.transaction_date.between(start_date, end_date))
-        )
-        prev_revenue_query = (
-            select(func.sum(Transaction.total_amount))
-            .where(Transaction.transaction_date.between(prev_start_date, prev_end_date))
-        )
-        
-        current_aov_query = (
-            select(func.avg(Transaction.total_amount))
-            .where(Transaction.transaction_date.between(start_date, end_date))
-        )
-        prev_aov_query = (
-            select(func.avg(Transaction.total_amount))
-            .where(Transaction.transaction_date.between(prev_start_date, prev_end_date))
-        )
+    def _build_period_summary_query(self, periods: List[Tuple[datetime, datetime]]):
+        """Build a single conditional-aggregation query covering every (start, end) window"""
+        range_start = min(start for start, _ in periods)
+        range_end = max(end for _, end in periods)
 
-        try:
-            async with self.db as session:
-                current_sales = await session.execute(current_sales_query)
-                current_sales_value = current_sales.scalar() or 0
+        # One pass over the transactions spanning all windows; items are folded into a
+        # per-transaction quantity so revenue/AOV are not multiplied by the join.
+        scoped_transactions = (
+            select(
+                Transaction.id,
+                Transaction.transaction_date,
+                Transaction.total_amount,
+                func.coalesce(func.sum(TransactionItem.quantity), 0).label("quantity"),
+            )
+            .outerjoin(TransactionItem, and_(
+                TransactionItem.transaction_id == Transaction.id,
+                TransactionItem.transaction_date == Transaction.transaction_date,
+            ))
+            .where(Transaction.transaction_date.between(range_start, range_end))
+            .group_by(Transaction.id, Transaction.transaction_date, Transaction.total_amount)
+            .subquery()
+        )
 
-                previous_sales = await session.execute(prev_sales_query)
-                previous_sales_value = previous_sales.scalar() or 0
+        columns = []
+        for index, (start, end) in enumerate(periods):
+            in_period = scoped_transactions.c.transaction_date.between(start, end)
+            columns.extend([
+                func.sum(scoped_transactions.c.quantity).filter(in_period).label(f"sales_{index}"),
+                func.count(scoped_transactions.c.id).filter(in_period).label(f"orders_{index}"),
+                func.sum(scoped_transactions.c.total_amount).filter(in_period).label(f"revenue_{index}"),
+                func.avg(scoped_transactions.c.total_amount).filter(in_period).label(f"aov_{index}"),
+            ])
 
-                current_orders = await session.execute(current_orders_query)
-                current_orders_value = current_orders.scalar() or 0
+        return select(*columns)
 
-                previous_orders = await session.execute(prev_orders_query)
-                previous_orders_value = previous_orders.scalar() or 0
+    async def summarize_periods(self, periods: List[Tuple[datetime, datetime]]) -> List[Dict[str, Any]]:
+        """Products sold, orders, revenue and AOV for each window in one round-trip"""
+        query = self._build_period_summary_query(periods)
 
-                current_revenue = await session.execute(current_revenue_query)
-                current_revenue_value = current_revenue.scalar() or 0
+        async with self.db as session:
+            result = await session.execute(query)
+            row = result.mappings().one()
 
-                previous_revenue = await session.execute(prev_revenue_query)
-                previous_revenue_value = previous_revenue.scalar() or 0
+        return [
+            {
+                "sales": row[f"sales_{index}"] or 0,
+                "orders": row[f"orders_{index}"] or 0,
+                "revenue": row[f"revenue_{index}"] or 0,
+                "aov": row[f"aov_{index}"] or 0,
+            }
+            for index in range(len(periods))
+        ]
 
-                current_aov = await session.execute(current_aov_query)
-                current_aov_value = current_aov.scalar() or 0
+    async def get_period_summary_data(self, start_date: datetime, end_date: datetime) -> ResponseWrapper[PeriodSummaryModel]:
+        period_length = (end_date - start_date).days + 1
+        prev_start_date = start_date - timedelta(days=period_length)
+        prev_end_date = start_date - timedelta(days=1)
 
-                previous_aov = await session.execute(prev_aov_query)
-                previous_aov_value = previous_aov.scalar() or 0
+        try:
+            current, previous = await self.summarize_periods([
+                (start_date, end_date),
+                (prev_start_date, prev_end_date),
+            ])
 
-                # Growth
-                sales_growth = self.calc_growth(current_sales_value, previous_sales_value)
-                orders_growth = self.calc_growth(current_orders_value, previous_orders_value)
-                revenue_growth = self.calc_growth(current_revenue_value, previous_revenue_value)
-                aov_growth = self.calc_growth(current_aov_value, previous_aov_value)
+            # Growth
+            sales_growth = self.calc_growth(current["sales"], previous["sales"])
+            orders_growth = self.calc_growth(current["orders"], previous["orders"])
+            revenue_growth = self.calc_growth(current["revenue"], previous["revenue"])
+            aov_growth = self.calc_growth(current["aov"], previous["aov"])
 
-                return ResponseWrapper[PeriodSummaryModel](
-                    status="success",
-                    message="Successfully retrieved period summary data",
-                    data=PeriodSummaryModel(
-                        sales_summary=SummaryModel(
-                            summary_title="Products Sold",
-                            current_period=current_sales_value,
-                            previous_period=previous_sales_value,
-                            growth=round(sales_growth, 2) if sales_growth is not None else None
-                        ),
-                        orders_summary=SummaryModel(
-                            summary_title="Orders",
-                            current_period=current_orders_value,
-                            previous_period=previous_orders_value,
-                            growth=round(orders_growth, 2) if orders_growth is not None else None
-                        ),
-                        revenue_summary=SummaryModel(
-                            summary_title="Revenue",
-                            current_period=round(float(current_revenue_value), 2),
-                            previous_period=round(float(previous_revenue_value), 2),
-                            growth=round(revenue_growth, 2) if revenue_growth is not None else None
-                        ),
-                        aov_summary=SummaryModel(
-                            summary_title="Average Order Value",
-                            current_period=round(float(current_aov_value), 2),
-                            previous_period=round(float(previous_aov_value), 2),
-                            growth=round(aov_growth, 2) if aov_growth is not None else None
-                        ),
-                    )
+            return ResponseWrapper[PeriodSummaryModel](
+                status="success",
+                message="Successfully retrieved period summary data",
+                data=PeriodSummaryModel(
+                    sales_summary=SummaryModel(
+                        summary_title="Products Sold",
+                        current_period=current["sales"],
+                        previous_period=previous["sales"],
+                        growth=round(sales_growth, 2) if sales_growth is not None else None
+                    ),
+                    orders_summary=SummaryModel(
+                        summary_title="Orders",
+                        current_period=current["orders"],
+                        previous_period=previous["orders"],
+                        growth=round(orders_growth, 2) if orders_growth is not None else None
+                    ),
+                    revenue_summary=SummaryModel(
+                        summary_title="Revenue",
+                        current_period=round(float(current["revenue"]), 2),
+                        previous_period=round(float(previous["revenue"]), 2),
+                        growth=round(revenue_growth, 2) if revenue_growth is not None else None
+                    ),
+                    aov_summary=SummaryModel(
+                        summary_title="Average Order Value",
+                        current_period=round(float(current["aov"]), 2),
+                        previous_period=round(float(previous["aov"]), 2),
+                        growth=round(aov_growth, 2) if aov_growth is not None else None
+                    ),
                 )
+            )
         except Exception as e:
             logger.error(f"Error in get_period_summary_data: {str(e)}")
             raise
         finally:
             await self.db.close()
 
-
-        
     async def get_sales_trend_data(
         self, start_date: datetime, end_date: datetime
     ) -> ResponseWrapper[List[SalesTrendModel]]:
         main_query = (
             select(
-                Transaction.transaction_date,
-                func.sum(Transaction.total_amount).label("total_sales"),
-                func.count(Transaction.id).label("transaction_count"),
+                DailySalesRollup.sales_date.label("transaction_date"),
+                func.sum(DailySalesRollup.revenue).label("total_sales"),
+                func.sum(DailySalesRollup.order_count).label("transaction_count"),
             ).where(
-                Transaction.transaction_date >= start_date,
-                Transaction.transaction_date <= end_date,
+                ORDER_ROWS,
+                DailySalesRollup.sales_date >= start_date,
+                DailySalesRollup.sales_date <= end_date,
             ).group_by(
-                Transaction.transaction_date
+                DailySalesRollup.sales_date
+            ).having(
+                func.sum(DailySalesRollup.order_count) > 0
             ).order_by(
-                asc(Transaction.transaction_date)
+                asc(DailySalesRollup.sales_date)
             )
         )
 
@@ -188,15 +204,15 @@ class AnalyticsPostgreSQL:
             select(
                 ProductCategory.id,
                 ProductCategory.name.label("category_name"),
-                func.sum(TransactionItem.quantity).label("total_quantity"),
-                func.sum(TransactionItem.subtotal).label("total_sales"),
+                func.sum(DailySalesRollup.quantity).label("total_quantity"),
+                func.sum(DailySalesRollup.sales_amount).label("total_sales"),
             )
-            .join(Product, ProductCategory.id == Product.category_id)
-            .join(TransactionItem, Product.id == TransactionItem.product_id)
-            .join(Transaction, TransactionItem.transaction_id == Transaction.id)
+            .select_from(DailySalesRollup)
+            .join(ProductCategory, ProductCategory.id == DailySalesRollup.category_id)
             .where(
-                Transaction.transaction_date >= start_date,
-                Transaction.transaction_date <= end_date,
+                ITEM_ROWS,
+                DailySalesRollup.sales_date >= start_date,
+                DailySalesRollup.sales_date <= end_date,
             )
             .group_by(ProductCategory.id, ProductCategory.name)
             .order_by(desc("total_sales"))
@@ -224,15 +240,16 @@ class AnalyticsPostgreSQL:
     async def get_product_top_sold_data(self, start_date: datetime, end_date: datetime) -> List[ProductTopSoldSalesModel] :
         main_query = select(
             Product.name.label("product_name"),
-            func.sum(TransactionItem.quantity).label("total_quantity"),
-            func.sum(TransactionItem.subtotal).label("total_sales")
-        ).join(
-            TransactionItem, Product.id == TransactionItem.product_id
+            func.sum(DailySalesRollup.quantity).label("total_quantity"),
+            func.sum(DailySalesRollup.sales_amount).label("total_sales")
+        ).select_from(
+            DailySalesRollup
         ).join(
-            Transaction, TransactionItem.transaction_id == Transaction.id
+            Product, Product.id == DailySalesRollup.product_id
         ).where(
-            Transaction.transaction_date >= start_date,
-            Transaction.transaction_date <= end_date
+            ITEM_ROWS,
+            DailySalesRollup.sales_date >= start_date,
+            DailySalesRollup.sales_date <= end_date
         ).group_by(
             Product.name
         ).order_by(
@@ -260,8 +277,10 @@ class AnalyticsPostgreSQL:
     
     async def get_product_analytics_data(self, start_date: datetime, end_date: datetime):
         try:
-            category_sales = await self.get_category_sales_data(start_date, end_date)
-            top_sold_products = await self.get_product_top_sold_data(start_date, end_date)
+            category_sales, top_sold_products = await self._run_parallel(
+                lambda analytics: analytics.get_category_sales_data(start_date, end_date),
+                lambda analytics: analytics.get_product_top_sold_data(start_date, end_date),
+            )
 
             return ResponseWrapper[dict](
                 status="success",
@@ -278,18 +297,17 @@ class AnalyticsPostgreSQL:
 
     async def customers_age_spending_data(self, start_date: datetime, end_date: datetime):
         main_query = select(
-            Customer.age,
-            func.sum(Transaction.total_amount).label("total_spending"),
-            func.count(Transaction.id).label("transaction_count")
-        ).join(
-            Transaction, Customer.id == Transaction.customer_id
+            DailySalesRollup.customer_age.label("age"),
+            func.sum(DailySalesRollup.revenue).label("total_spending"),
+            func.sum(DailySalesRollup.order_count).label("transaction_count")
         ).where(
-            Transaction.transaction_date >= start_date,
-            Transaction.transaction_date <= end_date
+            ORDER_ROWS,
+            DailySalesRollup.sales_date >= start_date,
+            DailySalesRollup.sales_date <= end_date
         ).group_by(
-            Customer.age
+            DailySalesRollup.customer_age
         ).order_by(
-            asc(Customer.age)
+            asc(DailySalesRollup.customer_age)
         )
         
         try:
@@ -312,36 +330,32 @@ class AnalyticsPostgreSQL:
             raise
     
     async def customers_age_group_data(self, start_date: datetime, end_date: datetime):
-        age_group_cte = select(
-            Customer.id.label("customer_id"),
+        rollup_rows = select(
             case(
-                (Customer.age.between(18, 24), "18-24"),
-                (Customer.age.between(25, 34), "25-34"),
-                (Customer.age.between(35, 44), "35-44"),
-                (Customer.age.between(45, 54), "45-54"),
-                (Customer.age >= 55, "55+")
-            ).label("age_group")
-        )
+                (DailySalesRollup.customer_age.between(18, 24), "18-24"),
+                (DailySalesRollup.customer_age.between(25, 34), "25-34"),
+                (DailySalesRollup.customer_age.between(35, 44), "35-44"),
+                (DailySalesRollup.customer_age.between(45, 54), "45-54"),
+                (DailySalesRollup.customer_age >= 55, "55+")
+            ).label("age_group"),
+            DailySalesRollup.category_id,
+            DailySalesRollup.sales_amount,
+        ).where(
+            ITEM_ROWS,
+            DailySalesRollup.sales_date >= start_date,
+            DailySalesRollup.sales_date <= end_date
+        ).subquery()
         
         main_query = select(
-            age_group_cte.c.age_group,
+            rollup_rows.c.age_group,
             ProductCategory.name.label("category"),
-            func.sum(TransactionItem.subtotal).label("total_sales"),
-        ).join(
-            Transaction, age_group_cte.c.customer_id == Transaction.customer_id
-        ).join(
-            TransactionItem, Transaction.id == TransactionItem.transaction_id
+            func.sum(rollup_rows.c.sales_amount).label("total_sales"),
         ).join(
-            Product, TransactionItem.product_id == Product.id
-        ).join(
-            ProductCategory, Product.category_id == ProductCategory.id
-        ).where(
-            Transaction.transaction_date >= start_date,
-            Transaction.transaction_date <= end_date
+            ProductCategory, ProductCategory.id == rollup_rows.c.category_id
         ).group_by(
-            age_group_cte.c.age_group, ProductCategory.name
+            rollup_rows.c.age_group, ProductCategory.name
         ).order_by(
-            asc(age_group_cte.c.age_group), desc("total_sales") 
+            asc(rollup_rows.c.age_group), desc("total_sales") 
         )
         
         try:
@@ -365,8 +379,10 @@ class AnalyticsPostgreSQL:
     
     async def get_customers_analytics_data(self, start_date: datetime, end_date: datetime):
         try:
-            age_spending = await self.customers_age_spending_data(start_date, end_date)
-            age_group = await self.customers_age_group_data(start_date, end_date)
+            age_spending, age_group = await self._run_parallel(
+                lambda analytics: analytics.customers_age_spending_data(start_date, end_date),
+                lambda analytics: analytics.customers_age_group_data(start_date, end_date),
+            )
             
             return ResponseWrapper[dict](
                 status="success",
@@ -1,10 +1,12 @@
-from app.db.elastic import get_es_client
+from elasticsearch import AsyncElasticsearch, NotFoundError, ConnectionError as ESConnectionError
 import logging
 from typing import List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
+from dateutil.relativedelta import relativedelta
 import asyncio
 from app.db.postgresql import AsyncSessionLocal
 from app.services.elastic_sync import ElasticSyncService
+from app.core.single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 SALES_INDEX_NAME = "sales_analytics"
@@ -12,10 +14,20 @@ CATEGORIES_INDEX_NAME = "categories_analytics"
 CUSTOMERS_INDEX_NAME = "customers_analytics"
 CUSTOMERS_AGE_GROUP_INDEX_NAME = "customers_age_group_analytics"
 
+AGE_GROUP_CASE = """
+    CASE
+        WHEN {age} BETWEEN 18 AND 24 THEN '18-24'
+        WHEN {age} BETWEEN 25 AND 34 THEN '25-34'
+        WHEN {age} BETWEEN 35 AND 44 THEN '35-44'
+        WHEN {age} BETWEEN 45 AND 55 THEN '45-55'
+        ELSE '55++'
+    END
+"""
+
 
 class AnalyticsService:
-    def __init__(self):
-        self.es = get_es_client()
+    def __init__(self, es_client: AsyncElasticsearch):
+        self.es = es_client
         self.elastic_sync = ElasticSyncService(self.es, AsyncSessionLocal)
 
         self.index_mappings = {
@@ -25,6 +37,7 @@ class AnalyticsService:
                         "month": {"type": "date", "format": "yyyy-MM-dd"},
                         "total_sales": {"type": "double"},
                         "transactions_count": {"type": "integer"},
+                        "bucket": {"type": "keyword"},
                     }
                 },
                 "settings": {"number_of_shards": 1, "number_of_replicas": 0},
@@ -35,6 +48,7 @@ class AnalyticsService:
                         "category": {"type": "keyword"},
                         "sales": {"type": "double"},
                         "percentage": {"type": "double"},
+                        "bucket": {"type": "keyword"},
                     }
                 },
                 "settings": {"number_of_shards": 1, "number_of_replicas": 0},
@@ -46,6 +60,7 @@ class AnalyticsService:
                         "gender": {"type": "keyword"},
                         "customers": {"type": "integer"},
                         "total_items": {"type": "integer"},
+                        "bucket": {"type": "keyword"},
                     }
                 },
                 "settings": {"number_of_shards": 1, "number_of_replicas": 0},
@@ -56,6 +71,7 @@ class AnalyticsService:
                         "ageGroup": {"type": "keyword"},
                         "customers": {"type": "integer"},
                         "sales": {"type": "double"},
+                        "bucket": {"type": "keyword"},
                     }
                 },
                 "settings": {"number_of_shards": 1, "number_of_replicas": 0},
@@ -65,16 +81,31 @@ class AnalyticsService:
     async def ensure_all_indices_exist(self) -> None:
         for index_name, mapping in self.index_mappings.items():
             await self.elastic_sync.ensure_index(index_name, mapping)
+            # Older indices pick up new fields (like the sync bucket) here instead of mapping them dynamically
+            await self.es.indices.put_mapping(index=index_name, properties=mapping["mappings"]["properties"])
 
-    async def sync_sales_analytics(self):
+    @single_flight("analytics:sync:sales")
+    async def sync_sales_analytics(self, force_full: bool = False):
         query = """
             SELECT DATE_TRUNC('month', t.transaction_date)::date AS month, 
+                   to_char(DATE_TRUNC('month', t.transaction_date), 'YYYY-MM-DD') AS bucket,
                    SUM(t.total_amount) AS total_sales, 
                    COUNT(t.id) AS transactions_count 
             FROM transactions t 
-            GROUP BY month
+            -- Plain bounds on the partition key prune partitions; the bucket list then drops
+            -- unchanged months that fall between two changed ones
+            WHERE t.transaction_date >= COALESCE(CAST(:lo AS date), '-infinity'::date)
+              AND t.transaction_date < COALESCE(CAST(:hi AS date), 'infinity'::date)
+              AND (CAST(:buckets AS text[]) IS NULL
+                   OR to_char(DATE_TRUNC('month', t.transaction_date), 'YYYY-MM-DD') = ANY(CAST(:buckets AS text[])))
+            GROUP BY month, bucket
             ORDER BY month;
         """
+        changed_buckets = """
+            SELECT DISTINCT to_char(DATE_TRUNC('month', sales_date), 'YYYY-MM-DD') AS bucket
+            FROM daily_sales_rollup_changes
+            WHERE changed_at > :since AND product_id IS NULL;
+        """
         def transform(row):
             source = {
                 "month": row.month.strftime("%Y-%m-%d"),
@@ -83,9 +114,18 @@ class AnalyticsService:
             }
             return source, row.month.strftime("%Y-%m-%d")
 
-        return await self.elastic_sync.sync_to_es(SALES_INDEX_NAME, query, transform)
+        def month_bounds(buckets):
+            if buckets is None:
+                return {"lo": None, "hi": None}
+            months = sorted(date.fromisoformat(bucket) for bucket in buckets)
+            return {"lo": months[0], "hi": months[-1] + relativedelta(months=1)}
 
-    async def sync_categories_analytics(self):
+        return await self.elastic_sync.sync_incremental(
+            SALES_INDEX_NAME, query, transform, changed_buckets, force_full=force_full, bucket_params=month_bounds
+        )
+
+    @single_flight("analytics:sync:categories")
+    async def sync_categories_analytics(self, force_full: bool = False):
         query = """
             WITH monthly_sales_by_category AS (
                 SELECT
@@ -95,18 +135,29 @@ class AnalyticsService:
                 FROM transaction_items ti
                 JOIN products p ON p.id = ti.product_id
                 JOIN product_categories pc ON pc.id = p.category_id
-                JOIN transactions t ON t.id = ti.transaction_id
-                WHERE DATE_TRUNC('month', t.transaction_date) = DATE_TRUNC('month', CURRENT_DATE)
+                JOIN transactions t ON t.id = ti.transaction_id AND t.transaction_date = ti.transaction_date
+                -- Plain range on the partition key so only the current month's partitions are scanned
+                WHERE t.transaction_date >= DATE_TRUNC('month', CURRENT_DATE)::date
+                  AND t.transaction_date < (DATE_TRUNC('month', CURRENT_DATE) + INTERVAL '1 month')::date
                 GROUP BY bulan, category
             )
             SELECT
                 bulan,
+                to_char(bulan, 'YYYY-MM') AS bucket,
                 category,
                 total_sales,
                 ROUND((total_sales / SUM(total_sales) OVER (PARTITION BY bulan)) * 100, 2) AS percentage
             FROM monthly_sales_by_category
             ORDER BY total_sales DESC;
         """
+        # Percentages are shares of the month, so any change this month re-indexes the whole month
+        changed_buckets = """
+            SELECT DISTINCT to_char(DATE_TRUNC('month', sales_date), 'YYYY-MM') AS bucket
+            FROM daily_sales_rollup_changes
+            WHERE changed_at > :since
+              AND product_id IS NOT NULL
+              AND sales_date >= DATE_TRUNC('month', CURRENT_DATE)::date;
+        """
         def transform(row):
             source = {
                 "category": row.category,
@@ -115,23 +166,32 @@ class AnalyticsService:
             }
             return source, f"{row.bulan.strftime('%Y-%m')}-{row.category}"
 
-        return await self.elastic_sync.sync_to_es(CATEGORIES_INDEX_NAME, query, transform)
+        return await self.elastic_sync.sync_incremental(CATEGORIES_INDEX_NAME, query, transform, changed_buckets, force_full=force_full)
 
-    async def sync_customers_analytics(self):
+    @single_flight("analytics:sync:customers")
+    async def sync_customers_analytics(self, force_full: bool = False):
         query = """
             SELECT 
                 pc.name AS category,
+                p.category_id::text AS bucket,
                 c.gender,
                 COUNT(DISTINCT c.id) AS customers,
                 SUM(ti.quantity) AS total_items
             FROM customers c
             JOIN transactions t ON t.customer_id = c.id
-            JOIN transaction_items ti ON ti.transaction_id = t.id
+            JOIN transaction_items ti ON ti.transaction_id = t.id AND ti.transaction_date = t.transaction_date
             JOIN products p ON p.id = ti.product_id
             JOIN product_categories pc ON pc.id = p.category_id
-            GROUP BY pc.name, c.gender
+            WHERE CAST(:buckets AS text[]) IS NULL
+               OR p.category_id::text = ANY(CAST(:buckets AS text[]))
+            GROUP BY pc.name, p.category_id, c.gender
             ORDER BY pc.name, c.gender;
         """
+        changed_buckets = """
+            SELECT DISTINCT category_id::text AS bucket
+            FROM daily_sales_rollup_changes
+            WHERE changed_at > :since AND product_id IS NOT NULL;
+        """
         def transform(row):
             source = {
                 "category": row.category,
@@ -141,25 +201,31 @@ class AnalyticsService:
             }
             return source, f"{row.category}-{row.gender}"
 
-        return await self.elastic_sync.sync_to_es(CUSTOMERS_INDEX_NAME, query, transform)
+        return await self.elastic_sync.sync_incremental(CUSTOMERS_INDEX_NAME, query, transform, changed_buckets, force_full=force_full)
 
-    async def sync_customers_age_group_analytics(self):
-        query = """
+    @single_flight("analytics:sync:customers_age_group")
+    async def sync_customers_age_group_analytics(self, force_full: bool = False):
+        query = f"""
             SELECT 
-                CASE
-                    WHEN c.age BETWEEN 18 AND 24 THEN '18-24'
-                    WHEN c.age BETWEEN 25 AND 34 THEN '25-34'
-                    WHEN c.age BETWEEN 35 AND 44 THEN '35-44'
-                    WHEN c.age BETWEEN 45 AND 55 THEN '45-55'
-                    ELSE '55++'
-                END AS age_group,
-                COUNT(DISTINCT c.id) AS customers,
-                SUM(t.total_amount) AS sales
-            FROM customers c
-            JOIN transactions t ON t.customer_id = c.id
+                age_group,
+                age_group AS bucket,
+                COUNT(DISTINCT customer_id) AS customers,
+                SUM(total_amount) AS sales
+            FROM (
+                SELECT {AGE_GROUP_CASE.format(age="c.age")} AS age_group, c.id AS customer_id, t.total_amount
+                FROM customers c
+                JOIN transactions t ON t.customer_id = c.id
+            ) spending
+            WHERE CAST(:buckets AS text[]) IS NULL
+               OR age_group = ANY(CAST(:buckets AS text[]))
             GROUP BY age_group
             ORDER BY age_group;
         """
+        changed_buckets = f"""
+            SELECT DISTINCT {AGE_GROUP_CASE.format(age="customer_age")} AS bucket
+            FROM daily_sales_rollup_changes
+            WHERE changed_at > :since AND product_id IS NULL;
+        """
         def transform(row):
             source = {
                 "ageGroup": row.age_group,
@@ -168,21 +234,24 @@ class AnalyticsService:
             }
             return source, f"{row.age_group}"
 
-        return await self.elastic_sync.sync_to_es(CUSTOMERS_AGE_GROUP_INDEX_NAME, query, transform)
+        return await self.elastic_sync.sync_incremental(CUSTOMERS_AGE_GROUP_INDEX_NAME, query, transform, changed_buckets, force_full=force_full)
 
 
-async def get_sales_from_es() -> List[Dict[str, Any]]:
-    """Retrieve sales analytics data from Elasticsearch"""
+async def search_analytics_index(es: AsyncElasticsearch, index_name: str, query_body: Dict[str, Any]) -> Dict[str, Any] | None:
+    """One round trip per read: a missing index is reported by the search itself"""
     try:
-        es = get_es_client()
-        
-        if not es.ping():
-            raise ConnectionError("Cannot connect to Elasticsearch")
-        
-        if not es.indices.exists(index=SALES_INDEX_NAME):
-            logger.warning(f"Index {SALES_INDEX_NAME} does not exist")
-            return []
+        return await es.search(index=index_name, body=query_body)
+    except NotFoundError:
+        logger.warning(f"Index {index_name} does not exist")
+        return None
+    except ESConnectionError as e:
+        raise ConnectionError("Cannot connect to Elasticsearch") from e
 
+
+@single_flight("analytics:read:sales")
+async def get_sales_from_es(es: AsyncElasticsearch) -> List[Dict[str, Any]]:
+    """Retrieve sales analytics data from Elasticsearch"""
+    try:
         query_body = {
             "size": 1000,
             "sort": [{"month": {"order": "asc"}}],
@@ -190,7 +259,9 @@ async def get_sales_from_es() -> List[Dict[str, Any]]:
             "_source": ["month", "total_sales", "transactions_count"]
         }
 
-        resp = await asyncio.to_thread(es.search, index=SALES_INDEX_NAME, body=query_body)
+        resp = await search_analytics_index(es, SALES_INDEX_NAME, query_body)
+        if resp is None:
+            return []
         
         data = []
         for hit in resp["hits"]["hits"]:
@@ -209,25 +280,19 @@ async def get_sales_from_es() -> List[Dict[str, Any]]:
         raise
 
 
-async def get_categories_from_es() -> List[Dict[str, Any]]:
+@single_flight("analytics:read:categories")
+async def get_categories_from_es(es: AsyncElasticsearch) -> List[Dict[str, Any]]:
     """Retrieve categories analytics data from Elasticsearch"""
     try:
-        es = get_es_client()
-        
-        if not es.ping():
-            raise ConnectionError("Cannot connect to Elasticsearch")
-        
-        if not es.indices.exists(index=CATEGORIES_INDEX_NAME):
-            logger.warning(f"Index {CATEGORIES_INDEX_NAME} does not exist")
-            return []
-
         query_body = {
             "size": 1000,
             "query": {"match_all": {}},
             "_source": ["category", "sales", "percentage"]
         }
 
-        resp = await asyncio.to_thread(es.search, index=CATEGORIES_INDEX_NAME, body=query_body)
+        resp = await search_analytics_index(es, CATEGORIES_INDEX_NAME, query_body)
+        if resp is None:
+            return []
         
         data = []
         for hit in resp["hits"]["hits"]:
@@ -245,27 +310,19 @@ async def get_categories_from_es() -> List[Dict[str, Any]]:
         logger.error(f"Error in get_sales_from_es: {str(e)}")
         raise
     
-async def get_customers_from_es() -> List[Dict[str, Any]]:
+@single_flight("analytics:read:customers")
+async def get_customers_from_es(es: AsyncElasticsearch) -> List[Dict[str, Any]]:
     """Retrieve categories analytics data from Elasticsearch"""
     try:
-        es = get_es_client()
-        
-        if not es.ping():
-            raise ConnectionError("Cannot connect to Elasticsearch")
-        
-        if not es.indices.exists(index=CUSTOMERS_INDEX_NAME):
-            logger.warning(f"Index {CUSTOMERS_INDEX_NAME} does not exist")
-            return []
-
         query_body = {
             "size": 1000,
             "query": {"match_all": {}},
             "_source": ["category", "gender", "customers", "total_items"]
         }
 
-        resp = await asyncio.to_thread(es.search, index=CUSTOMERS_INDEX_NAME, body=query_body)
-        
-        print(resp)
+        resp = await search_analytics_index(es, CUSTOMERS_INDEX_NAME, query_body)
+        if resp is None:
+            return []
         
         data = []
         for hit in resp["hits"]["hits"]:
@@ -284,25 +341,19 @@ async def get_customers_from_es() -> List[Dict[str, Any]]:
         logger.error(f"Error in get_sales_from_es: {str(e)}")
         raise
     
-async def get_customers_age_group_from_es() -> List[Dict[str, Any]]:
+@single_flight("analytics:read:customers_age_group")
+async def get_customers_age_group_from_es(es: AsyncElasticsearch) -> List[Dict[str, Any]]:
     """Retrieve categories analytics data from Elasticsearch"""
     try:
-        es = get_es_client()
-        
-        if not es.ping():
-            raise ConnectionError("Cannot connect to Elasticsearch")
-        
-        if not es.indices.exists(index=CUSTOMERS_AGE_GROUP_INDEX_NAME):
-            logger.warning(f"Index {CUSTOMERS_AGE_GROUP_INDEX_NAME} does not exist")
-            return []  
-        
         query_body = {
             "size": 1000,
             "query": {"match_all": {}},
             "_source": ["ageGroup", "customers", "sales"]
         }
         
-        resp = await asyncio.to_thread(es.search, index=CUSTOMERS_AGE_GROUP_INDEX_NAME, body=query_body) 
+        resp = await search_analytics_index(es, CUSTOMERS_AGE_GROUP_INDEX_NAME, query_body)
+        if resp is None:
+            return [] 
         
         data = []
         for hit in resp["hits"]["hits"]:
@@ -1,21 +1,44 @@
 from typing import Any, Dict, Callable, Tuple, List
+from datetime import datetime, timedelta, timezone
 from sqlalchemy import text
-from elasticsearch import helpers
+from elasticsearch import AsyncElasticsearch, NotFoundError
+from elasticsearch.helpers import async_bulk
 import asyncio
 import logging
 
+from app.core.config import settings
+from app.db.rollup import PRUNE_DELETIONS_SQL
+
 logger = logging.getLogger(__name__)
 
+WATERMARK_INDEX_NAME = "sync_watermarks"
+WATERMARK_MAPPING = {
+    "mappings": {
+        "properties": {
+            "index": {"type": "keyword"},
+            "watermark": {"type": "date"},
+            "last_full_at": {"type": "date"},
+            "full_docs": {"type": "integer"},
+            "last_mode": {"type": "keyword"},
+            "last_docs": {"type": "integer"},
+            "last_buckets": {"type": "integer"},
+        }
+    },
+    "settings": {"number_of_shards": 1, "number_of_replicas": 0},
+}
+# Re-read a little behind the watermark: rows stamped by a transaction that committed late are not missed
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
 
 class ElasticSyncService:
-    def __init__(self, es_client, db_session_factory):
+    def __init__(self, es_client: AsyncElasticsearch, db_session_factory):
         self.es = es_client
         self.db_session_factory = db_session_factory
 
     async def ensure_index(self, index_name: str, mapping: Dict[str, Any]) -> None:
         try:
-            if not self.es.indices.exists(index=index_name):
-                self.es.indices.create(index=index_name, body=mapping)
+            if not await self.es.indices.exists(index=index_name):
+                await self.es.indices.create(index=index_name, body=mapping)
                 logger.info(f"✅ Created index: {index_name}")
         except Exception as e:
             logger.error(f"❌ Error creating index {index_name}: {str(e)}")
@@ -27,11 +50,16 @@ class ElasticSyncService:
         query: Any,
         transform_func: Callable[[Any], Tuple[Dict[str, Any], str]],
         mapping: Dict[str, Any] | None = None,
+        params: Dict[str, Any] | None = None,
+        stream: bool = settings.ES_SYNC_STREAM,
     ) -> int:
+        if stream:
+            return await self.stream_to_es(index_name, query, transform_func, mapping, params)
+
         async with self.db_session_factory() as session:
             try:
                 if isinstance(query, str):
-                    result = await session.execute(text(query))
+                    result = await session.execute(text(query), params or {})
                     rows = result.fetchall()
                 else:
                     result = await session.execute(query)
@@ -44,7 +72,7 @@ class ElasticSyncService:
                     logger.info(f"No data found for {index_name}")
                     return 0
 
-                if not self.es.ping():
+                if not await self.es.ping():
                     raise ConnectionError("Cannot connect to Elasticsearch")
 
                 # Ensure index if mapping provided
@@ -61,8 +89,7 @@ class ElasticSyncService:
                     for source, doc_id in [transform_func(row)]
                 ]
 
-                success_count, failed_actions = await asyncio.to_thread(
-                    helpers.bulk,
+                success_count, failed_actions = await async_bulk(
                     self.es,
                     actions,
                     index=index_name,
@@ -82,3 +109,215 @@ class ElasticSyncService:
                 raise
             finally:
                 await session.close()
+
+    async def stream_to_es(
+        self,
+        index_name: str,
+        query: Any,
+        transform_func: Callable[[Any], Tuple[Dict[str, Any], str]],
+        mapping: Dict[str, Any] | None = None,
+        params: Dict[str, Any] | None = None,
+        chunk_size: int = settings.ES_SYNC_CHUNK_SIZE,
+        max_in_flight: int = settings.ES_SYNC_MAX_IN_FLIGHT,
+    ) -> int:
+        """Stream rows from a server-side cursor into bulk requests.
+
+        At most ``max_in_flight`` chunks are queued or being indexed at any time, so memory
+        stays at roughly ``(2 * max_in_flight + 1) * chunk_size`` rows regardless of result size.
+        """
+        if not await self.es.ping():
+            raise ConnectionError("Cannot connect to Elasticsearch")
+
+        if mapping:
+            await self.ensure_index(index_name, mapping)
+
+        batches: asyncio.Queue = asyncio.Queue(maxsize=max_in_flight)
+        totals = {"success": 0, "failed": 0}
+
+        async def index_batches():
+            while True:
+                actions = await batches.get()
+                try:
+                    if actions is None:
+                        return
+                    success_count, failed_actions = await async_bulk(
+                        self.es,
+                        actions,
+                        index=index_name,
+                        raise_on_error=False,
+                        raise_on_exception=False,
+                    )
+                    totals["success"] += success_count
+                    if failed_actions:
+                        totals["failed"] += len(failed_actions)
+                        logger.warning(f"⚠️ Failed to index {len(failed_actions)} docs in {index_name}: {failed_actions[:3]}")
+                finally:
+                    batches.task_done()
+
+        workers = [asyncio.create_task(index_batches()) for _ in range(max_in_flight)]
+
+        async def enqueue(actions):
+            for worker in workers:
+                if worker.done():
+                    worker.result()  # surface a crashed indexer instead of blocking on a full queue
+            # Blocks while max_in_flight chunks are already waiting: backpressure on the cursor.
+            # Race the put against the indexers, or a crash while we wait would leave nobody to drain it
+            put = asyncio.create_task(batches.put(actions))
+            try:
+                while not put.done():
+                    # Indexers that already took their end marker have exited cleanly
+                    running = [worker for worker in workers if not worker.done()]
+                    if not running:
+                        raise RuntimeError(f"Indexers for {index_name} stopped before the stream ended")
+                    done, _ = await asyncio.wait([put, *running], return_when=asyncio.FIRST_COMPLETED)
+                    for worker in done - {put}:
+                        worker.result()
+            finally:
+                put.cancel()
+
+        async with self.db_session_factory() as session:
+            try:
+                statement = text(query) if isinstance(query, str) else query
+                result = await session.stream(
+                    statement.execution_options(yield_per=chunk_size), params or {}
+                )
+
+                async for rows in result.partitions(chunk_size):
+                    actions = [
+                        {
+                            "_index": index_name,
+                            "_id": doc_id,
+                            "_source": source,
+                        }
+                        for row in rows
+                        for source, doc_id in [transform_func(row)]
+                    ]
+                    await enqueue(actions)
+
+                for _ in workers:
+                    await enqueue(None)
+                await asyncio.gather(*workers)
+
+                logger.info(f"✅ Streamed {totals['success']} records → {index_name} ({totals['failed']} failed)")
+                return totals["success"]
+
+            except Exception as e:
+                logger.error(f"❌ Streaming sync error for {index_name}: {str(e)}")
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                await session.rollback()
+                raise
+
+    async def get_watermark(self, index_name: str) -> Dict[str, Any] | None:
+        try:
+            resp = await self.es.get(index=WATERMARK_INDEX_NAME, id=index_name)
+            return resp["_source"]
+        except NotFoundError:
+            return None
+
+    async def save_watermark(self, index_name: str, state: Dict[str, Any]) -> None:
+        await self.ensure_index(WATERMARK_INDEX_NAME, WATERMARK_MAPPING)
+        await self.es.index(index=WATERMARK_INDEX_NAME, id=index_name, document=state)
+
+    async def delete_stale_docs(self, index_name: str, kept_ids: set, buckets: List[str] | None = None) -> int:
+        """Delete docs the last sync didn't write: in the given buckets, or anywhere on a full run"""
+        query: Dict[str, Any] = {"bool": {"must_not": [{"ids": {"values": list(kept_ids)}}]}}
+        if buckets is not None:
+            query["bool"]["filter"] = [{"terms": {"bucket": buckets}}]
+
+        resp = await self.es.delete_by_query(
+            index=index_name, query=query, conflicts="proceed", refresh=True, ignore_unavailable=True
+        )
+        if resp.get("deleted"):
+            logger.info(f"🧹 Deleted {resp['deleted']} stale docs from {index_name}")
+        return resp.get("deleted", 0)
+
+    async def sync_incremental(
+        self,
+        index_name: str,
+        query: str,
+        transform_func: Callable[[Any], Tuple[Dict[str, Any], str]],
+        changed_buckets_query: str,
+        mapping: Dict[str, Any] | None = None,
+        force_full: bool = False,
+        bucket_params: Callable[[List[str] | None], Dict[str, Any]] | None = None,
+    ) -> Dict[str, Any]:
+        """Re-index only the buckets whose source rows changed since the index's watermark.
+
+        ``query`` takes a ``:buckets`` text[] parameter and must return every bucket when it is
+        NULL (full run). Both it and ``changed_buckets_query`` (which takes ``:since``) return a
+        ``bucket`` column. Documents keep their deterministic ``_id``s, so re-indexing a bucket
+        upserts it in place, and docs of a re-indexed bucket that weren't written are deleted.
+        ``bucket_params`` turns the buckets into extra query parameters, e.g. date bounds that
+        let PostgreSQL prune partitions instead of testing every row against the bucket list.
+        """
+        try:
+            state = await self.get_watermark(index_name) or {}
+
+            async with self.db_session_factory() as session:
+                # Change stamps come from the rollup triggers: updated rows and deletion tombstones
+                new_watermark = (await session.execute(
+                    text("SELECT COALESCE(MAX(changed_at), now()) FROM daily_sales_rollup_changes")
+                )).scalar()
+
+                last_full_at = state.get("last_full_at")
+                full_due = (
+                    force_full
+                    or not state.get("watermark")
+                    or datetime.fromisoformat(last_full_at) < datetime.now(timezone.utc) - timedelta(seconds=settings.ANALYTICS_SYNC_FULL_INTERVAL_SECONDS)
+                )
+
+                buckets = None
+                if not full_due:
+                    since = datetime.fromisoformat(state["watermark"]) - WATERMARK_OVERLAP
+                    result = await session.execute(text(changed_buckets_query), {"since": since})
+                    buckets = [str(row.bucket) for row in result]
+
+            written = set()
+
+            def tag_bucket(row):
+                source, doc_id = transform_func(row)
+                written.add(doc_id)
+                return {**source, "bucket": str(row.bucket)}, doc_id
+
+            if buckets == []:
+                docs = 0
+            else:
+                params = {"buckets": buckets, **(bucket_params(buckets) if bucket_params else {})}
+                docs = await self.sync_to_es(index_name, query, tag_bucket, mapping, params=params)
+                # Upserts alone never remove a doc whose rows were all deleted
+                await self.delete_stale_docs(index_name, written, buckets)
+
+            if full_due:
+                async with self.db_session_factory() as session:
+                    await session.execute(
+                        text(PRUNE_DELETIONS_SQL), {"seconds": settings.ANALYTICS_SYNC_FULL_INTERVAL_SECONDS}
+                    )
+                    await session.commit()
+
+            now = datetime.now(timezone.utc).isoformat()
+            full_docs = docs if full_due else state.get("full_docs")
+            await self.save_watermark(index_name, {
+                "index": index_name,
+                "watermark": new_watermark.isoformat(),
+                "last_full_at": now if full_due else last_full_at,
+                "full_docs": full_docs,
+                "last_mode": "full" if full_due else "incremental",
+                "last_docs": docs,
+                "last_buckets": None if full_due else len(buckets),
+            })
+
+            report = {
+                "mode": "full" if full_due else "incremental",
+                "buckets": None if full_due else len(buckets),
+                "docs_touched": docs,
+                "full_run_docs": full_docs,
+            }
+            if not full_due and full_docs:
+                logger.info(f"🔁 Incremental sync {index_name}: {docs} of {full_docs} docs ({docs / full_docs:.1%})")
+            return report
+
+        except Exception as e:
+            logger.error(f"❌ Incremental sync error for {index_name}: {str(e)}")
+            raise
@@ -1,22 +1,100 @@
-from app.db.elastic import get_es_client
-from app.db.postgresql import AsyncSessionLocal
-from app.services.elastic_sync import ElasticSyncService
+import asyncio
+import base64
+import json
+import logging
+from elasticsearch import AsyncElasticsearch, NotFoundError
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from dateutil.relativedelta import relativedelta
 from fastapi import HTTPException, status
 
-ES_INDEX = "news"
+from app.core.config import settings
+from app.db.news_indices import (
+    NEWS_ALIAS, NEWS_ROLLUP_INDEX, existing_news_indices, forget_news_indices, indices_for_range,
+)
+
+logger = logging.getLogger(__name__)
+
+# Panel sizes for the combined overview search
+OVERVIEW_TITLE_KEYWORDS = 10
+OVERVIEW_TAGS = 50
+OVERVIEW_KEYWORDS = 15
+
+# Timeline window used when the overview has no search or date filter
+DEFAULT_TIMELINE_RANGE = {
+    "gte": "2020-01-01T00:00:00Z",
+    "lte": "2024-12-12T00:00:00Z"
+}
+
+
+# Sort value ES gives a hit with no publish_date in a descending sort (missing sorts last)
+MISSING_DATE_SORT = -(2 ** 63)
+
+
+def _encode_cursor(state: Dict[str, Any]) -> str:
+    """Opaque page token.
+
+    After the first page: {"before": last publish_date, "seen": ids at that timestamp},
+    since no PIT exists yet. After later pages: {"pit": PIT id, "after": last hit's sort values}.
+    """
+    raw = json.dumps(state, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not ({"pit", "after"} <= data.keys() or {"before", "seen"} <= data.keys()):
+            raise ValueError(cursor)
+        return data
+    except (ValueError, AttributeError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
 
 class NewsAnalyticsService:
-    def __init__(self):
-        self.es = get_es_client()
-        self.elastic_sync = ElasticSyncService(self.es, AsyncSessionLocal)
+    def __init__(
+        self,
+        es_client: AsyncElasticsearch,
+        alias: str = NEWS_ALIAS,
+        route_by_date: bool = True,
+        rollup_index: Optional[str] = NEWS_ROLLUP_INDEX,
+    ):
+        self.es = es_client
+        self.alias = alias
+        self.route_by_date = route_by_date
+        # None disables the rollup and always aggregates raw articles
+        self.rollup_index = rollup_index
+
+    async def _target(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> str:
+        """Comma-separated monthly indices overlapping the date filter, or the alias when unfiltered"""
+        if not self.route_by_date or not (start_date or end_date):
+            return self.alias
+        existing = await existing_news_indices(self.es, self.alias)
+        return ",".join(indices_for_range(existing, start_date, end_date, self.alias))
+
+    async def _search_news(self, body: Dict[str, Any], start_date: Optional[datetime] = None,
+                           end_date: Optional[datetime] = None) -> Dict[str, Any]:
+        """Search the articles for the date filter.
+
+        The monthly index names come from a per-process cache. When an import swaps the
+        alias to a new version and drops the old one, a cached name 404s; the alias is then
+        resolved again and the search retried, instead of quietly returning nothing.
+        """
+        try:
+            return await self.es.search(index=await self._target(start_date, end_date), body=body)
+        except NotFoundError:
+            forget_news_indices(self.alias)
+            return await self.es.search(
+                index=await self._target(start_date, end_date),
+                ignore_unavailable=True,
+                body=body
+            )
         
     def _build_base_query(self, search_query: Optional[str] = None, 
                          start_date: Optional[datetime] = None, 
                          end_date: Optional[datetime] = None) -> Dict[str, Any]:
         must_clauses = []
+        filter_clauses = []
         
         if search_query:
             must_clauses.append({
@@ -34,139 +112,145 @@ class NewsAnalyticsService:
                 date_range["gte"] = start_date
             if end_date:
                 date_range["lte"] = end_date
-            must_clauses.append({"range": {"publish_date": date_range}})
+            # Filter context: no scoring, cacheable, and no obstacle to index-sort early termination
+            filter_clauses.append({"range": {"publish_date": date_range}})
         
-        if must_clauses:
-            return {"bool": {"must": must_clauses}}
+        if must_clauses or filter_clauses:
+            return {"bool": {"must": must_clauses, "filter": filter_clauses}}
         else:
             return {"match_all": {}}
 
-    def get_top_title_keywords(self, size: int = 10, search_query: Optional[str] = None,
+    def _title_keywords_aggs(self, size: int) -> Dict[str, Any]:
+        return {"title_keywords": {"terms": {"field": "title_keywords", "size": size}}}
+
+    def _parse_title_keywords(self, aggs: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"keyword": b["key"], "count": b["doc_count"]} 
+                for b in aggs["title_keywords"]["buckets"]]
+
+    async def get_top_title_keywords(self, size: int = 10, search_query: Optional[str] = None,
                               start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
         query = self._build_base_query(search_query, start_date, end_date)
         
-        resp = self.es.search(
-            index=ES_INDEX,
-            body={
-                "size": 0,
-                "query": query,
-                "aggs": {
-                    "title_keywords": {
-                        "terms": {
-                            "field": "title.indonesian_words",
-                            "size": size
-                        }
-                    }
-                }
-            }
+        resp = await self._search_news(
+            {"size": 0, "query": query, "aggs": self._title_keywords_aggs(size)},
+            start_date, end_date
         )
-        return [{"keyword": b["key"], "count": b["doc_count"]} 
-                for b in resp["aggregations"]["title_keywords"]["buckets"]]
+        return self._parse_title_keywords(resp["aggregations"])
+
+    def _tag_aggs(self, size: int) -> Dict[str, Any]:
+        return {"tags": {"terms": {"field": "tag", "size": size}}}
+
+    def _parse_tags(self, aggs: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"tag": b["key"], "count": b["doc_count"]} 
+                for b in aggs["tags"]["buckets"]]
 
-    def get_tag_distribution(self, size: int = 20, search_query: Optional[str] = None,
+    async def get_tag_distribution(self, size: int = 20, search_query: Optional[str] = None,
                            start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        if not search_query:
+            rollup = await self._search_rollup(self._rollup_aggs("tag", self._tag_aggs(size)), start_date, end_date)
+            if rollup is not None:
+                return self._parse_tags(rollup["rollup_tag"])
+
         query = self._build_base_query(search_query, start_date, end_date)
         
-        resp = self.es.search(
-            index=ES_INDEX,
-            body={
-                "size": 0,
-                "query": query,
-                "aggs": {
-                    "tags": {
-                        "terms": {
-                            "field": "tag",
-                            "size": size
-                        }
-                    }
-                }
-            }
+        resp = await self._search_news(
+            {"size": 0, "query": query, "aggs": self._tag_aggs(size)},
+            start_date, end_date
         )
-        return [{"tag": b["key"], "count": b["doc_count"]} 
-                for b in resp["aggregations"]["tags"]["buckets"]]
+        return self._parse_tags(resp["aggregations"])
 
-    def get_timeline(self, interval: str = "week", search_query: Optional[str] = None,
-                    start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
-        query = self._build_base_query(search_query, start_date, end_date)
-        
-        if not start_date and not end_date:
-            if query.get("match_all"):
-                query = {
-                    "range": {
-                        "publish_date": {
-                            "gte": "2020-01-01T00:00:00Z",
-                            "lte": "2024-12-12T00:00:00Z"
-                        }
-                    }
-                }
+    def _timeline_aggs(self, interval: str = "week", search_query: Optional[str] = None,
+                       start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Dict[str, Any]:
         if start_date and end_date:
             diff = relativedelta(end_date, start_date)
             total_months = diff.years * 12 + diff.months
             if total_months < 2:
                 interval = "day"
-        
-        resp = self.es.search(
-            index=ES_INDEX,
-            body={
-                "size": 0,
-                "query": query,
-                "aggs": {
-                    "timeline": {
-                        "date_histogram": {
-                            "field": "publish_date",
-                            "calendar_interval": interval,
-                            "min_doc_count": 0,
-                        }
-                    }
+
+        timeline = {
+            "timeline": {
+                "date_histogram": {
+                    "field": "publish_date",
+                    "calendar_interval": interval,
+                    "min_doc_count": 0,
                 }
             }
-        )
+        }
+
+        # An unfiltered overview would histogram the whole index; cap it to the default window.
+        # As a filter agg it shares the overview's search instead of needing its own query.
+        if not search_query and not start_date and not end_date:
+            return {
+                "timeline_window": {
+                    "filter": {"range": {"publish_date": DEFAULT_TIMELINE_RANGE}},
+                    "aggs": timeline,
+                }
+            }
+        return timeline
+
+    def _parse_timeline(self, aggs: Dict[str, Any]) -> List[Dict[str, Any]]:
+        timeline = aggs["timeline_window"]["timeline"] if "timeline_window" in aggs else aggs["timeline"]
         return [{"date": b["key_as_string"], "count": b["doc_count"]} 
-                for b in resp["aggregations"]["timeline"]["buckets"]]
+                for b in timeline["buckets"]]
 
-    def get_top_keywords(self, field: str = "article_text.indonesian_words", size: int = 10,
-                        search_query: Optional[str] = None, start_date: Optional[datetime] = None, 
-                        end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-            'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-            'should', 'may', 'might', 'must', 'shall', 'can', 'this', 'that',
-            'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me',
-            'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our',
-            'their', 'yang', 'dari', 'dan', 'di', 'ke', 'untuk', 'pada', 'dengan',
-            'adalah', 'akan', 'telah', 'sudah', 'juga', 'tidak', 'ini', 'itu',
-            'atau', 'saja', 'bisa', 'dapat', 'harus', 'masih', 'lebih', 'karena'
-        }
+    async def _search_rollup(self, aggs: Dict[str, Any], start_date: Optional[datetime] = None,
+                             end_date: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Run day-level aggregations on the rollup index; None when it isn't there yet"""
+        if not self.rollup_index:
+            return None
 
-        html_noise = {
-            'img', 'src', 'href', 'alt', 'class', 'id', 'div', 'span', 'width', 
-            'height', 'style', 'px', 'rgb', 'rgba', 'https', 'http', 'www',
-            'jpg', 'jpeg', 'png', 'gif', 'css', 'js', 'html', 'htm'
-        }
+        # Rollup rows are whole days, so widen the bounds to the days they fall in
+        date_range = {}
+        if start_date:
+            date_range["gte"] = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        if end_date:
+            date_range["lte"] = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        query = {"bool": {"filter": [{"range": {"publish_date": date_range}}]}} if date_range else {"match_all": {}}
+
+        try:
+            resp = await self.es.search(
+                index=self.rollup_index,
+                body={"size": 0, "track_total_hits": False, "query": query, "aggs": aggs}
+            )
+        except NotFoundError:
+            logger.warning(f"⚠️ Rollup index {self.rollup_index} missing, aggregating raw articles")
+            return None
+        return resp["aggregations"]
+
+    def _rollup_aggs(self, kind: str, aggs: Dict[str, Any]) -> Dict[str, Any]:
+        return {f"rollup_{kind}": {"filter": {"term": {"kind": kind}}, "aggs": aggs}}
+
+    async def get_timeline(self, interval: str = "week", search_query: Optional[str] = None,
+                    start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        if not search_query:
+            rollup = await self._search_rollup(
+                self._rollup_aggs("day", self._timeline_aggs(interval, search_query, start_date, end_date)),
+                start_date, end_date
+            )
+            if rollup is not None:
+                return self._parse_timeline(rollup["rollup_day"])
 
-        excluded_words = {w.lower() for w in stop_words | html_noise}
         query = self._build_base_query(search_query, start_date, end_date)
+        
+        resp = await self._search_news(
+            {"size": 0, "query": query, "aggs": self._timeline_aggs(interval, search_query, start_date, end_date)},
+            start_date, end_date
+        )
+        return self._parse_timeline(resp["aggregations"])
 
-        resp = self.es.search(
-            index=ES_INDEX,
-            body={
-                "size": 0,
-                "query": query,
-                "aggs": {
-                    "keywords": {
-                        "terms": {
-                            "field": field,
-                            "size": size * 5,
-                            "min_doc_count": 3,
-                            "exclude": list(excluded_words)
-                        }
-                    }
+    def _keywords_aggs(self, field: str, size: int) -> Dict[str, Any]:
+        return {
+            "keywords": {
+                "terms": {
+                    "field": field,
+                    "size": size * 5,
+                    "min_doc_count": 3
                 }
             }
-        )
+        }
 
-        buckets = resp["aggregations"]["keywords"]["buckets"][:size]
+    def _parse_keywords(self, aggs: Dict[str, Any], size: int) -> List[Dict[str, Any]]:
+        buckets = aggs["keywords"]["buckets"][:size]
         total_count = sum(b["doc_count"] for b in buckets) or 1
 
         return [
@@ -178,55 +262,130 @@ class NewsAnalyticsService:
             for b in buckets
         ]
 
-    def get_recent_news(
+    async def get_top_keywords(self, field: str = "article_keywords", size: int = 10,
+                        search_query: Optional[str] = None, start_date: Optional[datetime] = None, 
+                        end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        query = self._build_base_query(search_query, start_date, end_date)
+
+        resp = await self._search_news(
+            {"size": 0, "query": query, "aggs": self._keywords_aggs(field, size)},
+            start_date, end_date
+        )
+        return self._parse_keywords(resp["aggregations"], size)
+
+    async def _open_pit(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> str:
+        try:
+            resp = await self.es.open_point_in_time(
+                index=await self._target(start_date, end_date),
+                keep_alive=settings.NEWS_PIT_KEEP_ALIVE,
+            )
+        except NotFoundError:
+            forget_news_indices(self.alias)
+            resp = await self.es.open_point_in_time(
+                index=await self._target(start_date, end_date),
+                keep_alive=settings.NEWS_PIT_KEEP_ALIVE,
+                ignore_unavailable=True,
+            )
+        return resp["id"]
+
+    async def _close_pit(self, pit_id: str) -> None:
+        try:
+            await self.es.close_point_in_time(body={"id": pit_id})
+        except Exception as e:
+            # Not fatal: the PIT expires on its own after the keep-alive
+            logger.warning(f"⚠️ Could not close news PIT: {str(e)}")
+
+    async def get_recent_news(
         self, 
         size: int = 10, 
         search_query: Optional[str] = None,
         start_date: Optional[datetime] = None, 
         end_date: Optional[datetime] = None,
-        search_after: Optional[List[Any]] = None
+        cursor: Optional[str] = None
     ):
+        """One page of the feed, newest first, plus the cursor for the next page (None on the last page).
+
+        The first page is a plain search, so feeds nobody scrolls never hold a point in time.
+        Asking for page 2 opens the PIT: it resumes below page 1's last timestamp, skipping the
+        ids already shown at that timestamp. Later pages search_after on that snapshot, so
+        articles indexed or merged mid-scroll can't shift the pages. Sorting on _shard_doc
+        after publish_date breaks ties between articles sharing a timestamp.
+        """
+        state = _decode_cursor(cursor) if cursor else None
         query = self._build_base_query(search_query, start_date, end_date)
-        body={
+
+        body = {
             "size": size,
-            "query": query,
-            "sort": [{"publish_date": {"order": "desc"}}],
-            "_source": ["title", "author", "publish_date", "url", "main_image", "tag"]
+            "_source": ["title", "author", "publish_date", "url", "main_image", "tag"],
+            # The feed never shows a total; without counting every match, the publish_date
+            # index sort lets each shard terminate early once it has a page of hits
+            "track_total_hits": False,
         }
-        
-        if search_after:
-            body["search_after"] = search_after
-            
-        
-        resp = self.es.search(index=ES_INDEX,body=body)
-        hits = [hit["_source"] for hit in resp["hits"]["hits"]]
 
-        next_search_after = resp["hits"]["hits"][-1]["sort"] if resp["hits"]["hits"] else None
+        if state is None:
+            resp = await self._search_news(
+                {**body, "query": query, "sort": [{"publish_date": {"order": "desc"}}]},
+                start_date, end_date
+            )
+            page = resp["hits"]["hits"]
+            hits = [hit["_source"] for hit in page]
+            if len(page) < size:
+                return hits, None
+
+            last = page[-1]["sort"][0]
+            seen = [hit["_id"] for hit in page if hit["sort"][0] == last]
+            return hits, _encode_cursor({"before": last, "seen": seen})
+
+        body["sort"] = [{"publish_date": {"order": "desc"}}, {"_shard_doc": "asc"}]
+        if "before" in state:
+            pit_id = await self._open_pit(start_date, end_date)
+            body["query"] = self._below_first_page(query, state["before"], state["seen"])
+        else:
+            pit_id = state["pit"]
+            body["query"] = query
+            body["search_after"] = state["after"]
 
+        try:
+            resp = await self.es.search(body={**body, "pit": {"id": pit_id, "keep_alive": settings.NEWS_PIT_KEEP_ALIVE}})
+        except NotFoundError:
+            # The client came back after the keep-alive: resume from the same sort position on a
+            # fresh snapshot. Ties at that exact timestamp may repeat or skip once.
+            logger.warning("⚠️ News PIT expired, reopening to resume the feed")
+            pit_id = await self._open_pit(start_date, end_date)
+            resp = await self.es.search(body={**body, "pit": {"id": pit_id, "keep_alive": settings.NEWS_PIT_KEEP_ALIVE}})
 
-        return hits, next_search_after
+        # Each response may carry a refreshed PIT id; always continue with the latest one
+        pit_id = resp.get("pit_id", pit_id)
+        page = resp["hits"]["hits"]
+        hits = [hit["_source"] for hit in page]
 
+        if len(page) < size:
+            await self._close_pit(pit_id)
+            return hits, None
 
+        return hits, _encode_cursor({"pit": pit_id, "after": page[-1]["sort"]})
 
-    def get_statistics(self, search_query: Optional[str] = None,
-                      start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Dict[str, Any]:
-        query = self._build_base_query(search_query, start_date, end_date)
-        
-        resp = self.es.search(
-            index=ES_INDEX,
-            body={
-                "size": 0,
-                "query": query,
-                "aggs": {
-                    "total_articles": {"value_count": {"field": "title"}},
-                    "unique_authors": {"cardinality": {"field": "author.keyword"}},
-                    "unique_tags": {"cardinality": {"field": "tag"}},
-                    "date_stats": {"stats": {"field": "publish_date"}}
-                }
-            }
-        )
-        
-        aggs = resp["aggregations"]
+    def _below_first_page(self, query: Dict[str, Any], before: int, seen: List[str]) -> Dict[str, Any]:
+        """Articles after the first page: not newer than its last one, minus the ids it already showed"""
+        if before == MISSING_DATE_SORT:
+            # The first page already ran into undated articles; only those are left
+            position = {"bool": {"must_not": {"exists": {"field": "publish_date"}}}}
+        else:
+            position = {"bool": {"should": [
+                {"range": {"publish_date": {"lte": before, "format": "epoch_millis"}}},
+                {"bool": {"must_not": {"exists": {"field": "publish_date"}}}},
+            ]}}
+        return {"bool": {"must": [query], "filter": [position], "must_not": [{"ids": {"values": seen}}]}}
+
+    def _statistics_aggs(self) -> Dict[str, Any]:
+        return {
+            "total_articles": {"value_count": {"field": "title"}},
+            "unique_authors": {"cardinality": {"field": "author.keyword"}},
+            "unique_tags": {"cardinality": {"field": "tag"}},
+            "date_stats": {"stats": {"field": "publish_date"}}
+        }
+
+    def _parse_statistics(self, aggs: Dict[str, Any]) -> Dict[str, Any]:
         date_stats = aggs["date_stats"]
         
         return {
@@ -239,19 +398,64 @@ class NewsAnalyticsService:
             } if date_stats["count"] > 0 else None
         }
 
-    def get_overview(
+    async def get_statistics(self, search_query: Optional[str] = None,
+                      start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Dict[str, Any]:
+        query = self._build_base_query(search_query, start_date, end_date)
+        
+        resp = await self._search_news(
+            {"size": 0, "query": query, "aggs": self._statistics_aggs()},
+            start_date, end_date
+        )
+        return self._parse_statistics(resp["aggregations"])
+
+    async def get_overview(
         self,
         search_query: Optional[str] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
         try:
+            # Every panel shares the same filter, so evaluate it once and run all aggregations in one search
+            query = self._build_base_query(search_query, start_date, end_date)
+            raw_aggs = {
+                **self._statistics_aggs(),
+                **self._title_keywords_aggs(OVERVIEW_TITLE_KEYWORDS),
+                **self._keywords_aggs("article_keywords", OVERVIEW_KEYWORDS),
+            }
+            day_aggs = {
+                **self._tag_aggs(OVERVIEW_TAGS),
+                **self._timeline_aggs("week", search_query, start_date, end_date),
+            }
+
+            raw_resp, rollup = None, None
+            if not search_query:
+                # Timeline and tags only need day-level counts: read them from the rollup while
+                # the raw search handles the panels that need article text
+                raw_resp, rollup = await asyncio.gather(
+                    self._search_news({"size": 0, "query": query, "aggs": raw_aggs}, start_date, end_date),
+                    self._search_rollup(
+                        {**self._rollup_aggs("tag", self._tag_aggs(OVERVIEW_TAGS)),
+                         **self._rollup_aggs("day", self._timeline_aggs("week", search_query, start_date, end_date))},
+                        start_date, end_date
+                    ),
+                )
+
+            if rollup is None:
+                # Full-text search, or no rollup yet: aggregate whatever is still missing from raw articles
+                resp = await self._search_news(
+                    {"size": 0, "query": query, "aggs": day_aggs if raw_resp else {**raw_aggs, **day_aggs}},
+                    start_date, end_date
+                )
+                aggs = {**(raw_resp["aggregations"] if raw_resp else {}), **resp["aggregations"]}
+            else:
+                aggs = raw_resp["aggregations"]
+
             data = {
-                "statistics": self.get_statistics(search_query, start_date, end_date),
-                "top_title_keywords": self.get_top_title_keywords(10, search_query, start_date, end_date),
-                "tag_distribution": self.get_tag_distribution(50, search_query, start_date, end_date),
-                "timeline": self.get_timeline("week", search_query, start_date, end_date),
-                "top_keywords": self.get_top_keywords("article_text.indonesian_words", 15, search_query, start_date, end_date),
+                "statistics": self._parse_statistics(aggs),
+                "top_title_keywords": self._parse_title_keywords(aggs),
+                "tag_distribution": self._parse_tags(rollup["rollup_tag"] if rollup else aggs),
+                "timeline": self._parse_timeline(rollup["rollup_day"] if rollup else aggs),
+                "top_keywords": self._parse_keywords(aggs, OVERVIEW_KEYWORDS),
             }
 
             if not data["statistics"]["total_articles"]:
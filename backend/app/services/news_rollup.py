@@ -0,0 +1,99 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import logging
+
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk
+
+from app.db.news_indices import NEWS_ALIAS, NEWS_ROLLUP_INDEX, NEWS_ROLLUP_MAPPING, new_version, swap_alias
+
+logger = logging.getLogger(__name__)
+
+# Composite buckets fetched per page while scanning the raw articles
+ROLLUP_PAGE_SIZE = 1000
+
+# kind -> extra composite source besides the day; "day" rows are the per-day totals
+ROLLUP_KINDS = {
+    "day": None,
+    "tag": {"tag": {"terms": {"field": "tag"}}},
+    "author": {"author": {"terms": {"field": "author.keyword"}}},
+}
+
+
+class NewsRollupService:
+    """Builds news_daily_rollup from the raw news articles with composite aggregations"""
+
+    def __init__(self, es_client: AsyncElasticsearch, alias: str = NEWS_ALIAS, rollup_index: str = NEWS_ROLLUP_INDEX):
+        self.es = es_client
+        self.alias = alias
+        self.rollup_index = rollup_index
+
+    async def _composite_buckets(self, source: str, kind: str) -> AsyncIterator[Dict[str, Any]]:
+        sources = [{"day": {"date_histogram": {"field": "publish_date", "calendar_interval": "day"}}}]
+        if ROLLUP_KINDS[kind]:
+            sources.append(ROLLUP_KINDS[kind])
+
+        after = None
+        while True:
+            composite = {"size": ROLLUP_PAGE_SIZE, "sources": sources}
+            if after:
+                composite["after"] = after
+
+            resp = await self.es.search(
+                index=source,
+                body={"size": 0, "track_total_hits": False, "aggs": {"rollup": {"composite": composite}}}
+            )
+            agg = resp["aggregations"]["rollup"]
+            for bucket in agg["buckets"]:
+                yield bucket
+
+            after = agg.get("after_key")
+            if not after or not agg["buckets"]:
+                return
+
+    async def _actions(self, source: str, target_index: str) -> AsyncIterator[Dict[str, Any]]:
+        for kind, extra in ROLLUP_KINDS.items():
+            field = next(iter(extra)) if extra else None
+            async for bucket in self._composite_buckets(source, kind):
+                key = bucket["key"]
+                source = {"publish_date": key["day"], "kind": kind, "_doc_count": bucket["doc_count"]}
+                if field:
+                    source[field] = key[field]
+                yield {
+                    "_index": target_index,
+                    "_id": f"{kind}:{key['day']}:{key.get(field, '')}",
+                    "_source": source,
+                }
+
+    async def build(self, source: Optional[str] = None) -> Tuple[str, int]:
+        """Build a rollup version from ``source`` (the serving alias by default) without serving it.
+
+        The news import builds it from the new raw version, then swaps both aliases together.
+        """
+        source = source or self.alias
+        target_index = f"{self.rollup_index}-{new_version()}"
+        try:
+            await self.es.indices.create(index=target_index, body=NEWS_ROLLUP_MAPPING)
+
+            success_count, failed_actions = await async_bulk(
+                self.es, self._actions(source, target_index), raise_on_error=False, raise_on_exception=False
+            )
+            if failed_actions:
+                logger.warning(f"⚠️ Failed to index rollup docs in {target_index}: {failed_actions}")
+
+            await self.es.indices.refresh(index=target_index)
+            logger.info(f"✅ Rolled up {success_count} day/tag/author rows from {source} → {target_index}")
+            return target_index, success_count
+        except Exception as e:
+            logger.error(f"❌ News rollup error: {str(e)}")
+            await self.es.indices.delete(index=target_index, ignore_unavailable=True)
+            raise
+
+    async def delete_versions(self, indices: List[str]) -> None:
+        if indices:
+            await self.es.indices.delete(index=",".join(indices))
+
+    async def rebuild(self) -> int:
+        """Rebuild from what the news alias serves now and swap the rollup alias onto it"""
+        target_index, success_count = await self.build()
+        await self.delete_versions(await swap_alias(self.es, self.rollup_index, [target_index]))
+        return success_count
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.redis_utils import get_data_epoch
+from app.db.partitions import ensure_upcoming_partitions
+from app.db.postgresql import engine
+from app.services.analytics_services import AnalyticsService
+
+logger = logging.getLogger(__name__)
+
+
+class SyncJob:
+    """One periodic job and the bookkeeping reported by /analytics/sync/status"""
+
+    def __init__(self, name: str, run: Callable[[], Awaitable[Any]], interval_seconds: int, follows_data_epoch: bool = True):
+        self.name = name
+        self.run = run
+        self.interval_seconds = interval_seconds
+        # Epoch-following jobs also run as soon as transactional data changes
+        self.follows_data_epoch = follows_data_epoch
+
+        self.lock = asyncio.Lock()
+        self.status = "idle"
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+        self.last_epoch: Optional[int] = None
+        self.next_run_at: float = 0.0
+        self.run_count = 0
+        self.failure_count = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "interval_seconds": self.interval_seconds,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_duration_ms": self.last_duration_ms,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "next_run_in_seconds": max(round(self.next_run_at - time.monotonic(), 1), 0),
+            "run_count": self.run_count,
+            "failure_count": self.failure_count,
+        }
+
+
+class AnalyticsSyncScheduler:
+    """In-process scheduler that keeps the Elasticsearch analytics indices fresh.
+
+    Every job runs on its interval, and epoch-following jobs also run on the next poll
+    after the analytics data epoch moves. Reads never sync; they only query the indices.
+    """
+
+    def __init__(self, poll_seconds: int = settings.ANALYTICS_SYNC_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.jobs: Dict[str, SyncJob] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running: set = set()
+
+    def add_job(self, job: SyncJob) -> None:
+        self.jobs[job.name] = job
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"⏱️ Analytics sync scheduler started with jobs: {', '.join(self.jobs)}")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        for task in list(self._running):
+            task.cancel()
+        await asyncio.gather(self._task, *self._running, return_exceptions=True)
+        self._task = None
+        logger.info("🛑 Analytics sync scheduler stopped")
+
+    def trigger(self, name: Optional[str] = None) -> List[str]:
+        """Mark one job (or every job) as due and wake the scheduler"""
+        names = [name] if name else list(self.jobs)
+        for job_name in names:
+            if job_name not in self.jobs:
+                raise KeyError(job_name)
+            self.jobs[job_name].next_run_at = 0.0
+        self._wakeup.set()
+        return names
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "poll_seconds": self.poll_seconds,
+            "jobs": [job.to_dict() for job in self.jobs.values()],
+        }
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self._tick()
+            except Exception as e:
+                logger.error(f"❌ Analytics sync scheduler tick failed: {str(e)}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _tick(self) -> None:
+        epoch = None
+        # With analytics sync off only maintenance jobs are registered, and they ignore the epoch
+        if any(job.follows_data_epoch for job in self.jobs.values()):
+            try:
+                epoch = await get_data_epoch()
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read analytics data epoch, using intervals only: {str(e)}")
+
+        now = time.monotonic()
+        for job in self.jobs.values():
+            if job.lock.locked():
+                continue
+
+            data_changed = job.follows_data_epoch and epoch is not None and epoch != job.last_epoch
+            if now >= job.next_run_at or data_changed:
+                task = asyncio.create_task(self._run_job(job, epoch))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _run_job(self, job: SyncJob, epoch: Optional[int]) -> None:
+        async with job.lock:
+            job.status = "running"
+            job.last_run_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+
+            try:
+                job.last_result = await job.run()
+                job.last_error = None
+                job.last_epoch = epoch
+                job.status = "success"
+                logger.info(f"✅ Sync job {job.name} finished: {job.last_result}")
+            except asyncio.CancelledError:
+                job.status = "cancelled"
+                raise
+            except Exception as e:
+                job.last_error = str(e)
+                job.failure_count += 1
+                job.status = "failed"
+                logger.error(f"❌ Sync job {job.name} failed: {str(e)}")
+            finally:
+                job.run_count += 1
+                job.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+                job.next_run_at = time.monotonic() + job.interval_seconds
+
+
+async def maintain_partitions() -> int:
+    async with engine.begin() as conn:
+        return await conn.run_sync(ensure_upcoming_partitions, settings.PARTITION_MONTHS_AHEAD)
+
+
+def register_analytics_jobs(scheduler: AnalyticsSyncScheduler, analytics_service: AnalyticsService) -> None:
+    interval = settings.ANALYTICS_SYNC_INTERVAL_SECONDS
+
+    scheduler.add_job(SyncJob("sales", analytics_service.sync_sales_analytics, interval))
+    scheduler.add_job(SyncJob("categories", analytics_service.sync_categories_analytics, interval))
+    scheduler.add_job(SyncJob("customers_gender", analytics_service.sync_customers_analytics, interval))
+    scheduler.add_job(SyncJob("customers_age_group", analytics_service.sync_customers_age_group_analytics, interval))
+
+
+def register_maintenance_jobs(scheduler: AnalyticsSyncScheduler) -> None:
+    # Inserts fail once they pass the last monthly partition, so this runs even with analytics sync off
+    scheduler.add_job(SyncJob("partitions", maintain_partitions, 24 * 60 * 60, follows_data_epoch=False))
+
+
+# Jobs are registered by the lifespan once the shared Elasticsearch client is open
+analytics_scheduler = AnalyticsSyncScheduler()
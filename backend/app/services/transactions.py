@@ -4,7 +4,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from app.models.transactions import PaginatedTransactionItems, TransactionItemModel, PaginationMetaData
 from app.models.global_type import PaginationMetaData
-from app.db.elastic import get_es_client
 from app.db.postgresql import AsyncSessionLocal
 from app.db.schemas import Transaction, TransactionItem
 from app.services.elastic_sync import ElasticSyncService
@@ -27,29 +26,13 @@ class TransactionsServices:
     DEFAULT_PAGE_SIZE = 10
     MAX_PAGE_SIZE = 100
     
-    def __init__(self, db: AsyncSession) -> None:
+    def __init__(self, db: AsyncSession, es_client: AsyncElasticsearch) -> None:
         self.db = db
-        self._es_client: Optional[AsyncElasticsearch] = None 
+        self._es_client = es_client
     
     async def get_es_client(self) -> AsyncElasticsearch:
-        if self._es_client is None:
-            self._es_client = AsyncElasticsearch(
-                hosts=[{
-                    "scheme": "http",
-                    "host": "localhost",
-                    "port": 9200
-                }],
-                request_timeout=30,
-                max_retries=3,
-                retry_on_timeout=True,
-            )
         return self._es_client
     
-    async def close_connections(self):
-        if self._es_client:
-            await self._es_client.close()
-            self._es_client = None
-    
     async def debug_indices(self):
         """Debug method to check if indices exist and have data"""
         es_client = await self.get_es_client()
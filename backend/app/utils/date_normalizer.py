@@ -0,0 +1,140 @@
+from datetime import date, datetime
+from typing import Callable, Dict, Optional, Union
+
+from dateutil import parser as dateutil_parser
+
+# dateutil's reading of all-numeric dates like 05/06/2023 (May 6), pinned explicitly
+DAYFIRST = False
+
+# Numeric day/month layouts as (month-first, day-first) pairs. Which order a value uses
+# depends on the value (13/06/2023 can only be day-first), never on a learned format.
+NUMERIC_DAY_MONTH_FORMATS = [
+    ("%m/%d/%Y %H:%M:%S", "%d/%m/%Y %H:%M:%S"),
+    ("%m/%d/%Y %H:%M", "%d/%m/%Y %H:%M"),
+    ("%m/%d/%Y", "%d/%m/%Y"),
+    ("%m-%d-%Y", "%d-%m-%Y"),
+]
+
+# Tried in order the first time a new shape of timestamp shows up; none of them can
+# succeed with a different reading than dateutil's
+CANDIDATE_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d %H:%M:%S",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%d %B %Y %H:%M",
+    "%d %b %Y %H:%M",
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%a, %d %b %Y %H:%M:%S %z",
+    "%a, %d %b %Y %H:%M:%S %Z",
+]
+
+# Digits → 9, letters → a: "2023-01-05 10:00:00" and "2024-12-31 23:59:59" share one shape
+_SHAPE_TABLE = str.maketrans(
+    "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "9999999999" + "a" * 52,
+)
+
+# Upper bound on remembered shapes, so free-text garbage can't grow the cache forever
+MAX_SHAPES = 512
+
+Parser = Callable[[str], datetime]
+
+
+def _strptime(fmt: str) -> Parser:
+    return lambda value: datetime.strptime(value, fmt)
+
+
+def _day_month(month_first: str, day_first: str) -> Parser:
+    """Same rule as dateutil: the pinned order, unless that order's month field is > 12"""
+    preferred, other = (day_first, month_first) if DAYFIRST else (month_first, day_first)
+
+    def parse(value: str) -> datetime:
+        try:
+            return datetime.strptime(value, preferred)
+        except ValueError:
+            return datetime.strptime(value, other)
+    return parse
+
+
+class DateNormalizer:
+    """Timestamp parsing that learns the few formats a dataset actually uses.
+
+    The first value of each shape is parsed with dateutil, and the first fast path
+    (``fromisoformat`` or one precompiled ``strptime`` format) that gives the same result
+    is remembered for that shape. Later values of the shape skip format inference. Fast
+    paths only succeed on the reading dateutil would pick: ambiguous numeric day/month
+    dates go through ``_day_month``, which decides per value, so the result doesn't depend
+    on which value of a shape came first. A fast path that rejects a value falls back to
+    dateutil for that value.
+    """
+
+    def __init__(self, formats=CANDIDATE_FORMATS, max_shapes: int = MAX_SHAPES):
+        self.candidates: list = [("isoformat", datetime.fromisoformat)]
+        self.candidates += [(fmt, _strptime(fmt)) for fmt in formats]
+        self.candidates += [(f"{md} | {dm}", _day_month(md, dm)) for md, dm in NUMERIC_DAY_MONTH_FORMATS]
+        self.max_shapes = max_shapes
+        self._by_shape: Dict[str, Optional[Parser]] = {}
+        self.stats = {"fast": 0, "learned": 0, "fallback": 0, "invalid": 0}
+
+    def _learn(self, shape: str, value: str) -> datetime:
+        expected = dateutil_parser.parse(value, dayfirst=DAYFIRST)
+        chosen = None
+        for _, candidate in self.candidates:
+            try:
+                if candidate(value) == expected:
+                    chosen = candidate
+                    break
+            except ValueError:
+                continue
+
+        if len(self._by_shape) < self.max_shapes:
+            # None marks a shape no fast path handles, so it goes straight to dateutil next time
+            self._by_shape[shape] = chosen
+        self.stats["learned"] += 1
+        return expected
+
+    def parse(self, value: Union[str, datetime, date, None]) -> Optional[datetime]:
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, date):
+            return datetime(value.year, value.month, value.day)
+
+        value = value.strip()
+        if not value:
+            return None
+
+        shape = value.translate(_SHAPE_TABLE)
+        try:
+            if shape not in self._by_shape:
+                return self._learn(shape, value)
+
+            fast = self._by_shape[shape]
+            if fast is not None:
+                try:
+                    result = fast(value)
+                    self.stats["fast"] += 1
+                    return result
+                except ValueError:
+                    pass
+
+            self.stats["fallback"] += 1
+            return dateutil_parser.parse(value, dayfirst=DAYFIRST)
+        except (ValueError, OverflowError):
+            self.stats["invalid"] += 1
+            return None
+
+    def normalize(self, value: Union[str, datetime, date, None]) -> Optional[str]:
+        """ISO 8601 string (with offset when the input has one), or None if unparseable"""
+        if isinstance(value, date) and not isinstance(value, datetime):
+            return value.isoformat()
+        parsed = self.parse(value)
+        return parsed.isoformat() if parsed else None
+
+
+# One per process; pool workers each learn their own shapes
+date_normalizer = DateNormalizer()
@@ -1,179 +1,463 @@
-from elasticsearch import Elasticsearch, helpers
+"""
+Import the news CSV into a new version of the monthly news indices, then swap the alias.
+
+The CSV is cut into blocks at record boundaries, blocks are parsed in a process pool
+(date normalizing, tag literal_eval and keyword extraction are CPU-bound), and concurrent
+bulk workers index them. The bulk chunk size grows while Elasticsearch keeps up and
+halves on 429 rejections. Finished byte offsets are checkpointed, so a crashed import
+picks up where it stopped. The version is built with replicas off and refresh disabled,
+then force-merged, given its serving settings and swapped in behind the news alias in one
+atomic update; older versions are garbage-collected. Readers keep using the previous
+version until the swap:
+
+    python -m app.utils.import_csv_to_es --csv ../news_data.csv
+    python -m app.utils.import_csv_to_es --csv ../news_data.csv --resume
+    python -m app.utils.import_csv_to_es --workers 8 --bulk-workers 4 --block-mb 8
+"""
+import argparse
+import ast
+import asyncio
 import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import ast
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from elasticsearch import ApiError, AsyncElasticsearch
+
+from app.core.config import settings
+from app.db.elastic import create_async_es_client
+from app.db.news_indices import (
+    build_template_name, delete_stale_indices, monthly_index_name, new_version, news_index_template, swap_aliases,
+)
+from app.services.news_rollup import NewsRollupService
+from app.utils.date_normalizer import date_normalizer
+from app.utils.keywords import extract_keywords
+
+INDEX_NAME = "news"  # read alias; dokumen ditulis ke news-YYYY-MM
+CSV_FILE = "../news_data.csv"  # Adjust sesuai path CSV
+
+# Bytes of CSV handed to one parse task
+BLOCK_BYTES = 4 * 1024 * 1024
+# Bulk request size bounds in documents; AIMD moves between them
+MIN_CHUNK_SIZE = 100
+MAX_CHUNK_SIZE = 5000
+START_CHUNK_SIZE = 500
+CHUNK_SIZE_STEP = 250
+MAX_REJECTION_RETRIES = 8
+REPORT_EVERY_SECONDS = 5
+# Force-merge and health waits on a freshly loaded version can take a while
+FINALIZE_TIMEOUT_SECONDS = 3600
+
 
 # ======================
 # 1. Normalize date dengan aman
 # ======================
-from datetime import datetime
-from dateutil import parser
-
 def normalize_date(value):
-    if not value or value.strip() == "":
-        return None
-    try:
-        # Gunakan parser otomatis, termasuk timezone
-        dt = parser.parse(value)
-        return dt.isoformat()  # Menghasilkan ISO 8601 dengan offset
-    except Exception:
-        return None
+    # Format yang sudah dikenal lewat fast path; dateutil hanya untuk bentuk baru
+    return date_normalizer.normalize(value)  # ISO 8601 dengan offset
 
 
 # ======================
-# 2. Connect ke Elasticsearch
+# 2. Convert CSV row → Elasticsearch action
 # ======================
-es = Elasticsearch("http://localhost:9200")
-INDEX_NAME = "news"
-CSV_FILE = "../news_data.csv"  # Adjust sesuai path CSV
+def row_to_action(row: Dict[str, str], doc_id: str, index_name: str, version: Optional[str] = None) -> Dict[str, Any]:
+    clean_row = {}
+
+    # Map CSV columns → Elasticsearch fields
+    clean_row["title"] = (row.get("title") or "").strip() or None
+    clean_row["author"] = (row.get("author") or "").strip() or None
+    clean_row["article_text"] = (row.get("article_text") or "").strip() or None
+    clean_row["url"] = (row.get("url") or "").strip() or None
+    clean_row["main_image"] = (row.get("main_image") or "").strip() or None
+    clean_row["title_keywords"] = extract_keywords(clean_row["title"]) or None
+    clean_row["article_keywords"] = extract_keywords(clean_row["article_text"]) or None
+    raw_tag = (row.get("tag") or "").strip()
+    if raw_tag:
+        try:
+            # Convert stringified array into real Python list
+            clean_row["tag"] = [t.strip() for t in ast.literal_eval(raw_tag)]
+        except Exception:
+            # fallback: if parsing fails, put it as single-element list
+            clean_row["tag"] = [raw_tag]
+
+    # Normalize publish_date
+    clean_row["publish_date"] = normalize_date(row.get("publish_date") or "")
+    target_index = monthly_index_name(
+        datetime.fromisoformat(clean_row["publish_date"]) if clean_row["publish_date"] else None,
+        index_name,
+        version
+    )
+
+    # Hapus field None agar Elasticsearch tidak error
+    clean_row = {k: v for k, v in clean_row.items() if v is not None}
+
+    return {"_index": target_index, "_id": doc_id, "_source": clean_row}
+
+
+def parse_block(fieldnames: List[str], start: int, data: bytes, index_name: str,
+                version: Optional[str] = None) -> Tuple[int, List[Dict[str, Any]]]:
+    """Runs in a pool process: one block of whole CSV records → bulk actions.
+
+    Document ids are the record's byte offset in the file, so ids don't depend on how the
+    file was split and a resumed import overwrites instead of duplicating.
+    """
+    actions = []
+    offset = start
+    for record in split_records(data):
+        for values in csv.reader(io.StringIO(record.decode("utf-8"), newline="")):
+            actions.append(row_to_action(dict(zip(fieldnames, values)), f"doc_{offset}", index_name, version))
+        offset += len(record)
+    return start, actions
+
+
+def split_records(data: bytes) -> Iterator[bytes]:
+    """Raw bytes of each CSV record, keeping newlines inside quoted fields"""
+    record, quotes = [], 0
+    for line in data.splitlines(keepends=True):
+        record.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            yield b"".join(record)
+            record, quotes = [], 0
+    if record:
+        yield b"".join(record)
+
 
 # ======================
-# 3. Mapping untuk index
+# 3. Split the file into blocks at record boundaries
 # ======================
-mapping = {
-    "settings": {
-        "analysis": {
-        "analyzer": {
-            "indonesian_custom": {
-            "tokenizer": "standard",
-            "filter": ["lowercase", "indonesian_stop"]
-            }
-        },
-        "filter": {
-            "indonesian_stop": {
-            "type": "stop",
-            "stopwords": "_indonesian_"
-            }
-        }
-        }
-    },
-    "mappings": {
-        "properties": {
-            "title": {
-                "type": "text", 
-                "fielddata": True, 
-                "fields": {
-                    "keyword": {
-                        "type": "keyword"
-                    }, 
-                    "indonesian_words": {
-                        "type": "text",
-                        "analyzer": "indonesian_custom",
-                        "fielddata": True
-                    }
-                }
-            },
-            "author": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
-            "publish_date": {"type": "date", "format": "strict_date_optional_time||yyyy-MM-dd||yyyy-MM-dd HH:mm:ss||epoch_millis"},
-            "article_text": {
-                "type": "text",
-                "fielddata": True,
-                "fields": {
-                    "indonesian_words": {
-                    "type": "text",
-                    "analyzer": "indonesian_custom",
-                    "fielddata": True
-                    }
-                }
-            },
-            "url": {"type": "keyword"},
-            "main_image": {"type": "keyword"},
-            "tag": {"type": "keyword"}
-        }
-    }
-}
+def read_header(file_path: str) -> Tuple[List[str], int]:
+    with open(file_path, "rb") as f:
+        header = f.readline()
+    fieldnames = next(csv.reader([header.decode("utf-8-sig")]))
+    return fieldnames, len(header)
+
+
+def iter_blocks(file_path: str, start: int, block_bytes: int) -> Iterator[Tuple[int, bytes]]:
+    """(offset, bytes) blocks that only end where the quote count is even.
+
+    A quoted article_text can span lines, so a block may only be cut after a line that
+    leaves no quote open. Escaped quotes ("") come in pairs and don't change the parity.
+    """
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        block, size, quotes, offset = [], 0, 0, start
+        for line in f:
+            block.append(line)
+            size += len(line)
+            quotes += line.count(b'"')
+            if size >= block_bytes and quotes % 2 == 0:
+                yield offset, b"".join(block)
+                offset += size
+                block, size, quotes = [], 0, 0
+        if block:
+            yield offset, b"".join(block)
+
 
 # ======================
-# 4. Recreate index
+# 4. Checkpoint
 # ======================
-if es.indices.exists(index=INDEX_NAME):
-    print(f"Deleting old index: {INDEX_NAME}")
-    es.indices.delete(index=INDEX_NAME)
+class Checkpoint:
+    """Byte offset up to which every block is indexed, persisted after each advance.
+
+    Blocks finish out of order; the committed offset only moves past a block once every
+    block before it is done too, so resuming from it never skips records.
+    """
+
+    def __init__(self, path: str, csv_path: str, committed: int, version: Optional[str] = None):
+        self.path = path
+        self.csv_path = csv_path
+        self.committed = committed
+        # Index version being built; a resumed import keeps loading into the same one
+        self.version = version
+        self._pending: Dict[int, int] = {}  # block start → block end, in file order
+        self._done: set = set()
+        stat = os.stat(csv_path)
+        self._identity = {"csv": os.path.abspath(csv_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+    @classmethod
+    def load(cls, path: str, csv_path: str, default_offset: int) -> "Checkpoint":
+        checkpoint = cls(path, csv_path, default_offset)
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return checkpoint
+
+        if {k: saved.get(k) for k in checkpoint._identity} != checkpoint._identity:
+            print(f"⚠️ Checkpoint {path} belongs to a different or modified CSV, starting over")
+            return checkpoint
+        checkpoint.committed = saved["offset"]
+        checkpoint.version = saved.get("version")
+        return checkpoint
+
+    def register(self, start: int, end: int) -> None:
+        self._pending[start] = end
+
+    def mark_done(self, start: int) -> None:
+        self._done.add(start)
+        advanced = False
+        while self.committed in self._done:
+            self._done.discard(self.committed)
+            self.committed = self._pending.pop(self.committed)
+            advanced = True
+        if advanced:
+            self.save()
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({**self._identity, "offset": self.committed, "version": self.version}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
 
-print(f"Creating index: {INDEX_NAME}")
-es.indices.create(index=INDEX_NAME, body=mapping)
 
 # ======================
-# 5. Convert CSV → Actions untuk bulk
+# 5. Adaptive bulk indexing
 # ======================
-def csv_to_actions(file_path, index_name):
-    with open(file_path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader):
-            clean_row = {}
-
-            # Map CSV columns → Elasticsearch fields
-            clean_row["title"] = row.get("title", "").strip() or None
-            clean_row["author"] = row.get("author", "").strip() or None
-            clean_row["article_text"] = row.get("article_text", "").strip() or None
-            clean_row["url"] = row.get("url", "").strip() or None
-            clean_row["main_image"] = row.get("main_image", "").strip() or None
-            raw_tag = row.get("tag", "").strip()
-            if raw_tag:
-                try:
-                    # Convert stringified array into real Python list
-                    clean_row["tag"] = [t.strip() for t in ast.literal_eval(raw_tag)]
-                except Exception:
-                    # fallback: if parsing fails, put it as single-element list
-                    clean_row["tag"] = [raw_tag]
-
-
-            # Normalize publish_date
-            publish_date = row.get("publish_date", "").strip()
-            clean_row["publish_date"] = normalize_date(publish_date)
-
-            # Hapus field None agar Elasticsearch tidak error
-            clean_row = {k: v for k, v in clean_row.items() if v is not None}
-
-            # Gunakan ID unik dari nomor baris
-            doc_id = f"doc_{i+1}"
-
-            yield {
-                "_index": index_name,
-                "_id": doc_id,
-                "_source": clean_row
-            }
+class ChunkSizer:
+    """Additive increase while bulks succeed, halve on 429 back-pressure"""
+
+    def __init__(self, start: int = START_CHUNK_SIZE, minimum: int = MIN_CHUNK_SIZE,
+                 maximum: int = MAX_CHUNK_SIZE, step: int = CHUNK_SIZE_STEP):
+        self.size = start
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.rejections = 0
+
+    def on_success(self) -> None:
+        self.size = min(self.maximum, self.size + self.step)
+
+    def on_rejected(self) -> None:
+        self.rejections += 1
+        self.size = max(self.minimum, self.size // 2)
+
+
+class ImportStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.indexed = 0
+        self.failed = 0
+        self.last_report = self.started
+
+    def report(self, sizer: ChunkSizer, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self.last_report < REPORT_EVERY_SECONDS:
+            return
+        self.last_report = now
+        elapsed = now - self.started
+        print(
+            f"📦 {self.indexed} indexed, {self.failed} failed, "
+            f"{self.indexed / elapsed if elapsed else 0:.0f} docs/s, "
+            f"chunk {sizer.size}, {sizer.rejections} rejections"
+        )
+
+
+async def bulk_with_backpressure(es: AsyncElasticsearch, actions: List[Dict[str, Any]],
+                                 sizer: ChunkSizer, stats: ImportStats) -> None:
+    """Index actions in chunks of the current size; 429-rejected docs are retried with backoff"""
+    queue = list(actions)
+    retries = 0
+    while queue:
+        chunk, queue = queue[:sizer.size], queue[sizer.size:]
+        operations = []
+        for action in chunk:
+            operations.append({"index": {"_index": action["_index"], "_id": action["_id"]}})
+            operations.append(action["_source"])
+
+        try:
+            resp = await es.bulk(operations=operations)
+            items = [item["index"] for item in resp["items"]]
+        except ApiError as e:
+            if e.meta.status != 429:
+                raise
+            items = [{"status": 429}] * len(chunk)
+
+        rejected = []
+        for action, item in zip(chunk, items):
+            if item["status"] == 429:
+                rejected.append(action)
+            elif item["status"] >= 300:
+                stats.failed += 1
+                if stats.failed <= 5:
+                    print(f"❌ {action['_id']}: {item.get('error')}")
+            else:
+                stats.indexed += 1
+
+        if rejected:
+            retries += 1
+            if retries > MAX_REJECTION_RETRIES:
+                raise RuntimeError(f"Elasticsearch kept rejecting bulk requests ({len(rejected)} docs pending)")
+            sizer.on_rejected()
+            queue = rejected + queue
+            await asyncio.sleep(min(2 ** retries * 0.1, 10))
+        else:
+            retries = 0
+            sizer.on_success()
+        stats.report(sizer)
+
 
 # ======================
-# 6. Bulk import ke Elasticsearch
+# 6. Indices
 # ======================
-try:
-    print("Starting bulk import...")
-    success_count, failed_items = helpers.bulk(
-        es,
-        csv_to_actions(CSV_FILE, INDEX_NAME),
-        chunk_size=500,
-        request_timeout=120
+async def finalize_version(
+    es: AsyncElasticsearch, index_name: str, version: str, rollup: Optional[NewsRollupService] = None,
+) -> Tuple[List[str], List[str]]:
+    """Make a loaded version servable and swap the alias onto it; returns (new, swapped-out) indices.
+
+    With ``rollup``, its rollup is built from the new version first and both aliases move in
+    the same update, so raw statistics, tags and timeline always come from one version.
+    """
+    pattern = f"{index_name}-{version}-*"
+    new_indices = sorted((await es.indices.get(index=pattern)).keys())
+    if not new_indices:
+        raise RuntimeError(f"Nothing was indexed into {pattern}, keeping the current version")
+
+    slow = es.options(request_timeout=FINALIZE_TIMEOUT_SECONDS)
+    await es.indices.refresh(index=pattern)
+    print(f"🗜️ Force-merging {len(new_indices)} indices")
+    await slow.indices.forcemerge(index=pattern, max_num_segments=1)
+
+    # Back to serving settings; null restores the default refresh interval
+    await es.indices.put_settings(
+        index=pattern,
+        settings={"number_of_replicas": settings.NEWS_INDEX_REPLICAS, "refresh_interval": None},
+    )
+    await slow.cluster.health(
+        index=pattern, wait_for_status="yellow", wait_for_no_initializing_shards=True,
+        timeout=f"{FINALIZE_TIMEOUT_SECONDS}s",
     )
-    print(f"✅ Import completed successfully! Documents indexed: {success_count}")
 
-    # Refresh index supaya bisa langsung dicari
-    es.indices.refresh(index=INDEX_NAME)
+    targets = {index_name: new_indices}
+    if rollup:
+        rollup_index, rolled_up = await rollup.build(pattern)
+        print(f"📊 Daily rollup rows: {rolled_up}")
+        targets[rollup.rollup_index] = [rollup_index]
 
-    # Count total documents
-    count = es.count(index=INDEX_NAME)
-    print(f"📈 Total documents in index: {count['count']}")
+    swapped = await swap_aliases(es, targets)
+    previous = swapped[index_name]
+    print(f"🔀 Alias {index_name} → {version} ({len(new_indices)} indices, {len(previous)} swapped out)")
+    if rollup:
+        await rollup.delete_versions(swapped[rollup.rollup_index])
 
-except helpers.BulkIndexError as e:
-    print(f"❌ {len(e.errors)} documents failed to import")
-    print("First 5 errors:")
-    for error in e.errors[:5]:
-        print(error)
+    # Indices created from now on (e.g. a new month from live writes) get the serving template
+    await es.indices.delete_index_template(name=build_template_name(index_name, version))
+    return new_indices, previous
 
-except Exception as e:
-    print(f"❌ Unexpected error: {e}")
 
 # ======================
-# 7. Optional: Test query
+# 7. Import
 # ======================
-try:
-    test_query = {"query": {"match_all": {}}, "size": 1}
-    result = es.search(index=INDEX_NAME, body=test_query)
-    if result['hits']['total']['value'] > 0:
-        print("\n🔍 Sample document:")
-        sample_doc = result['hits']['hits'][0]['_source']
-        for k, v in sample_doc.items():
-            print(f"  {k}: {str(v)[:100]}{'...' if len(str(v)) > 100 else ''}")
-
-except Exception as e:
-    print(f"⚠️ Could not retrieve sample document: {e}")
+async def import_csv(
+    file_path: str = CSV_FILE,
+    index_name: str = INDEX_NAME,
+    workers: int = os.cpu_count() or 2,
+    bulk_workers: int = 4,
+    block_bytes: int = BLOCK_BYTES,
+    resume: bool = False,
+    checkpoint_path: Optional[str] = None,
+) -> int:
+    fieldnames, header_end = read_header(file_path)
+    checkpoint = Checkpoint.load(checkpoint_path or f"{file_path}.checkpoint", file_path, header_end) if resume \
+        else Checkpoint(checkpoint_path or f"{file_path}.checkpoint", file_path, header_end)
+    if not checkpoint.version or checkpoint.committed <= header_end:
+        checkpoint.version = new_version()
+    version = checkpoint.version
+
+    es = create_async_es_client()
+    sizer, stats = ChunkSizer(), ImportStats()
+    # Parsed blocks waiting for a bulk worker; bounded so parsing can't run far ahead of ES
+    queue: asyncio.Queue = asyncio.Queue(maxsize=bulk_workers * 2)
+    loop = asyncio.get_running_loop()
+
+    failures: List[Exception] = []
+
+    async def bulk_worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            start, actions = item
+            try:
+                await bulk_with_backpressure(es, actions, sizer, stats)
+                checkpoint.mark_done(start)
+            except Exception as e:
+                # Keep draining so the producer never blocks; the block stays uncommitted
+                failures.append(e)
+
+    try:
+        if checkpoint.committed > header_end:
+            print(f"↩️ Resuming {version} from byte {checkpoint.committed} of {os.path.getsize(file_path)}")
+        else:
+            print(f"Building {index_name} version {version}")
+        # Serving template for everything else under the alias, plus a build-only one for this version
+        await es.indices.put_index_template(name=index_name, body=news_index_template(index_name))
+        await es.indices.put_index_template(
+            name=build_template_name(index_name, version), body=news_index_template(index_name, version)
+        )
+
+        tasks = [asyncio.create_task(bulk_worker()) for _ in range(bulk_workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for start, data in iter_blocks(file_path, checkpoint.committed, block_bytes):
+                checkpoint.register(start, start + len(data))
+                pending.add(loop.run_in_executor(pool, parse_block, fieldnames, start, data, index_name, version))
+
+                # Keep every parse process busy without holding the whole file in memory
+                if len(pending) >= workers * 2:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        await queue.put(future.result())
+                # A failed bulk stops the import; the checkpoint still points before that block
+                if failures:
+                    raise failures[0]
+
+            for future in asyncio.as_completed(pending):
+                await queue.put(await future)
+
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+        if failures:
+            raise failures[0]
+
+        stats.report(sizer, force=True)
+        # Rollup harian (per hari, per tag, per author) untuk timeline dan tag distribution
+        _, previous = await finalize_version(es, index_name, version, NewsRollupService(es, index_name))
+        checkpoint.clear()
+
+        count = await es.count(index=index_name)
+        print(f"📈 Total documents in index: {count['count']}")
+
+        # The version just swapped out stays around for a quick rollback; anything older goes
+        deleted = await delete_stale_indices(es, index_name, previous if settings.NEWS_KEEP_PREVIOUS_VERSION else [])
+        if deleted:
+            print(f"🧹 Deleted {len(deleted)} old indices")
+        return stats.indexed
+    finally:
+        await es.close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--csv", default=CSV_FILE)
+    arg_parser.add_argument("--index", default=INDEX_NAME, help="Read alias; documents go to <index>-<version>-YYYY-MM")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Parse processes")
+    arg_parser.add_argument("--bulk-workers", type=int, default=4, help="Concurrent bulk requests")
+    arg_parser.add_argument("--block-mb", type=float, default=BLOCK_BYTES / 1024 / 1024)
+    arg_parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint")
+    arg_parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: <csv>.checkpoint)")
+    args = arg_parser.parse_args()
+
+    asyncio.run(import_csv(
+        args.csv, args.index, args.workers, args.bulk_workers,
+        int(args.block_mb * 1024 * 1024), args.resume, args.checkpoint,
+    ))
@@ -0,0 +1,55 @@
+import re
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+# Same list as Elasticsearch's "_indonesian_" stop filter (Tala's Indonesian stop words),
+# which the keyword panels used to aggregate through
+INDONESIAN_STOP_WORDS = frozenset(
+    Path(__file__).with_name("stopwords_id.txt").read_text(encoding="utf-8").split()
+)
+
+# Shared by the CSV import (ingest-time extraction) and anything else that needs to
+# agree on what counts as a keyword
+STOP_WORDS = INDONESIAN_STOP_WORDS | {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'shall', 'can', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me',
+    'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our',
+    'their', 'yang', 'dari', 'dan', 'di', 'ke', 'untuk', 'pada', 'dengan',
+    'adalah', 'akan', 'telah', 'sudah', 'juga', 'tidak', 'ini', 'itu',
+    'atau', 'saja', 'bisa', 'dapat', 'harus', 'masih', 'lebih', 'karena'
+}
+
+HTML_NOISE = {
+    'img', 'src', 'href', 'alt', 'class', 'id', 'div', 'span', 'width',
+    'height', 'style', 'px', 'rgb', 'rgba', 'https', 'http', 'www',
+    'jpg', 'jpeg', 'png', 'gif', 'css', 'js', 'html', 'htm'
+}
+
+EXCLUDED_KEYWORDS = frozenset(w.lower() for w in STOP_WORDS | HTML_NOISE)
+
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens with tags, stop words, HTML noise and bare numbers removed"""
+    text = HTML_TAG_RE.sub(" ", text)
+    return [
+        token for token in TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and not token.isdigit() and token not in EXCLUDED_KEYWORDS
+    ]
+
+
+def extract_keywords(text: Optional[str], limit: Optional[int] = None) -> List[str]:
+    """Distinct normalized terms of ``text``, most frequent first, at most ``limit`` of them.
+
+    Each term appears once per document, so a terms aggregation over the stored field
+    counts documents, the same as the old fielddata aggregation did.
+    """
+    if not text:
+        return []
+    return [term for term, _ in Counter(tokenize(text)).most_common(limit)]
@@ -0,0 +1,161 @@
+import csv
+import io
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Boolean, Column, DateTime, Integer, Numeric
+
+# NULL marker in the COPY output; CSV's default (empty field) can't be told apart from ''
+COPY_NULL = "\\N"
+
+# Decoded text handed to the consumer at a time
+COPY_CHUNK_CHARS = 8 * 1024 * 1024
+
+# Chunks buffered ahead of the decoder before COPY is paused
+COPY_QUEUE_DEPTH = 4
+
+Converter = Optional[Callable[[str], Any]]
+
+
+def column_expression(column: Column) -> str:
+    """SELECT expression for a column, formatted by PostgreSQL the way the ES mapping wants it"""
+    name = f'"{column.name}"'
+    if isinstance(column.type, DateTime):
+        # JSON rendering is ISO 8601 with a 'T' and a full offset; the default text output isn't
+        return f"to_json({name}) #>> '{{}}' AS {name}"
+    return name
+
+
+def column_converter(column: Column) -> Converter:
+    """Python conversion for a CSV field of this column; None means the text is used as is"""
+    if isinstance(column.type, Boolean):
+        return "t".__eq__
+    if isinstance(column.type, Integer):
+        return int
+    if isinstance(column.type, Numeric):
+        return float
+    # UUIDs, strings, dates (YYYY-MM-DD) and the JSON-formatted timestamps are already right
+    return None
+
+
+def copy_sql(table, columns: Sequence[Column], where: str = "") -> str:
+    select_list = ", ".join(column_expression(column) for column in columns)
+    return (
+        f"COPY (SELECT {select_list} FROM {table.name}{where}) "
+        f"TO STDOUT WITH (FORMAT csv, NULL '{COPY_NULL}')"
+    )
+
+
+class CopyStopped(Exception):
+    """Raised inside COPY when the consumer goes away, to abort the transfer"""
+
+
+class _ChunkWriter(io.TextIOBase):
+    """File object for copy_expert that hands out whole chunks through a bounded queue.
+
+    PostgreSQL sends one CopyData message per row and psycopg2 writes each one separately,
+    so flushing between writes never cuts a row (or a quoted newline) in half.
+    """
+
+    def __init__(self, chunks: queue.Queue, stop: threading.Event, chunk_chars: int):
+        self.chunks = chunks
+        self.stop = stop
+        self.chunk_chars = chunk_chars
+        self.parts: List[str] = []
+        self.size = 0
+
+    def write(self, data: str) -> int:
+        if self.stop.is_set():
+            raise CopyStopped()
+        self.parts.append(data)
+        self.size += len(data)
+        if self.size >= self.chunk_chars:
+            self.flush_chunk()
+        return len(data)
+
+    def flush_chunk(self):
+        if self.parts:
+            self.chunks.put("".join(self.parts))
+            self.parts, self.size = [], 0
+
+
+def iter_copy_chunks(engine, sql: str, params: Tuple = (), chunk_chars: int = COPY_CHUNK_CHARS) -> Iterator[str]:
+    """Run ``COPY ... TO STDOUT`` on a pooled psycopg2 connection and yield CSV text chunks.
+
+    COPY runs on a background thread and blocks once COPY_QUEUE_DEPTH chunks are waiting,
+    so reading from PostgreSQL overlaps decoding and indexing without buffering the table.
+    """
+    raw_conn = engine.raw_connection()
+    chunks: queue.Queue = queue.Queue(maxsize=COPY_QUEUE_DEPTH)
+    stop = threading.Event()
+    done = object()
+    failure: List[BaseException] = []
+
+    def produce():
+        writer = _ChunkWriter(chunks, stop, chunk_chars)
+        try:
+            cursor = raw_conn.cursor()
+            cursor.copy_expert(cursor.mogrify(sql, params).decode() if params else sql, writer)
+            cursor.close()
+            writer.flush_chunk()
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            chunks.put(done)
+
+    producer = threading.Thread(target=produce, name="pg-copy", daemon=True)
+    producer.start()
+    completed = False
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is done:
+                break
+            yield chunk
+        if failure:
+            raise failure[0]
+        completed = True
+    finally:
+        stop.set()
+        # Unblock a producer waiting on a full queue, then let it finish
+        while producer.is_alive():
+            try:
+                chunks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        if completed:
+            raw_conn.close()
+        else:
+            # An aborted COPY leaves the connection mid-protocol; don't return it to the pool
+            raw_conn.invalidate()
+
+
+class CopyDecoder:
+    """Turns COPY CSV chunks into ES documents a column at a time.
+
+    The C csv reader splits the whole chunk, rows are transposed to columns, and each
+    column gets one ``map`` of its converter instead of a per-value type dispatch.
+    """
+
+    def __init__(self, columns: Sequence[Column]):
+        self.names = [column.name for column in columns]
+        self.converters = [(column_converter(column), column.nullable) for column in columns]
+
+    def decode(self, chunk: str) -> List[Dict[str, Any]]:
+        rows = list(csv.reader(io.StringIO(chunk)))
+        if not rows:
+            return []
+
+        decoded = []
+        for values, (convert, nullable) in zip(zip(*rows), self.converters):
+            if nullable:
+                values = [None if value == COPY_NULL else value for value in values]
+                if convert:
+                    values = [None if value is None else convert(value) for value in values]
+            elif convert:
+                values = list(map(convert, values))
+            decoded.append(values)
+
+        names = self.names
+        return [dict(zip(names, row)) for row in zip(*decoded)]
@@ -6,6 +6,11 @@ from app.db.schemas import Base, User, Customer, ProductCategory, Product, Trans
 import os
 from decimal import Decimal
 import uuid
+import asyncio
+from app.core.redis_utils import bump_data_epoch
+from app.db.partitions import ensure_monthly_partitions
+from datetime import date
+from dateutil.relativedelta import relativedelta
 
 # Define the database URL from an environment variable or a default value.
 DATABASE_URL = os.getenv(
@@ -91,6 +96,11 @@ def seed():
     Base.metadata.drop_all(engine)
     Base.metadata.create_all(engine)
 
+    # Transactions are range-partitioned by month; cover the seeded year plus a little headroom
+    with engine.begin() as conn:
+        created = ensure_monthly_partitions(conn, date.today() - relativedelta(years=1), date.today() + relativedelta(months=3))
+    print(f"Ensured {created} monthly partitions.")
+
     # Seed 10 users.
     users = []
     for _ in range(10):
@@ -190,6 +200,7 @@ def seed():
 
                 item = TransactionItem(
                     transaction_id=trx.id,
+                    transaction_date=trx.transaction_date,
                     product_id=product.id,
                     quantity=qty,
                     price_per_unit=product.price_per_unit,
@@ -208,6 +219,12 @@ def seed():
     session.commit()
     print("✅ Retail database seeded successfully!")
 
+    # Cached analytics were computed against the old data
+    try:
+        asyncio.run(bump_data_epoch())
+    except Exception as e:
+        print(f"⚠️ Could not bump analytics cache epoch: {e}")
+
 
 if __name__ == "__main__":
     seed()
@@ -0,0 +1,90 @@
+"""
+Benchmark: sequential vs concurrent sub-queries for the product and customer analytics bundles.
+
+Each simulated request runs one bundle. The sequential path awaits both sub-queries on
+a single session (the previous behaviour); the concurrent path uses _run_parallel.
+
+    python -m benchmarks.analytics_fanout --concurrency 1 10 25 --requests 100
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from app.db.postgresql import AsyncSessionLocal, engine
+from app.services.analytics_postgresql import AnalyticsPostgreSQL
+
+BUNDLES = {
+    "products": ("get_category_sales_data", "get_product_top_sold_data"),
+    "customers": ("customers_age_spending_data", "customers_age_group_data"),
+}
+
+
+async def sequential_bundle(bundle: str, start_date: datetime, end_date: datetime):
+    async with AsyncSessionLocal() as session:
+        analytics = AnalyticsPostgreSQL(session)
+        return [
+            await getattr(analytics, method)(start_date, end_date)
+            for method in BUNDLES[bundle]
+        ]
+
+
+async def concurrent_bundle(bundle: str, start_date: datetime, end_date: datetime):
+    async with AsyncSessionLocal() as session:
+        analytics = AnalyticsPostgreSQL(session)
+        if bundle == "products":
+            return await analytics.get_product_analytics_data(start_date, end_date)
+        return await analytics.get_customers_analytics_data(start_date, end_date)
+
+
+async def run_load(runner, bundle: str, concurrency: int, total_requests: int, start_date, end_date):
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_request():
+        async with gate:
+            started = time.perf_counter()
+            await runner(bundle, start_date, end_date)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "req_per_s": round(total_requests / elapsed, 1),
+    }
+
+
+async def main(concurrency_levels, total_requests: int, days: int):
+    engine.echo = False
+    end_date = datetime.utcnow()
+    start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+
+    print(f"{'bundle':<11}{'clients':>8}{'path':>12}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>10}")
+    for bundle in BUNDLES:
+        # Warm-up so neither path pays for cold buffers or pool growth
+        await sequential_bundle(bundle, start_date, end_date)
+        await concurrent_bundle(bundle, start_date, end_date)
+
+        for concurrency in concurrency_levels:
+            for name, runner in (("sequential", sequential_bundle), ("concurrent", concurrent_bundle)):
+                stats = await run_load(runner, bundle, concurrency, total_requests, start_date, end_date)
+                print(
+                    f"{bundle:<11}{concurrency:>8}{name:>12}"
+                    f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['req_per_s']:>10}"
+                )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 25])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.requests, args.days))
@@ -0,0 +1,91 @@
+"""
+Microbenchmark: dateutil.parser.parse per value vs the learning DateNormalizer.
+
+Generates mixed-format timestamps in the shapes seen in news dumps
+(ISO with and without offsets, SQL-style, day-first and month-first slashes, RFC 2822,
+long month names), checks both paths agree, then times each over the full set.
+
+    python -m benchmarks.date_normalizer
+    python -m benchmarks.date_normalizer --count 1000000 --seed 7
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from dateutil import parser as dateutil_parser
+
+from app.utils.date_normalizer import DAYFIRST, DateNormalizer
+
+FORMATS = [
+    lambda dt: dt.isoformat(),
+    lambda dt: dt.astimezone(timezone(timedelta(hours=7))).isoformat(),
+    lambda dt: dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+    lambda dt: dt.strftime("%Y-%m-%d %H:%M:%S"),
+    lambda dt: dt.strftime("%m/%d/%Y"),
+    lambda dt: dt.strftime("%d/%m/%Y %H:%M"),
+    lambda dt: dt.strftime("%a, %d %b %Y %H:%M:%S +0700"),
+    lambda dt: dt.strftime("%d %B %Y"),
+]
+
+
+def generate(count: int, seed: int):
+    rng = random.Random(seed)
+    start = datetime(2018, 1, 1, tzinfo=timezone.utc)
+    span = 7 * 365 * 24 * 3600
+    return [
+        rng.choice(FORMATS)(start + timedelta(seconds=rng.randrange(span)))
+        for _ in range(count)
+    ]
+
+
+def run_dateutil(values):
+    out = []
+    for value in values:
+        try:
+            out.append(dateutil_parser.parse(value, dayfirst=DAYFIRST).isoformat())
+        except (ValueError, OverflowError):
+            out.append(None)
+    return out
+
+
+def run_normalizer(values):
+    normalizer = DateNormalizer()
+    return [normalizer.normalize(value) for value in values], normalizer.stats
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main(count: int, seed: int, verify: int):
+    values = generate(count, seed)
+
+    # Every value is checked against a fresh normalizer too, in reverse order: what a
+    # shape learns first must not change the result
+    sample = values[:verify]
+    expected = run_dateutil(sample)
+    actual, _ = run_normalizer(sample)
+    reversed_actual, _ = run_normalizer(sample[::-1])
+    mismatched = sum(1 for a, b, c in zip(expected, actual, reversed_actual[::-1]) if not a == b == c)
+    if mismatched:
+        print(f"⚠️ {mismatched}/{len(sample)} values differ from dateutil")
+
+    print(f"{'path':<16}{'values':>10}{'seconds':>10}{'values/s':>12}")
+    _, dateutil_seconds = timed(run_dateutil, values)
+    (_, stats), normalizer_seconds = timed(run_normalizer, values)
+    for name, seconds in (("dateutil", dateutil_seconds), ("DateNormalizer", normalizer_seconds)):
+        print(f"{name:<16}{count:>10}{seconds:>10.2f}{count / seconds:>12.0f}")
+
+    print(f"speedup: {dateutil_seconds / normalizer_seconds:.1f}x, normalizer stats: {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verify", type=int, default=20000, help="Values checked against dateutil first")
+    args = parser.parse_args()
+    main(args.count, args.seed, args.verify)
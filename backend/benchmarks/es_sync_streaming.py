@@ -0,0 +1,93 @@
+"""
+Benchmark: buffered vs streaming ElasticSyncService.sync_to_es.
+
+Indexes a synthetic generate_series result into a scratch index with both paths and
+reports peak Python heap (tracemalloc) and docs/sec. The buffered path grows with the
+row count; the streaming path should stay flat.
+
+    python -m benchmarks.es_sync_streaming --rows 10000 100000 1000000
+    python -m benchmarks.es_sync_streaming --rows 1000000 --chunk-size 5000 --in-flight 4
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from app.db.elastic import close_async_es_client, get_async_es_client
+from app.db.postgresql import AsyncSessionLocal, engine
+from app.services.elastic_sync import ElasticSyncService
+
+INDEX_NAME = "bench_es_sync"
+MAPPING = {
+    "mappings": {
+        "properties": {
+            "bucket": {"type": "integer"},
+            "payload": {"type": "keyword"},
+            "amount": {"type": "double"},
+        }
+    },
+    "settings": {"number_of_shards": 1, "number_of_replicas": 0, "refresh_interval": "-1"},
+}
+
+QUERY = """
+    SELECT g AS id, mod(g, 1000) AS bucket, md5(g::text) AS payload, g * 1.5 AS amount
+    FROM generate_series(1, CAST(:rows AS integer)) AS g
+"""
+
+
+def transform(row):
+    return {"bucket": row.bucket, "payload": row.payload, "amount": float(row.amount)}, str(row.id)
+
+
+async def run_once(sync: ElasticSyncService, rows: int, stream: bool, chunk_size: int, in_flight: int) -> dict:
+    es = sync.es
+    if await es.indices.exists(index=INDEX_NAME):
+        await es.indices.delete(index=INDEX_NAME)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    if stream:
+        indexed = await sync.stream_to_es(
+            INDEX_NAME, QUERY, transform, MAPPING, {"rows": rows},
+            chunk_size=chunk_size, max_in_flight=in_flight,
+        )
+    else:
+        indexed = await sync.sync_to_es(INDEX_NAME, QUERY, transform, MAPPING, {"rows": rows}, stream=False)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "indexed": indexed,
+        "peak_mb": round(peak / 1024 / 1024, 1),
+        "seconds": round(elapsed, 2),
+        "docs_per_s": round(indexed / elapsed) if elapsed else 0,
+    }
+
+
+async def main(row_counts, chunk_size: int, in_flight: int):
+    engine.echo = False
+    sync = ElasticSyncService(await get_async_es_client(), AsyncSessionLocal)
+
+    print(f"{'rows':>10}{'path':>12}{'indexed':>10}{'peak MB':>10}{'seconds':>10}{'docs/s':>10}")
+    for rows in row_counts:
+        for name, stream in (("buffered", False), ("streaming", True)):
+            stats = await run_once(sync, rows, stream, chunk_size, in_flight)
+            print(
+                f"{rows:>10}{name:>12}{stats['indexed']:>10}"
+                f"{stats['peak_mb']:>10}{stats['seconds']:>10}{stats['docs_per_s']:>10}"
+            )
+
+    if await sync.es.indices.exists(index=INDEX_NAME):
+        await sync.es.indices.delete(index=INDEX_NAME)
+    await close_async_es_client()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--in-flight", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.chunk_size, args.in_flight))
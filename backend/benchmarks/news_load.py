@@ -0,0 +1,89 @@
+"""
+Load test: throughput of a cheap endpoint with and without concurrent news analytics traffic.
+
+When the news routes blocked the event loop on Elasticsearch, every other request on the
+worker queued behind them and the probe's throughput collapsed as soon as news load started.
+With the async client the probe should keep roughly the same req/s and latency. Run against
+a live server (single uvicorn worker makes the effect easiest to see):
+
+    uvicorn app.main:app --workers 1
+    python -m benchmarks.news_load --duration 15 --news-concurrency 20 --probe-concurrency 10
+    python -m benchmarks.news_load --base-url http://localhost:8000 --search ekonomi
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+PROBE_PATH = "/analytics/sync/status"
+
+
+async def hammer(client: httpx.AsyncClient, path: str, params: dict, deadline: float, timings: list, errors: list):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, params=params)
+            response.raise_for_status()
+            timings.append((time.perf_counter() - started) * 1000)
+        except httpx.HTTPError as e:
+            errors.append(str(e))
+
+
+def summarize(name: str, timings: list, errors: list, duration: float) -> dict:
+    timings.sort()
+    return {
+        "name": name,
+        "requests": len(timings),
+        "errors": len(errors),
+        "req_per_s": round(len(timings) / duration, 1),
+        "p50_ms": round(timings[len(timings) // 2], 2) if timings else None,
+        "p95_ms": round(timings[max(int(len(timings) * 0.95) - 1, 0)], 2) if timings else None,
+    }
+
+
+async def run_scenario(base_url: str, duration: float, probe_concurrency: int, news_concurrency: int, search_query) -> list:
+    news_params = {"search_query": search_query} if search_query else {}
+    limits = httpx.Limits(max_connections=probe_concurrency + news_concurrency + 5)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+        probe_timings, probe_errors = [], []
+        news_timings, news_errors = [], []
+
+        workers = [
+            hammer(client, PROBE_PATH, {}, deadline, probe_timings, probe_errors)
+            for _ in range(probe_concurrency)
+        ]
+        for i in range(news_concurrency):
+            # Alternate between the overview and the recent-articles route
+            path = "/analytics/news" if i % 2 == 0 else "/analytics/news/recent"
+            workers.append(hammer(client, path, news_params, deadline, news_timings, news_errors))
+
+        await asyncio.gather(*workers)
+
+    results = [summarize("probe", probe_timings, probe_errors, duration)]
+    if news_concurrency:
+        results.append(summarize("news", news_timings, news_errors, duration))
+    return results
+
+
+async def main(base_url: str, duration: float, probe_concurrency: int, news_concurrency: int, search_query):
+    print(f"{'scenario':<16}{'endpoint':<10}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for scenario, concurrency in (("probe only", 0), ("with news load", news_concurrency)):
+        for stats in await run_scenario(base_url, duration, probe_concurrency, concurrency, search_query):
+            print(
+                f"{scenario:<16}{stats['name']:<10}{stats['requests']:>10}{stats['errors']:>8}"
+                f"{stats['req_per_s']:>10}{str(stats['p50_ms']):>10}{str(stats['p95_ms']):>10}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--probe-concurrency", type=int, default=10)
+    parser.add_argument("--news-concurrency", type=int, default=20)
+    parser.add_argument("--search", default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.duration, args.probe_concurrency, args.news_concurrency, args.search))
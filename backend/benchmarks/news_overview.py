@@ -0,0 +1,96 @@
+"""
+Benchmark: /analytics/news overview as five sequential searches, one combined aggregation
+search, and the combined search with timeline and tags read from news_daily_rollup.
+
+The legacy path calls the per-panel methods one after another, each with its own copy of
+the base query; the combined paths are NewsAnalyticsService.get_overview with the rollup
+disabled and enabled. Run against an Elasticsearch with the news index and rollup loaded:
+
+    python -m benchmarks.news_overview --iterations 30
+    python -m benchmarks.news_overview --search "ekonomi" --start 2023-01-01 --end 2023-06-30
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from app.db.elastic import close_async_es_client, get_async_es_client
+from app.services.news_analytics import NewsAnalyticsService, OVERVIEW_KEYWORDS, OVERVIEW_TAGS, OVERVIEW_TITLE_KEYWORDS
+
+
+async def legacy_overview(service: NewsAnalyticsService, search_query, start_date, end_date):
+    """The five sequential round trips get_overview used to make"""
+    return {
+        "statistics": await service.get_statistics(search_query, start_date, end_date),
+        "top_title_keywords": await service.get_top_title_keywords(OVERVIEW_TITLE_KEYWORDS, search_query, start_date, end_date),
+        "tag_distribution": await service.get_tag_distribution(OVERVIEW_TAGS, search_query, start_date, end_date),
+        "timeline": await service.get_timeline("week", search_query, start_date, end_date),
+        "top_keywords": await service.get_top_keywords("article_keywords", OVERVIEW_KEYWORDS, search_query, start_date, end_date),
+    }
+
+
+async def combined_overview(service: NewsAnalyticsService, search_query, start_date, end_date):
+    return await service.get_overview(search_query, start_date, end_date)
+
+
+async def measure(name: str, runner, service, iterations: int, search_query, start_date, end_date) -> dict:
+    calls = {"count": 0}
+    original_search = service.es.search
+
+    async def counting_search(*args, **kwargs):
+        calls["count"] += 1
+        return await original_search(*args, **kwargs)
+
+    service.es.search = counting_search
+    timings = []
+    try:
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await runner(service, search_query, start_date, end_date)
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        service.es.search = original_search
+
+    timings.sort()
+    return {
+        "name": name,
+        "round_trips": calls["count"] // iterations,
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[max(int(len(timings) * 0.95) - 1, 0)], 2),
+    }
+
+
+async def main(iterations: int, search_query, start_date, end_date):
+    es = await get_async_es_client()
+    raw = NewsAnalyticsService(es, rollup_index=None)
+    with_rollup = NewsAnalyticsService(es)
+
+    # Results must match before timing means anything
+    legacy = await legacy_overview(raw, search_query, start_date, end_date)
+    for name, service in (("combined", raw), ("rollup", with_rollup)):
+        overview = await combined_overview(service, search_query, start_date, end_date)
+        mismatched = [panel for panel in legacy if legacy[panel] != overview[panel]]
+        if mismatched:
+            print(f"⚠️ Panels differ between legacy and {name}: {', '.join(mismatched)}")
+
+    print(f"{'path':<24}{'round trips':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    paths = (
+        ("legacy (5 searches)", legacy_overview, raw),
+        ("combined (1 search)", combined_overview, raw),
+        ("combined + rollup", combined_overview, with_rollup),
+    )
+    for name, runner, service in paths:
+        stats = await measure(name, runner, service, iterations, search_query, start_date, end_date)
+        print(f"{stats['name']:<24}{stats['round_trips']:>12}{stats['p50_ms']:>10}{stats['p95_ms']:>10}")
+
+    await close_async_es_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--search", default=None)
+    parser.add_argument("--start", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.search, args.start, args.end))
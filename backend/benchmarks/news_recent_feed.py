@@ -0,0 +1,131 @@
+"""
+Benchmark: /analytics/news/recent latency with and without the publish_date index sort.
+
+Loads one synthetic corpus into two scratch index sets built from the news template,
+one with the index sort removed, and pages through the feed with
+NewsAnalyticsService.get_recent_news. It reports p50/p99 for the first page and for
+deep pages, unfiltered and with a date window:
+
+    before   unsorted indices, total hits counted as the feed used to
+    after    sorted indices, track_total_hits off, so shards can terminate early
+
+    python -m benchmarks.news_recent_feed --docs 500000 --iterations 100
+    python -m benchmarks.news_recent_feed --docs 100000 --pages 20 --keep
+"""
+import argparse
+import asyncio
+import copy
+import time
+from datetime import datetime, timedelta, timezone
+
+from elasticsearch.helpers import async_bulk
+
+from app.db.elastic import close_async_es_client, get_async_es_client
+from app.db.news_indices import monthly_index_name, news_index_template
+from app.services.news_analytics import NewsAnalyticsService, _decode_cursor
+from benchmarks.news_time_indices import generate_docs
+
+UNSORTED_ALIAS = "bench_feed_unsorted"
+SORTED_ALIAS = "bench_feed_sorted"
+
+
+def unsorted_template(alias: str) -> dict:
+    template = copy.deepcopy(news_index_template(alias))
+    template["template"]["settings"].pop("index")
+    return template
+
+
+async def load_corpus(es, docs: int, start: datetime, end: datetime) -> None:
+    await es.indices.put_index_template(name=UNSORTED_ALIAS, body=unsorted_template(UNSORTED_ALIAS))
+    await es.indices.put_index_template(name=SORTED_ALIAS, body=news_index_template(SORTED_ALIAS))
+    for alias in (UNSORTED_ALIAS, SORTED_ALIAS):
+        await es.indices.delete(index=f"{alias}-*", ignore_unavailable=True)
+
+    def actions():
+        for doc_id, publish_date, source in generate_docs(docs, start, end):
+            for alias in (UNSORTED_ALIAS, SORTED_ALIAS):
+                yield {"_index": monthly_index_name(publish_date, alias), "_id": doc_id, "_source": source}
+
+    await async_bulk(es, actions(), chunk_size=5000, request_timeout=120)
+    await es.indices.refresh(index=f"{UNSORTED_ALIAS},{SORTED_ALIAS}")
+
+
+def count_total_hits(service: NewsAnalyticsService) -> None:
+    """Put back the default hit counting the feed did before, for the 'before' run"""
+    original_search = service.es.search
+
+    async def search(*args, **kwargs):
+        body = dict(kwargs.pop("body"))
+        body.pop("track_total_hits", None)
+        return await original_search(*args, body=body, **kwargs)
+
+    # options() gives a separate client object on the same connection pool, so the 'after' service is untouched
+    service.es = service.es.options()
+    service.es.search = search
+
+
+async def walk_feed(service: NewsAnalyticsService, pages: int, start_date, end_date) -> list:
+    """Latency of each page, following the cursor"""
+    timings, cursor = [], None
+    for _ in range(pages):
+        started = time.perf_counter()
+        _, cursor = await service.get_recent_news(10, None, start_date, end_date, cursor)
+        timings.append((time.perf_counter() - started) * 1000)
+        if cursor is None:
+            break
+    if cursor:
+        # Stopped before the end of the feed; don't leave the PIT open until its keep-alive runs out
+        state = _decode_cursor(cursor)
+        if "pit" in state:
+            await service._close_pit(state["pit"])
+    return timings
+
+
+def percentiles(timings: list) -> tuple:
+    timings = sorted(timings)
+    return (
+        round(timings[len(timings) // 2], 2),
+        round(timings[max(int(len(timings) * 0.99) - 1, 0)], 2),
+    )
+
+
+async def main(docs: int, iterations: int, pages: int, keep: bool):
+    es = await get_async_es_client()
+    end = datetime(2024, 12, 31, tzinfo=timezone.utc)
+    start = end - timedelta(days=365 * 3)
+    await load_corpus(es, docs, start, end)
+
+    before = NewsAnalyticsService(es, alias=UNSORTED_ALIAS)
+    count_total_hits(before)
+    after = NewsAnalyticsService(es, alias=SORTED_ALIAS)
+
+    filters = {"no filter": (None, None), "last 90 days": (end - timedelta(days=90), end)}
+
+    print(f"{'filter':<14}{'layout':<8}{'page 1 p50':>12}{'page 1 p99':>12}{'deep p50':>10}{'deep p99':>10}")
+    for label, (start_date, end_date) in filters.items():
+        for name, service in (("before", before), ("after", after)):
+            await walk_feed(service, pages, start_date, end_date)  # warm-up
+            first, deep = [], []
+            for _ in range(iterations):
+                timings = await walk_feed(service, pages, start_date, end_date)
+                first.append(timings[0])
+                deep.extend(timings[1:])
+            first_p50, first_p99 = percentiles(first)
+            deep_p50, deep_p99 = percentiles(deep) if deep else (None, None)
+            print(f"{label:<14}{name:<8}{first_p50:>12}{first_p99:>12}{str(deep_p50):>10}{str(deep_p99):>10}")
+
+    if not keep:
+        for alias in (UNSORTED_ALIAS, SORTED_ALIAS):
+            await es.indices.delete(index=f"{alias}-*", ignore_unavailable=True)
+            await es.indices.delete_index_template(name=alias)
+    await close_async_es_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=500000)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=10, help="Pages followed per feed walk")
+    parser.add_argument("--keep", action="store_true", help="Leave the benchmark indices in place")
+    args = parser.parse_args()
+    asyncio.run(main(args.docs, args.iterations, args.pages, args.keep))
@@ -0,0 +1,131 @@
+"""
+Benchmark: one news index vs monthly news-YYYY-MM indices with date-range routing.
+
+Loads the same synthetic multi-year corpus twice: into a single index and into monthly
+indices behind an alias. Then it times NewsAnalyticsService.get_timeline and
+get_statistics over date windows of different widths, for three layouts:
+
+    single          one index, every query hits all of its shards
+    monthly/all     monthly indices, queried through the alias (no routing)
+    monthly/routed  monthly indices, only the months overlapping the window
+
+    python -m benchmarks.news_time_indices --docs 200000 --years 5
+    python -m benchmarks.news_time_indices --docs 50000 --years 3 --iterations 50 --keep
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from elasticsearch.helpers import async_bulk
+
+from app.db.elastic import close_async_es_client, get_async_es_client
+from app.db.news_indices import existing_news_indices, monthly_index_name, news_index_template
+from app.services.news_analytics import NewsAnalyticsService
+
+SINGLE_ALIAS = "bench_news_single"
+MONTHLY_ALIAS = "bench_news_monthly"
+
+WORDS = ["ekonomi", "politik", "harga", "pemilu", "banjir", "pasar", "saham", "bola", "vaksin", "jalan", "kereta", "pajak"]
+TAGS = [f"tag-{i}" for i in range(40)]
+AUTHORS = [f"author-{i}" for i in range(200)]
+
+# Window widths, each ending at the last day of the corpus
+WINDOWS = {"1 month": 30, "3 months": 91, "1 year": 365, "all": None}
+
+
+def generate_docs(count: int, start: datetime, end: datetime, seed: int = 42):
+    rng = random.Random(seed)
+    span = (end - start).total_seconds()
+    for i in range(count):
+        publish_date = start + timedelta(seconds=rng.random() * span)
+        title = rng.sample(WORDS, 3)
+        yield str(i), publish_date, {
+            "title": " ".join(title),
+            "title_keywords": title,
+            "article_keywords": rng.sample(WORDS, 5),
+            "author": rng.choice(AUTHORS),
+            "tag": rng.sample(TAGS, 2),
+            "publish_date": publish_date.isoformat(),
+        }
+
+
+async def load_corpus(es, docs: int, start: datetime, end: datetime) -> None:
+    for alias in (SINGLE_ALIAS, MONTHLY_ALIAS):
+        await es.indices.put_index_template(name=alias, body=news_index_template(alias))
+        await es.indices.delete(index=f"{alias}-*", ignore_unavailable=True)
+
+    def actions():
+        for doc_id, publish_date, source in generate_docs(docs, start, end):
+            yield {"_index": f"{SINGLE_ALIAS}-all", "_id": doc_id, "_source": source}
+            yield {"_index": monthly_index_name(publish_date, MONTHLY_ALIAS), "_id": doc_id, "_source": source}
+
+    started = time.perf_counter()
+    await async_bulk(es, actions(), chunk_size=5000, request_timeout=120)
+    await es.indices.refresh(index=f"{SINGLE_ALIAS},{MONTHLY_ALIAS}")
+    print(f"📥 Loaded {docs} docs into both layouts in {time.perf_counter() - started:.1f}s")
+
+
+async def time_query(call, iterations: int) -> dict:
+    await call()  # warm-up
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[max(int(len(timings) * 0.95) - 1, 0)], 2),
+    }
+
+
+async def main(docs: int, years: int, iterations: int, keep: bool):
+    es = await get_async_es_client()
+    end = datetime(2024, 12, 31, tzinfo=timezone.utc)
+    start = end - timedelta(days=365 * years)
+    await load_corpus(es, docs, start, end)
+
+    layouts = {
+        "single": NewsAnalyticsService(es, alias=SINGLE_ALIAS, route_by_date=False),
+        "monthly/all": NewsAnalyticsService(es, alias=MONTHLY_ALIAS, route_by_date=False),
+        "monthly/routed": NewsAnalyticsService(es, alias=MONTHLY_ALIAS),
+    }
+
+    print(f"{'query':<12}{'window':<10}{'layout':<16}{'indices':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    for window, days in WINDOWS.items():
+        # The "all" window still passes a start date so routing has a range to prune with
+        window_start = end - timedelta(days=days) if days else start
+        for layout, service in layouts.items():
+            target = await service._target(window_start, end)
+            searched = (
+                len(await existing_news_indices(es, service.alias)) if target == service.alias
+                else len(target.split(","))
+            )
+            queries = {
+                "timeline": lambda: service.get_timeline("week", None, window_start, end),
+                "statistics": lambda: service.get_statistics(None, window_start, end),
+            }
+            for name, call in queries.items():
+                stats = await time_query(call, iterations)
+                print(
+                    f"{name:<12}{window:<10}{layout:<16}{searched:>8}"
+                    f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+                )
+
+    if not keep:
+        for alias in (SINGLE_ALIAS, MONTHLY_ALIAS):
+            await es.indices.delete(index=f"{alias}-*", ignore_unavailable=True)
+            await es.indices.delete_index_template(name=alias)
+    await close_async_es_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--keep", action="store_true", help="Leave the benchmark indices in place")
+    args = parser.parse_args()
+    asyncio.run(main(args.docs, args.years, args.iterations, args.keep))
@@ -0,0 +1,154 @@
+"""
+Benchmark: per-day sales trend over a heap transactions table vs a monthly-partitioned one.
+
+Builds both tables in a scratch schema (bench_partitioning) from the same multi-year
+synthetic data, then runs the raw aggregate behind the sales trend endpoint for a
+range of window sizes. The live endpoint reads daily_sales_rollup, so this measures
+the base-table path that the rollup backfill and ad-hoc queries still take.
+
+    python -m benchmarks.partitioning --years 3 --rows-per-day 2000 --iterations 10
+    python -m benchmarks.partitioning --drop
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+
+from app.db.partitions import CREATE_PARTITIONS_FUNCTION
+from app.db.postgresql import engine
+
+SCHEMA = "bench_partitioning"
+
+TREND_QUERY = """
+    SELECT transaction_date, SUM(total_amount) AS total_sales, COUNT(id) AS total_transactions
+    FROM {table}
+    WHERE transaction_date BETWEEN :start AND :end
+    GROUP BY transaction_date
+    ORDER BY transaction_date
+"""
+
+
+async def build(conn, years: int, rows_per_day: int):
+    end = date.today()
+    start = end - relativedelta(years=years)
+
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    # Partitions are created next to their parent, so resolve names in the scratch schema
+    await conn.execute(text(f"SET LOCAL search_path TO {SCHEMA}, public"))
+    await conn.execute(text(CREATE_PARTITIONS_FUNCTION))
+
+    columns = """
+        id uuid NOT NULL,
+        transaction_date date NOT NULL,
+        total_amount numeric(12, 2) NOT NULL
+    """
+    await conn.execute(text(f"CREATE TABLE heap_transactions ({columns}, PRIMARY KEY (id))"))
+    await conn.execute(text(
+        f"CREATE TABLE part_transactions ({columns}, PRIMARY KEY (id, transaction_date)) "
+        "PARTITION BY RANGE (transaction_date)"
+    ))
+    await conn.execute(
+        text(f"SELECT {SCHEMA}.create_monthly_partitions('part_transactions', :start, :end)"),
+        {"start": start, "end": end},
+    )
+
+    await conn.execute(text(f"""
+        INSERT INTO heap_transactions (id, transaction_date, total_amount)
+        SELECT gen_random_uuid(), d::date, round((random() * 500000)::numeric, 2)
+        FROM generate_series(CAST(:start AS date), CAST(:end AS date), interval '1 day') AS d,
+             generate_series(1, {rows_per_day})
+    """), {"start": start, "end": end})
+    await conn.execute(text("INSERT INTO part_transactions SELECT * FROM heap_transactions"))
+
+    for table in ("heap_transactions", "part_transactions"):
+        await conn.execute(text(f"CREATE INDEX ON {table} (transaction_date)"))
+        await conn.execute(text(f"ANALYZE {table}"))
+
+    count = (await conn.execute(text("SELECT count(*) FROM heap_transactions"))).scalar()
+    print(f"Built {SCHEMA} with {count} rows per table ({start} .. {end})")
+
+
+def partitions_scanned(plan: dict) -> int:
+    """Count distinct relations scanned in an EXPLAIN (FORMAT JSON) plan"""
+    relations = set()
+
+    def walk(node):
+        if "Relation Name" in node:
+            relations.add(node["Relation Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return len(relations)
+
+
+async def measure(conn, table: str, start: date, end: date, iterations: int) -> dict:
+    query = TREND_QUERY.format(table=f"{SCHEMA}.{table}")
+    params = {"start": start, "end": end}
+
+    result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"), params)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    plan = plan[0]
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await conn.execute(text(query), params)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        "relations": partitions_scanned(plan),
+        "buffers": plan["Plan"].get("Shared Hit Blocks", 0) + plan["Plan"].get("Shared Read Blocks", 0),
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[max(int(len(timings) * 0.95) - 1, 0)], 2),
+    }
+
+
+async def main(years: int, rows_per_day: int, iterations: int, windows, rebuild: bool, drop: bool):
+    engine.echo = False
+
+    if drop:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        print(f"Dropped {SCHEMA}")
+        await engine.dispose()
+        return
+
+    async with engine.begin() as conn:
+        exists = (await conn.execute(text("SELECT to_regclass(:name)"), {"name": f"{SCHEMA}.heap_transactions"})).scalar()
+        if rebuild or not exists:
+            await build(conn, years, rows_per_day)
+
+    end = date.today()
+    print(f"{'window':>8}{'table':>20}{'relations':>11}{'buffers':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    async with engine.connect() as conn:
+        for days in windows:
+            start = end - timedelta(days=days)
+            for table in ("heap_transactions", "part_transactions"):
+                stats = await measure(conn, table, start, end, iterations)
+                print(
+                    f"{days:>7}d{table:>20}{stats['relations']:>11}"
+                    f"{stats['buffers']:>10}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+                )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--rows-per-day", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--windows", type=int, nargs="+", default=[7, 30, 90, 365])
+    parser.add_argument("--rebuild", action="store_true", help="Recreate the scratch tables even if they exist")
+    parser.add_argument("--drop", action="store_true", help="Drop the scratch schema and exit")
+    args = parser.parse_args()
+    asyncio.run(main(args.years, args.rows_per_day, args.iterations, args.windows, args.rebuild, args.drop))
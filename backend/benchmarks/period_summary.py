@@ -0,0 +1,148 @@
+"""
+Benchmark: /analytics/summary legacy eight-query path vs the single-scan summary engine.
+
+Run from the backend directory against a seeded database:
+
+    python -m benchmarks.period_summary --iterations 50 --days 30
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, select, text
+
+from app.db.postgresql import AsyncSessionLocal, engine
+from app.db.schemas import Transaction, TransactionItem
+from app.services.analytics_postgresql import AnalyticsPostgreSQL
+
+
+def legacy_queries(start_date: datetime, end_date: datetime):
+    """The eight statements get_period_summary_data used to send, one per metric and window"""
+    period_length = (end_date - start_date).days + 1
+    prev_start_date = start_date - timedelta(days=period_length)
+    prev_end_date = start_date - timedelta(days=1)
+
+    queries = []
+    for window_start, window_end in [(start_date, end_date), (prev_start_date, prev_end_date)]:
+        in_window = Transaction.transaction_date.between(window_start, window_end)
+        queries.extend([
+            select(func.sum(TransactionItem.quantity)).join(Transaction).where(in_window),
+            select(func.count(Transaction.id)).where(in_window),
+            select(func.sum(Transaction.total_amount)).where(in_window),
+            select(func.avg(Transaction.total_amount)).where(in_window),
+        ])
+    return queries
+
+
+def single_scan_query(start_date: datetime, end_date: datetime):
+    period_length = (end_date - start_date).days + 1
+    prev_start_date = start_date - timedelta(days=period_length)
+    prev_end_date = start_date - timedelta(days=1)
+    return AnalyticsPostgreSQL(None)._build_period_summary_query([
+        (start_date, end_date),
+        (prev_start_date, prev_end_date),
+    ])
+
+
+def count_scans(plan: dict) -> dict:
+    """Count relation scans and shared buffers touched in an EXPLAIN (FORMAT JSON) plan"""
+    totals = {"scans": 0, "buffers": 0}
+
+    def walk(node):
+        if "Relation Name" in node:
+            totals["scans"] += 1
+        for child in node.get("Plans", []):
+            walk(child)
+
+    root = plan["Plan"]
+    walk(root)
+    totals["buffers"] = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+    return totals
+
+
+async def explain(session, query) -> dict:
+    compiled = query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    result = await session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}"))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return count_scans(plan[0])
+
+
+async def run_legacy(start_date: datetime, end_date: datetime):
+    async with AsyncSessionLocal() as session:
+        for query in legacy_queries(start_date, end_date):
+            (await session.execute(query)).scalar()
+
+
+async def run_single_scan(start_date: datetime, end_date: datetime):
+    async with AsyncSessionLocal() as session:
+        await AnalyticsPostgreSQL(session).get_period_summary_data(start_date, end_date)
+
+
+async def measure(name: str, runner, start_date: datetime, end_date: datetime, iterations: int, counter: dict):
+    counter["statements"] = 0
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await runner(start_date, end_date)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        "name": name,
+        "round_trips": counter["statements"] // iterations,
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2),
+    }
+
+
+async def main(iterations: int, days: int):
+    engine.echo = False
+    counter = {"statements": 0}
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter["statements"] += 1
+
+    end_date = datetime.utcnow()
+    start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+
+    # Warm up caches so both paths are measured against the same buffer state
+    await run_legacy(start_date, end_date)
+    await run_single_scan(start_date, end_date)
+
+    results = [
+        await measure("legacy (8 queries)", run_legacy, start_date, end_date, iterations, counter),
+        await measure("single scan", run_single_scan, start_date, end_date, iterations, counter),
+    ]
+
+    async with AsyncSessionLocal() as session:
+        legacy_plan = {"scans": 0, "buffers": 0}
+        for query in legacy_queries(start_date, end_date):
+            plan = await explain(session, query)
+            legacy_plan["scans"] += plan["scans"]
+            legacy_plan["buffers"] += plan["buffers"]
+        single_plan = await explain(session, single_scan_query(start_date, end_date))
+
+    results[0].update(legacy_plan)
+    results[1].update(single_plan)
+
+    print(f"{'path':<22}{'round trips':>12}{'relation scans':>16}{'buffers':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for row in results:
+        print(
+            f"{row['name']:<22}{row['round_trips']:>12}{row['scans']:>16}"
+            f"{row['buffers']:>10}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.days))
@@ -0,0 +1,85 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import app.services.elastic_sync as elastic_sync
+from app.services.elastic_sync import ElasticSyncService
+
+
+class FakeResult:
+    def __init__(self, chunks: int, chunk_size: int):
+        self.chunks = chunks
+        self.chunk_size = chunk_size
+
+    async def partitions(self, size):
+        for chunk in range(self.chunks):
+            yield [SimpleNamespace(id=f"{chunk}-{row}") for row in range(self.chunk_size)]
+
+
+class FakeSession:
+    def __init__(self, result: FakeResult):
+        self.result = result
+        self.rolled_back = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def stream(self, statement, params):
+        return self.result
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+class FakeES:
+    async def ping(self):
+        return True
+
+
+def make_service(chunks: int = 20, chunk_size: int = 10):
+    session = FakeSession(FakeResult(chunks, chunk_size))
+    return ElasticSyncService(FakeES(), lambda: session), session
+
+
+def transform(row):
+    return {"id": row.id}, row.id
+
+
+def test_stream_to_es_fails_instead_of_hanging_when_bulk_raises(monkeypatch):
+    async def failing_bulk(client, actions, **kwargs):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("bulk rejected")
+
+    monkeypatch.setattr(elastic_sync, "async_bulk", failing_bulk)
+    service, session = make_service()
+
+    async def run():
+        # More chunks than the queue holds, so the producer is blocked in put when the indexers die
+        return await asyncio.wait_for(
+            service.stream_to_es("bench", "SELECT 1", transform, chunk_size=10, max_in_flight=2), timeout=5
+        )
+
+    with pytest.raises(RuntimeError, match="bulk rejected"):
+        asyncio.run(run())
+    assert session.rolled_back
+
+
+def test_stream_to_es_indexes_every_chunk(monkeypatch):
+    indexed = []
+
+    async def bulk(client, actions, **kwargs):
+        await asyncio.sleep(0)
+        indexed.extend(action["_id"] for action in actions)
+        return len(actions), []
+
+    monkeypatch.setattr(elastic_sync, "async_bulk", bulk)
+    service, _ = make_service(chunks=7, chunk_size=3)
+
+    count = asyncio.run(service.stream_to_es("bench", "SELECT 1", transform, chunk_size=3, max_in_flight=2))
+
+    assert count == 21
+    assert len(set(indexed)) == 21
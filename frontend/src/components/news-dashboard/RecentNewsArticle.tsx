@@ -62,7 +62,7 @@ const RecentNewsArticle = ({
       url: "/analytics/news/recent",
       params: (pageParam) => ({
         size: 10,
-        search_after: pageParam || undefined,
+        cursor: pageParam || undefined,
         start_date: start_date,
         end_date: end_date,
         search_query: search_query,
@@ -70,7 +70,7 @@ const RecentNewsArticle = ({
     },
     {
       getNextPageParam: (lastPage) => {
-        return lastPage.data?.next_search_after || undefined;
+        return lastPage.data?.next_cursor || undefined;
       },
       initialPageParam: null,
     }
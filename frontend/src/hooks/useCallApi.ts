@@ -118,8 +118,8 @@ export function useInfiniteFetchApi<
 ) {
   const {
     getNextPageParam = (lastPage: any) => {
-      if (lastPage?.data?.next_search_after) {
-        return lastPage.data.next_search_after;
+      if (lastPage?.data?.next_cursor) {
+        return lastPage.data.next_cursor;
       }
 
       if (lastPage?.nextCursor || lastPage?.next_cursor) {
@@ -96,7 +96,7 @@ export interface NewsOverview {
 }
 
 export interface ReqNewsOverview extends ReqNewsTrend {
-  search_after: string;
+  cursor: string;
 }
 
 export interface NewsRecentItems {
@@ -110,7 +110,7 @@ export interface NewsRecentItems {
 
 export interface ResRecentNews {
   items: NewsRecentItems[];
-  next_search_after: string;
+  next_cursor: string | null;
 }
 
 export interface NewsStatistics {